@@ -4,7 +4,12 @@ Sorting Algorithm Visualizer
 Main entry point for the application
 """
 
+import time
+
+# Taken before anything else is imported, for --measure-startup
+started = time.perf_counter()
+
 from src.main import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(started=started)
\ No newline at end of file
@@ -1,21 +1,67 @@
-import pygame
 import os
 import threading
 import time
+from collections import deque, OrderedDict
+from src.tones import (SAMPLE_RATE, TONE_PITCHES, TONE_FADE, tone_frequency,
+                       value_pitch)
+
+MIXER_BUFFER = 512
+# One audio frame is the time the mixer takes to play one buffer
+AUDIO_FRAME = MIXER_BUFFER / SAMPLE_RATE
+NUM_CHANNELS = 8
+QUEUE_SIZE = 256
+
+# Value-mapped tones ("sound of sorting", see src.tones)
+TONE_CACHE_SIZE = 128
+TONE_DURATION = 0.05
 
 class AudioManager:
-    def __init__(self):
+    def __init__(self, setup=True):
         self.sounds = {}
+        self.tones = OrderedDict()
+        self.value_pitch = True
         self.enabled = True
         self.initialized = False
-        self.setup_audio()
+        self.channels = []
+        self.next_channel = 0
+        self.dropped = 0
+        self.queue = deque()
+        self.worker = None
+        self.stop_event = threading.Event()
+        self.setup_thread = None
+        if setup:
+            self.setup_audio()
+        
+    def setup_in_background(self, on_ready=None):
+        """Run setup_audio on a daemon thread, then call ``on_ready``.
+        
+        Importing pygame and synthesizing the sounds takes a while; sounds
+        requested before it finishes are simply not played.
+        """
+        def setup():
+            self.setup_audio()
+            if on_ready is not None:
+                on_ready()
+        self.setup_thread = threading.Thread(target=setup, name="audio-setup", daemon=True)
+        self.setup_thread.start()
         
     def setup_audio(self):
         """Initialize pygame mixer for audio playback"""
         try:
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+            import pygame
+            
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=MIXER_BUFFER)
             self.initialized = True
+            
+            # Reserve a fixed set of channels for the engine so playback never
+            # has to search for (or steal) a free one
+            pygame.mixer.set_num_channels(max(NUM_CHANNELS, pygame.mixer.get_num_channels()))
+            pygame.mixer.set_reserved(NUM_CHANNELS)
+            self.channels = [pygame.mixer.Channel(i) for i in range(NUM_CHANNELS)]
+            
             self.load_sounds()
+            self.build_tone_cache()
+            self.start_worker()
             print("Audio system initialized successfully")
         except Exception as e:
             print(f"Audio initialization failed: {e}. Running without sound.")
@@ -37,12 +83,68 @@ class AudioManager:
         except Exception as e:
             print(f"Sound generation failed: {e}")
     
+    def tone_frequency(self, pitch):
+        """Frequency of a quantized pitch index"""
+        return tone_frequency(pitch)
+    
+    def synthesize_tones(self, pitches):
+        """Synthesize a batch of short tones as one NumPy array operation"""
+        import numpy as np
+        import pygame
+        
+        n_samples = int(SAMPLE_RATE * TONE_DURATION)
+        t = np.arange(n_samples) / SAMPLE_RATE
+        freqs = np.array([self.tone_frequency(p) for p in pitches])
+        waves = 0.4 * np.sin(2 * np.pi * freqs[:, None] * t[None, :])
+        
+        # Short linear attack/release to avoid clicks
+        fade_samples = int(SAMPLE_RATE * TONE_FADE)
+        envelope = np.ones(n_samples)
+        envelope[:fade_samples] = np.linspace(0, 1, fade_samples)
+        envelope[-fade_samples:] = np.linspace(1, 0, fade_samples)
+        waves = (waves * envelope * 32767).astype(np.int16)
+        
+        return [pygame.sndarray.make_sound(np.ascontiguousarray(np.column_stack((w, w))))
+                for w in waves]
+    
+    def build_tone_cache(self):
+        """Precompute the value-mapped tones so none are synthesized while sorting"""
+        try:
+            start = time.perf_counter()
+            pitches = list(range(min(TONE_PITCHES, TONE_CACHE_SIZE)))
+            for pitch, sound in zip(pitches, self.synthesize_tones(pitches)):
+                self.tones[pitch] = sound
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            size = sum(sound.get_length() for sound in self.tones.values()) * SAMPLE_RATE * 4
+            print(f"Tone cache built: {len(self.tones)} tones in {elapsed_ms:.1f} ms, "
+                  f"{size / 1024:.0f} KiB")
+        except Exception as e:
+            print(f"Tone cache generation failed: {e}")
+    
+    def get_tone(self, pitch):
+        """Look up a tone, synthesizing and evicting LRU entries on a miss"""
+        sound = self.tones.get(pitch)
+        if sound is not None:
+            self.tones.move_to_end(pitch)
+            return sound
+        try:
+            sound = self.synthesize_tones([pitch])[0]
+        except Exception as e:
+            print(f"Tone generation failed: {e}")
+            return None
+        self.tones[pitch] = sound
+        while len(self.tones) > TONE_CACHE_SIZE:
+            self.tones.popitem(last=False)
+        return sound
+    
     def generate_beep(self, frequency, duration):
         """Generate a simple beep sound"""
         try:
             import numpy as np
+            import pygame
             
-            sample_rate = 22050
+            sample_rate = SAMPLE_RATE
             n_samples = int(sample_rate * duration)
             
             # Create a sine wave
@@ -74,8 +176,9 @@ class AudioManager:
         """Generate a success sound"""
         try:
             import numpy as np
+            import pygame
             
-            sample_rate = 22050
+            sample_rate = SAMPLE_RATE
             duration = 0.5
             n_samples = int(sample_rate * duration)
             
@@ -109,32 +212,93 @@ class AudioManager:
             print(f"Success sound generation failed: {e}")
             return None
     
+    def start_worker(self):
+        """Start the single long-lived playback thread"""
+        self.stop_event.clear()
+        self.worker = threading.Thread(target=self.audio_loop, daemon=True)
+        self.worker.start()
+    
+    def audio_loop(self):
+        """Play queued sounds once per audio frame.
+        
+        Everything requested during a frame is coalesced: each distinct sound
+        plays at most once, and only the most recent NUM_CHANNELS of them.
+        """
+        while not self.stop_event.wait(AUDIO_FRAME):
+            if not self.queue:
+                continue
+                
+            pending = {}
+            for _ in range(len(self.queue)):
+                try:
+                    key = self.queue.popleft()
+                except IndexError:
+                    break
+                # Re-inserting moves the key to the end, keeping newest last
+                pending.pop(key, None)
+                pending[key] = True
+                
+            for key in list(pending)[-NUM_CHANNELS:]:
+                # Integer keys are tone pitches, strings are named effects
+                sound = self.get_tone(key) if isinstance(key, int) else self.sounds.get(key)
+                if sound is None:
+                    continue
+                try:
+                    self.channels[self.next_channel].play(sound)
+                except Exception as e:
+                    print(f"Error playing sound {key}: {e}")
+                self.next_channel = (self.next_channel + 1) % len(self.channels)
+    
     def play_sound(self, sound_type):
-        """Play a sound effect in a separate thread"""
+        """Queue a sound effect for the audio worker.
+        
+        Never blocks: when the queue is full the request is dropped.
+        """
         if not self.enabled or not self.initialized:
             return
             
-        def play():
-            try:
-                if sound_type in self.sounds and self.sounds[sound_type]:
-                    self.sounds[sound_type].play()
-            except Exception as e:
-                print(f"Error playing sound {sound_type}: {e}")
+        # deque.append is atomic, so the sort thread needs no lock here
+        if len(self.queue) < QUEUE_SIZE:
+            self.queue.append(sound_type)
+        else:
+            self.dropped += 1
+    
+    def play_value(self, value, max_value):
+        """Queue a tone whose pitch follows ``value`` within 0..max_value"""
+        if max_value <= 0:
+            return
+        self.play_sound(value_pitch(value, max_value))
+    
+    def toggle_value_pitch(self, enabled=None):
+        """Switch between value-mapped tones and the fixed effect sounds"""
+        if enabled is None:
+            self.value_pitch = not self.value_pitch
+        else:
+            self.value_pitch = enabled
         
-        # Play sound in separate thread to avoid blocking
-        thread = threading.Thread(target=play, daemon=True)
-        thread.start()
+        return self.value_pitch
     
     def toggle_sound(self, enabled=None):
         """Enable or disable sound effects"""
         if enabled is None:
             self.enabled = not self.enabled
         else:
-            self.enabled = enabled and self.initialized
+            # While a background setup is still running, keep the choice
+            loading = self.setup_thread is not None and self.setup_thread.is_alive()
+            self.enabled = enabled and (self.initialized or loading)
         
         return self.enabled
     
     def cleanup(self):
         """Clean up audio resources"""
+        # Let a background setup finish so it does not start the worker afterwards
+        if self.setup_thread is not None:
+            self.setup_thread.join(timeout=1.0)
+        self.stop_event.set()
+        if self.worker is not None:
+            self.worker.join(timeout=0.5)
+            self.worker = None
+        self.queue.clear()
         if self.initialized:
+            import pygame
             pygame.mixer.quit()
\ No newline at end of file
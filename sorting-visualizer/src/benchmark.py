@@ -0,0 +1,202 @@
+"""
+Headless benchmark for the sorting algorithms.
+
+Every algorithm is timed three ways per case: the fast path (plain in-place
+sort from ``src.fast_sorts``), the instrumented path (draining the step-event
+generator from ``SortingAlgorithms``), so the difference is the cost of step
+emission, and the counting path (``src.counting``), which derives the exact
+comparison and swap counts without sorting step by step. No Tk window or
+audio is involved. Inputs come from ``src.datasets``, so a (distribution,
+size, seed) case is the same across runs and large ones load from its cache.
+
+With --record the timing samples are also stored in the benchmark history
+database under the current commit (see ``src.perfdb``).
+
+Run from the sorting-visualizer directory:
+    python -m src.benchmark --sizes 10 1000 100000 --repeats 5 --json results.json
+    python -m src.benchmark --sizes 1000 10000 100000 --record
+"""
+
+import argparse
+import csv
+import json
+import statistics
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from src.datasets import DISTRIBUTIONS, load_dataset
+from src.registry import registry
+from src.sorting_algorithms import SortingAlgorithms, PARALLEL_WORKERS, PIVOT_STRATEGIES
+
+# O(n^2) algorithms are only timed up to this size
+MAX_QUADRATIC_SIZE = 20000
+
+FIELDS = ["algorithm", "distribution", "size", "path", "repeats",
+          "median_ns", "p95_ns", "min_ns", "comparisons", "swaps"]
+
+
+def percentile(samples: List[int], pct: float) -> int:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def time_path(run: Callable[[List[int]], None], data: List[int],
+              repeats: int, warmup: int) -> List[int]:
+    """Time ``run`` on fresh copies of ``data``; copying is not timed"""
+    for _ in range(warmup):
+        run(data.copy())
+
+    samples = []
+    for _ in range(repeats):
+        work = data.copy()
+        start = time.perf_counter_ns()
+        run(work)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def bench_case(name: str, distribution: str, size: int, repeats: int,
+               warmup: int, seed: int, options: Optional[Dict] = None,
+               cache: bool = True) -> List[Dict]:
+    """Benchmark every path of one algorithm on one input"""
+    spec = registry.get(name)
+    options = spec.accepted(options or {})
+    data = load_dataset(distribution, size, seed, cache).tolist()
+    sorting = SortingAlgorithms()
+    counts = None
+    rows = []
+
+    def fast(work):
+        spec.fast(work, **options)
+
+    def instrumented(work):
+        deque(spec.steps(sorting, work, **options), maxlen=0)
+
+    def counting(work):
+        nonlocal counts
+        counts = spec.count(work, **options)
+
+    for path, run in (("fast", fast), ("instrumented", instrumented), ("counting", counting)):
+        samples = time_path(run, data, repeats, warmup)
+        row = {"algorithm": name, "distribution": distribution, "size": size,
+               "path": path, "repeats": repeats, "median_ns": int(statistics.median(samples)),
+               "p95_ns": percentile(samples, 95), "min_ns": min(samples), "samples": samples}
+        if path == "instrumented":
+            row.update(comparisons=sorting.comparisons, swaps=sorting.swaps)
+        elif path == "counting":
+            row.update(comparisons=counts[0], swaps=counts[1])
+        rows.append(row)
+    return rows
+
+
+def measure_counters(name: str, data: List[int], options: Optional[Dict] = None,
+                     max_quadratic_size: Optional[int] = MAX_QUADRATIC_SIZE) -> Dict:
+    """Exact counters of one algorithm plus the time of its fast path.
+
+    The counts come from ``src.counting``, so no step stream is generated.
+    O(n^2) algorithms above ``max_quadratic_size`` only report their counts
+    (``time`` is None). Module level so it can be submitted to a process pool.
+    """
+    spec = registry.get(name)
+    options = spec.accepted(options or {})
+    comparisons, swaps = spec.count(data, **options)
+    result = {'algorithm': name, 'time': None, 'comparisons': comparisons, 'swaps': swaps}
+    if spec.quadratic and max_quadratic_size is not None and len(data) > max_quadratic_size:
+        return result
+    work = list(data)
+    start = time.perf_counter()
+    spec.fast(work, **options)
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def run_benchmark(algorithms: List[str], sizes: List[int], distributions: List[str],
+                  repeats: int = 5, warmup: int = 1, seed: int = 0,
+                  max_quadratic_size: int = MAX_QUADRATIC_SIZE, progress: bool = True,
+                  options: Optional[Dict] = None, cache: bool = True) -> List[Dict]:
+    results = []
+    for name in algorithms:
+        quadratic = registry.get(name).quadratic
+        for distribution in distributions:
+            for size in sizes:
+                if quadratic and size > max_quadratic_size:
+                    continue
+                rows = bench_case(name, distribution, size, repeats, warmup, seed, options, cache)
+                results.extend(rows)
+                if progress:
+                    print_rows(rows)
+    return results
+
+
+def print_rows(rows: List[Dict]):
+    for row in rows:
+        print(f"{row['algorithm']:{registry.name_width()}} | {row['distribution']:13} | {row['size']:>8} | "
+              f"{row['path']:12} | median {row['median_ns'] / 1e6:10.3f} ms | "
+              f"p95 {row['p95_ns'] / 1e6:10.3f} ms")
+
+
+def write_json(results: List[Dict], path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def write_csv(results: List[Dict], path: str, fields: List[str] = FIELDS):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in results:
+            writer.writerow({field: row.get(field, "") for field in fields})
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the sorting algorithms headlessly")
+    parser.add_argument("--algorithms", nargs="+", default=registry.names(),
+                        choices=registry.names(), metavar="NAME",
+                        help="algorithms to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--distributions", nargs="+", default=["random"], choices=DISTRIBUTIONS)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always regenerate inputs instead of using the dataset cache")
+    parser.add_argument("--pivot", default=PIVOT_STRATEGIES[0], choices=PIVOT_STRATEGIES,
+                        help="quick sort pivot strategy")
+    parser.add_argument("--workers", type=int, default=PARALLEL_WORKERS,
+                        help=f"worker processes of the parallel sorts (default: {PARALLEL_WORKERS})")
+    parser.add_argument("--max-quadratic-size", type=int, default=MAX_QUADRATIC_SIZE,
+                        help="skip O(n^2) algorithms above this size")
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--csv", help="write results to this CSV file")
+    parser.add_argument("--record", nargs="?", const="", metavar="DB",
+                        help="store the samples in the benchmark history (default database: "
+                             "see src.perfdb)")
+    parser.add_argument("--commit", help="commit to record the run under "
+                                         "(default: git describe --always --dirty)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.workers < 1:
+        raise SystemExit("error: --workers must be at least 1")
+    results = run_benchmark(args.algorithms, args.sizes, args.distributions,
+                            args.repeats, args.warmup, args.seed, args.max_quadratic_size,
+                            options={'pivot': args.pivot, 'workers': args.workers}, cache=not args.no_cache)
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.record is not None:
+        from src.perfdb import connect, current_commit, record_run
+        commit = args.commit or current_commit()
+        db = connect(args.record or None)
+        run_id = record_run(db, results, commit, args.seed)
+        db.close()
+        print(f"Recorded run {run_id} for {commit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Headless batch runs of the sorting algorithms, for servers and CI.
+
+Each job sorts one (algorithm, distribution, size, seed) input and reports
+the exact comparison and swap counts, the fast-path time and, when the step
+stream is generated, the number of steps and the time it took. A job can
+also record its steps as a ``.svt`` trace (``src.trace``) and render frames
+or a GIF (``src.export``). Jobs run in parallel worker processes. Neither
+tkinter nor pygame is imported, so no display or sound device is needed.
+
+Jobs come either from the command line (every combination of --algorithms,
+--sizes and --distributions) or from a JSON manifest:
+
+    {"defaults": {"distribution": "random", "seed": 1},
+     "jobs": [{"algorithm": "Merge Sort", "size": 100000},
+              {"algorithm": "Quick Sort", "size": 2000, "trace": "quick.svt",
+               "gif": "quick.gif", "duration": 10}]}
+
+A bare list of jobs is accepted too. Run from the sorting-visualizer directory:
+    python -m src.cli --algorithms "Merge Sort" "Heap Sort" --sizes 1000 100000 --json out.json
+    python -m src.cli --manifest jobs.json --workers 4 --csv out.csv
+"""
+
+import argparse
+import json
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from src.benchmark import write_csv, write_json
+from src.datasets import DISTRIBUTIONS, load_dataset
+from src.registry import registry
+from src.sorting_algorithms import SortingAlgorithms, PIVOT_STRATEGIES, GRANULARITIES
+
+JOB_DEFAULTS = {
+    "distribution": "random",
+    "seed": 0,
+    "pivot": PIVOT_STRATEGIES[0],
+    # None: generate the step stream only up to the algorithm's max_n
+    "steps": None,
+    # Which step events are generated, and one in how many (a trace needs them all)
+    "granularity": GRANULARITIES[0],
+    "every": 1,
+    "trace": None,
+    "frames": None,
+    "gif": None,
+    "duration": 20.0,
+    "fps": 30,
+    "width": 640,
+    "height": 360,
+}
+JOB_KEYS = {"algorithm", "size"} | set(JOB_DEFAULTS)
+
+FIELDS = ["algorithm", "distribution", "size", "seed", "comparisons", "swaps", "steps",
+          "fast_ms", "steps_ms", "sorted", "trace", "frames", "gif", "error"]
+
+
+def make_job(spec: Dict, defaults: Optional[Dict] = None) -> Dict:
+    """Validate one job description and fill in the defaults"""
+    job = dict(JOB_DEFAULTS, **(defaults or {}), **spec)
+    unknown = set(job) - JOB_KEYS
+    if unknown:
+        raise ValueError(f"Unknown job keys: {', '.join(sorted(unknown))}")
+    for key in ("algorithm", "size"):
+        if key not in job:
+            raise ValueError(f"Job is missing {key!r}: {spec}")
+    if job["algorithm"] not in registry:
+        raise ValueError(f"Unknown algorithm: {job['algorithm']}")
+    if job["distribution"] not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {job['distribution']}")
+    return job
+
+
+def load_manifest(path: str) -> List[Dict]:
+    with open(path) as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"jobs": manifest}
+    defaults = manifest.get("defaults", {})
+    return [make_job(spec, defaults) for spec in manifest.get("jobs", [])]
+
+
+def job_name(job: Dict) -> str:
+    """File-name friendly label, e.g. ``merge-sort-random-1000-0``"""
+    algorithm = "-".join(job["algorithm"].lower().split())
+    return f"{algorithm}-{job['distribution']}-{job['size']}-{job['seed']}"
+
+
+def make_parent(path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+
+def run_job(job: Dict) -> Dict:
+    """Run one job and return its result row.
+
+    Module level so it can be submitted to a process pool.
+    """
+    spec = registry.get(job["algorithm"])
+    options = spec.accepted({"pivot": job["pivot"]})
+    data = load_dataset(job["distribution"], job["size"], job["seed"])
+    row = {field: job.get(field) for field in ("algorithm", "distribution", "size", "seed")}
+
+    work = data.tolist()
+    start = time.perf_counter_ns()
+    spec.fast(work, **options)
+    row["fast_ms"] = (time.perf_counter_ns() - start) / 1e6
+    row["sorted"] = all(a <= b for a, b in zip(work, work[1:]))
+
+    steps = job["steps"]
+    if steps is None:
+        steps = registry.modes(job["algorithm"], job["size"])[1] == "animate"
+    if steps or job["trace"]:
+        sorting = SortingAlgorithms(granularity=job["granularity"], every=job["every"])
+        if job["trace"] and not sorting.lossless:
+            raise ValueError(f"A trace needs every write, not granularity "
+                             f"{job['granularity']!r} every {job['every']}")
+        work = array("i", data)
+        events = spec.steps(sorting, work, **options)
+        recorder = None
+        if job["trace"]:
+            from src.trace import TraceWriter
+            make_parent(job["trace"])
+            recorder = TraceWriter(job["trace"], job["algorithm"], job["seed"], work)
+            events = recorder.record(events)
+        start = time.perf_counter_ns()
+        try:
+            row["steps"] = sum(1 for _ in events)
+        finally:
+            if recorder is not None:
+                recorder.close()
+        row["steps_ms"] = (time.perf_counter_ns() - start) / 1e6
+        row["comparisons"], row["swaps"] = sorting.comparisons, sorting.swaps
+        row["sorted"] = row["sorted"] and all(a <= b for a, b in zip(work, work[1:]))
+        row["trace"] = job["trace"]
+    else:
+        row["comparisons"], row["swaps"] = spec.count(data.tolist(), **options)
+
+    if job["frames"] or job["gif"]:
+        # Imported here so jobs without frames never load Pillow
+        from src.export import export
+        if job["gif"]:
+            make_parent(job["gif"])
+        # Already inside a worker process, so render in this one
+        export(job["algorithm"], data, job["duration"], job["fps"], job["width"], job["height"],
+               gif=job["gif"], frames_dir=job["frames"], workers=1, options=options)
+        row["frames"], row["gif"] = job["frames"], job["gif"]
+    return row
+
+
+def run_jobs(jobs: List[Dict], workers: Optional[int] = None,
+             progress: bool = True) -> List[Dict]:
+    """Run ``jobs`` across ``workers`` processes; rows come back in job order"""
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    rows: List[Optional[Dict]] = [None] * len(jobs)
+    if progress:
+        print_header()
+
+    def finish(i: int, row: Dict):
+        rows[i] = row
+        if progress:
+            print_row(row)
+
+    def failed(job: Dict, error: BaseException) -> Dict:
+        row = {field: job.get(field) for field in ("algorithm", "distribution", "size", "seed")}
+        row["error"] = f"{type(error).__name__}: {error}"
+        return row
+
+    if workers <= 1:
+        for i, job in enumerate(jobs):
+            try:
+                finish(i, run_job(job))
+            except Exception as e:
+                finish(i, failed(job, e))
+        return rows
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            error = future.exception()
+            finish(i, failed(jobs[i], error) if error is not None else future.result())
+    return rows
+
+
+def print_header():
+    print(f"{'Algorithm':{registry.name_width()}} | {'Distribution':13} | {'Size':>8} | "
+          f"{'Comparisons':>15} | {'Swaps':>15} | {'Fast path':>17} | Steps")
+
+
+def print_row(row: Dict):
+    label = (f"{row['algorithm']:{registry.name_width()}} | {row['distribution']:13} | "
+             f"{row['size']:>8}")
+    if row.get("error"):
+        print(f"{label} | ERROR: {row['error'][:60]}")
+        return
+    steps = f"{row['steps']:>12,} steps in {row['steps_ms']:10.1f} ms" \
+        if row.get("steps") is not None else f"{'(counted)':>33}"
+    print(f"{label} | C {row['comparisons']:>13,} | S {row['swaps']:>13,} | "
+          f"fast {row['fast_ms']:9.2f} ms | {steps}" + ("" if row["sorted"] else " | NOT SORTED"))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run sorts headlessly, one job per input")
+    parser.add_argument("--manifest", help="JSON job manifest (instead of the options below)")
+    parser.add_argument("--algorithms", nargs="+", choices=registry.names(), metavar="NAME",
+                        help="algorithms to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000])
+    parser.add_argument("--distributions", nargs="+", default=["random"], choices=DISTRIBUTIONS)
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed")
+    parser.add_argument("--pivot", default=PIVOT_STRATEGIES[0], choices=PIVOT_STRATEGIES,
+                        help="quick sort pivot strategy")
+    steps = parser.add_mutually_exclusive_group()
+    steps.add_argument("--steps", action="store_true", default=None,
+                       help="always generate the step stream (default: up to each algorithm's max_n)")
+    steps.add_argument("--no-steps", dest="steps", action="store_false",
+                       help="only sort and count, never generate steps")
+    parser.add_argument("--granularity", default=GRANULARITIES[0], choices=GRANULARITIES,
+                        help="step events to generate: all, writes only, or pass boundaries")
+    parser.add_argument("--every", type=int, default=1, help="keep one in this many step events")
+    parser.add_argument("--trace-dir", help="record a .svt trace per job into this directory")
+    parser.add_argument("--frames-dir", help="render PNG frames per job into subdirectories here")
+    parser.add_argument("--gif-dir", help="render an animated GIF per job into this directory")
+    parser.add_argument("--duration", type=float, default=JOB_DEFAULTS["duration"],
+                        help="length of rendered clips in seconds")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--csv", help="write results to this CSV file")
+    return parser.parse_args(argv)
+
+
+def jobs_from_args(args: argparse.Namespace) -> List[Dict]:
+    if args.manifest:
+        return load_manifest(args.manifest)
+    jobs = []
+    for name in args.algorithms or registry.names():
+        for distribution in args.distributions:
+            for size in args.sizes:
+                job = make_job({"algorithm": name, "distribution": distribution, "size": size,
+                                "seed": args.seed, "pivot": args.pivot, "steps": args.steps,
+                                "granularity": args.granularity, "every": args.every,
+                                "duration": args.duration})
+                if args.trace_dir:
+                    job["trace"] = os.path.join(args.trace_dir, job_name(job) + ".svt")
+                if args.frames_dir:
+                    job["frames"] = os.path.join(args.frames_dir, job_name(job))
+                if args.gif_dir:
+                    job["gif"] = os.path.join(args.gif_dir, job_name(job) + ".gif")
+                jobs.append(job)
+    return jobs
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    try:
+        jobs = jobs_from_args(args)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"error: {e}")
+
+    start = time.perf_counter()
+    rows = run_jobs(jobs, args.workers)
+    failures = sum(1 for row in rows if row.get("error") or not row.get("sorted"))
+    print(f"{len(rows)} jobs in {time.perf_counter() - start:.2f} s, {failures} failed")
+    if args.json:
+        write_json(rows, args.json)
+    if args.csv:
+        write_csv(rows, args.csv, FIELDS)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
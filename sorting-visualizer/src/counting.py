@@ -0,0 +1,599 @@
+"""
+Counting-only execution of the algorithms in SortingAlgorithms.
+
+Each ``count_*`` function returns ``(comparisons, swaps)`` exactly as the
+matching step generator would report them, without producing any steps.
+Where the counts have a closed form they are computed with NumPy:
+
+- bubble/insertion sort follow from per-element inversion counts, which are
+  gathered with a bottom-up merge in O(n log n);
+- selection sort swaps are n minus the number of permutation cycles;
+- merge sort only needs, per merge, the maxima of both halves and how many
+  elements of one half exceed the other half's maximum.
+
+Radix and counting sort make no comparisons and a fixed number of writes,
+and the bitonic network is applied one vectorized stage at a time. Quick,
+heap, Timsort, introsort and Shell sort depend on the evolving array, so they
+run a plain counting loop with no generator in between.
+"""
+
+import heapq
+import random
+from typing import Sequence, Tuple
+import numpy as np
+from src.sorting_algorithms import (INTRO_THRESHOLD, MIN_GALLOP, PIVOT_SEED, PIVOT_STRATEGIES,
+                                    RADIX_BITS, bitonic_pairs, min_run, shell_gaps)
+
+Counts = Tuple[int, int]
+
+
+def _dense_ranks(data: Sequence[int]) -> np.ndarray:
+    return np.unique(np.asarray(data), return_inverse=True)[1].astype(np.int64).ravel()
+
+
+def left_greater_counts(data: Sequence[int]) -> np.ndarray:
+    """For every position, how many earlier elements are strictly greater"""
+    keys = _dense_ranks(data)
+    n = len(keys)
+    counts = np.zeros(n, dtype=np.int64)
+    order = np.arange(n)
+    positions = np.arange(n)
+    stride = n + 1
+    index_bits = max(n.bit_length(), 1)
+    index_mask = (1 << index_bits) - 1
+
+    width = 1
+    while width < n:
+        block = positions // width
+        pair = block // 2
+        is_right = (block % 2) == 1
+        offsets = pair * stride
+
+        # Left blocks are sorted, so offsetting each pair apart gives one
+        # globally sorted array that a single searchsorted can query
+        left_keys = (keys + offsets)[~is_right]
+        right_pair = pair[is_right]
+        right_keys = keys[is_right] + offsets[is_right]
+        left_start = np.searchsorted(left_keys, right_pair * stride, side='left')
+        not_greater = np.searchsorted(left_keys, right_keys, side='right') - left_start
+        counts[order[is_right]] += width - not_greater
+
+        # Merge each pair. Packing (pair, key, original index) into one int
+        # keeps the merge stable with a plain sort and no gathers
+        packed = np.sort(((keys + offsets) << index_bits) | order)
+        order = packed & index_mask
+        keys = (packed >> index_bits) - offsets
+        width *= 2
+
+    return counts
+
+
+def count_bubble_sort(data: Sequence[int]) -> Counts:
+    n = len(data)
+    if n == 0:
+        return 0, 0
+    left_greater = left_greater_counts(data)
+    # Each pass moves every element with a greater element on its left one
+    # step left, so the sort takes max(left_greater) passes plus a final
+    # pass that finds nothing to swap
+    passes = min(int(left_greater.max()) + 1, n)
+    comparisons = passes * (n - 1) - passes * (passes - 1) // 2
+    return comparisons, int(left_greater.sum())
+
+
+def count_insertion_sort(data: Sequence[int]) -> Counts:
+    n = len(data)
+    if n == 0:
+        return 0, 0
+    inversions = int(left_greater_counts(data).sum())
+    # One shift per inversion plus the final write of each key
+    return inversions, inversions + n - 1
+
+
+def count_selection_sort(data: Sequence[int]) -> Counts:
+    n = len(data)
+    comparisons = n * (n - 1) // 2
+    if n == 0:
+        return 0, 0
+
+    values = np.asarray(data)
+    if len(np.unique(values)) == n:
+        # Every swap puts one element home and splits its cycle in two
+        target = np.empty(n, dtype=np.int64)
+        target[np.argsort(values, kind='stable')] = np.arange(n)
+        # Pointer doubling: after log2(n) rounds every position knows the
+        # smallest index on its cycle, and each cycle has one such leader
+        labels = np.arange(n)
+        jump = target
+        reach = 1
+        while reach < n:
+            labels = np.minimum(labels, labels[jump])
+            jump = jump[jump]
+            reach *= 2
+        cycles = int(np.count_nonzero(labels == np.arange(n)))
+        return comparisons, n - cycles
+
+    # With duplicates the first minimum depends on earlier swaps; replay
+    # the selections with a lazily pruned (value, position) heap
+    arr = list(data)
+    heap = [(v, i) for i, v in enumerate(arr)]
+    heapq.heapify(heap)
+    swaps = 0
+    for i in range(n):
+        while True:
+            v, pos = heap[0]
+            if pos >= i and arr[pos] == v:
+                break
+            heapq.heappop(heap)
+        if pos != i:
+            arr[i], arr[pos] = arr[pos], arr[i]
+            heapq.heappush(heap, (arr[pos], pos))
+            swaps += 1
+    return comparisons, swaps
+
+
+def count_merge_sort(data: Sequence[int]) -> Counts:
+    values = np.asarray(data, dtype=np.int64)
+    n = len(values)
+    comparisons = swaps = 0
+
+    # One vectorized pass per bottom-up level; a merge's counts depend only
+    # on which elements each run holds, which is fixed by the original data
+    width = 1
+    while width < n:
+        lefts = np.arange(0, n - width, 2 * width, dtype=np.int64)
+        mids = lefts + width - 1
+        rights = np.minimum(lefts + 2 * width - 1, n - 1)
+        len_left = mids - lefts + 1
+        len_right = rights - mids
+
+        # Runs at one level are disjoint and in order, so gathering their
+        # elements keeps each half contiguous for reduceat
+        starts = np.stack((lefts, mids + 1), axis=1).ravel()
+        lengths = np.stack((len_left, len_right), axis=1).ravel()
+        bounds = np.concatenate(([0], np.cumsum(lengths)))
+        gather = np.repeat(starts - bounds[:-1], lengths) + np.arange(bounds[-1])
+        segment = values[gather]
+
+        maxima = np.maximum.reduceat(segment, bounds[:-1])
+        max_left, max_right = maxima[0::2], maxima[1::2]
+        # Threshold for each element: the other half's maximum
+        thresholds = np.repeat(np.stack((max_right, max_left), axis=1).ravel(), lengths)
+        half = np.repeat(np.arange(len(lengths)) % 2, lengths)
+        beyond = np.where(half == 0, segment > thresholds, segment >= thresholds)
+        tails = np.add.reduceat(beyond.astype(np.int64), bounds[:-1])
+        tail_left, tail_right = tails[0::2], tails[1::2]
+
+        # The half holding the smaller maximum runs out first; whatever is
+        # left of the other half is copied without comparisons
+        left_first = max_left <= max_right
+        tail = np.where(left_first, tail_right, tail_left)
+        comparisons += int((len_left + len_right - tail).sum())
+        swaps += int((len_right + np.where(left_first, 0, tail)).sum())
+        width *= 2
+
+    return comparisons, swaps
+
+
+def count_quick_sort(data: Sequence[int], pivot: str = 'median3') -> Counts:
+    if pivot not in PIVOT_STRATEGIES:
+        raise ValueError(f"Unknown pivot strategy: {pivot}")
+    arr = list(data)
+    comparisons = swaps = 0
+    rng = random.Random(PIVOT_SEED)
+    stack = [(0, len(arr) - 1)]
+    while stack:
+        low, high = stack.pop()
+        if low >= high:
+            continue
+
+        if pivot == 'last':
+            p = high
+        elif pivot == 'first':
+            p = low
+        elif pivot == 'middle':
+            p = (low + high) // 2
+        elif pivot == 'random':
+            p = rng.randint(low, high)
+        else:
+            mid = (low + high) // 2
+            small, large = (low, mid) if arr[low] <= arr[mid] else (mid, low)
+            if arr[large] <= arr[high]:
+                p = large
+                comparisons += 2
+            else:
+                p = high if arr[small] <= arr[high] else small
+                comparisons += 3
+        if p != high:
+            arr[p], arr[high] = arr[high], arr[p]
+            swaps += 1
+
+        pivot_value = arr[high]
+        i = low - 1
+        for j in range(low, high):
+            if arr[j] <= pivot_value:
+                i += 1
+                if i != j:
+                    arr[i], arr[j] = arr[j], arr[i]
+                    swaps += 1
+        comparisons += high - low
+        if i + 1 != high:
+            arr[i + 1], arr[high] = arr[high], arr[i + 1]
+            swaps += 1
+
+        # Same order as the generator, so 'random' draws the same pivots
+        pi = i + 1
+        if pi - low < high - pi:
+            stack.append((pi + 1, high))
+            stack.append((low, pi - 1))
+        else:
+            stack.append((low, pi - 1))
+            stack.append((pi + 1, high))
+    return comparisons, swaps
+
+
+def count_heap_sort(data: Sequence[int]) -> Counts:
+    arr = list(data)
+    n = len(arr)
+    comparisons = swaps = 0
+
+    def sift(size, i):
+        nonlocal comparisons, swaps
+        while True:
+            largest = i
+            left = 2 * i + 1
+            right = left + 1
+            if left < size:
+                comparisons += 1
+                if arr[left] > arr[largest]:
+                    largest = left
+            if right < size:
+                comparisons += 1
+                if arr[right] > arr[largest]:
+                    largest = right
+            if largest == i:
+                return
+            arr[i], arr[largest] = arr[largest], arr[i]
+            swaps += 1
+            i = largest
+
+    for i in range(n // 2 - 1, -1, -1):
+        sift(n, i)
+    for i in range(n - 1, 0, -1):
+        arr[i], arr[0] = arr[0], arr[i]
+        swaps += 1
+        sift(i, 0)
+    return comparisons, swaps
+
+
+def count_timsort(data: Sequence[int]) -> Counts:
+    arr = list(data)
+    n = len(arr)
+    comparisons = swaps = 0
+    runs = []
+    min_gallop = MIN_GALLOP
+
+    def gallop(key, seq, base, length, hint, right):
+        nonlocal comparisons
+
+        def before(x):
+            nonlocal comparisons
+            comparisons += 1
+            return key < x if right else not x < key
+
+        last, ofs = 0, 1
+        if before(seq[base + hint]):
+            max_ofs = hint + 1
+            while ofs < max_ofs and before(seq[base + hint - ofs]):
+                last, ofs = ofs, (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last, ofs = hint - ofs, hint - last
+        else:
+            max_ofs = length - hint
+            while ofs < max_ofs and not before(seq[base + hint + ofs]):
+                last, ofs = ofs, (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last, ofs = last + hint, ofs + hint
+        last += 1
+        while last < ofs:
+            m = last + ((ofs - last) >> 1)
+            if before(seq[base + m]):
+                ofs = m
+            else:
+                last = m + 1
+        return ofs
+
+    def count_run(lo):
+        nonlocal comparisons, swaps
+        hi = lo + 1
+        if hi == n:
+            return 1
+        comparisons += 1
+        if arr[hi] < arr[lo]:
+            hi += 1
+            while hi < n:
+                comparisons += 1
+                if not arr[hi] < arr[hi - 1]:
+                    break
+                hi += 1
+            arr[lo:hi] = arr[lo:hi][::-1]
+            swaps += (hi - lo) // 2
+        else:
+            hi += 1
+            while hi < n:
+                comparisons += 1
+                if arr[hi] < arr[hi - 1]:
+                    break
+                hi += 1
+        return hi - lo
+
+    def binary_insertion(lo, hi, start):
+        nonlocal comparisons, swaps
+        for i in range(start, hi):
+            pivot = arr[i]
+            left, right = lo, i
+            while left < right:
+                mid = (left + right) // 2
+                comparisons += 1
+                if pivot < arr[mid]:
+                    right = mid
+                else:
+                    left = mid + 1
+            if left != i:
+                arr[left + 1:i + 1] = arr[left:i]
+                arr[left] = pivot
+                swaps += i - left + 1
+
+    def merge_at(i):
+        nonlocal comparisons, swaps, min_gallop
+        base1, len1 = runs[i]
+        base2, len2 = runs[i + 1]
+        runs[i] = [base1, len1 + len2]
+        del runs[i + 1]
+
+        k = gallop(arr[base2], arr, base1, len1, 0, True)
+        base1 += k
+        len1 -= k
+        if len1 == 0:
+            return
+        len2 = gallop(arr[base1 + len1 - 1], arr, base2, len2, len2 - 1, False)
+        if len2 == 0:
+            return
+
+        tmp = arr[base1:base1 + len1]
+        i, j, k = 0, base2, base1
+        end2 = base2 + len2
+        while i < len1 and j < end2:
+            count1 = count2 = 0
+            while i < len1 and j < end2:
+                comparisons += 1
+                if arr[j] < tmp[i]:
+                    arr[k] = arr[j]
+                    j += 1
+                    count1, count2 = 0, count2 + 1
+                else:
+                    arr[k] = tmp[i]
+                    i += 1
+                    count1, count2 = count1 + 1, 0
+                swaps += 1
+                k += 1
+                if count1 >= min_gallop or count2 >= min_gallop:
+                    break
+
+            min_gallop += 1
+            while i < len1 and j < end2:
+                min_gallop -= min_gallop > 1
+                count1 = gallop(arr[j], tmp, i, len1 - i, 0, True)
+                arr[k:k + count1] = tmp[i:i + count1]
+                i += count1
+                k += count1
+                swaps += count1
+                if i == len1:
+                    break
+                arr[k] = arr[j]
+                j += 1
+                k += 1
+                swaps += 1
+                if j == end2:
+                    break
+                count2 = gallop(tmp[i], arr, j, end2 - j, 0, False)
+                arr[k:k + count2] = arr[j:j + count2]
+                j += count2
+                k += count2
+                swaps += count2
+                if j == end2:
+                    break
+                arr[k] = tmp[i]
+                i += 1
+                k += 1
+                swaps += 1
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    break
+            min_gallop += 1
+
+        arr[k:k + len1 - i] = tmp[i:]
+        swaps += len1 - i
+
+    def merge_collapse():
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                    (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                break
+            merge_at(i)
+
+    run_min = min_run(n)
+    lo = 0
+    while lo < n:
+        run_len = count_run(lo)
+        if run_len < run_min:
+            force = min(run_min, n - lo)
+            binary_insertion(lo, lo + force, lo + run_len)
+            run_len = force
+        runs.append([lo, run_len])
+        merge_collapse()
+        lo += run_len
+
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        merge_at(i)
+    return comparisons, swaps
+
+
+def count_introsort(data: Sequence[int]) -> Counts:
+    arr = list(data)
+    n = len(arr)
+    comparisons = swaps = 0
+
+    def sift(lo, size, i):
+        nonlocal comparisons, swaps
+        while True:
+            largest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size:
+                    comparisons += 1
+                    if arr[lo + child] > arr[lo + largest]:
+                        largest = child
+            if largest == i:
+                return
+            arr[lo + i], arr[lo + largest] = arr[lo + largest], arr[lo + i]
+            swaps += 1
+            i = largest
+
+    def heap_range(lo, hi):
+        nonlocal swaps
+        size = hi - lo + 1
+        for i in range(size // 2 - 1, -1, -1):
+            sift(lo, size, i)
+        for end in range(size - 1, 0, -1):
+            arr[lo], arr[lo + end] = arr[lo + end], arr[lo]
+            swaps += 1
+            sift(lo, end, 0)
+
+    def insertion_range(lo, hi):
+        nonlocal comparisons, swaps
+        for i in range(lo + 1, hi + 1):
+            key = arr[i]
+            j = i - 1
+            while j >= lo:
+                comparisons += 1
+                if not arr[j] > key:
+                    break
+                arr[j + 1] = arr[j]
+                swaps += 1
+                j -= 1
+            if j + 1 != i:
+                arr[j + 1] = key
+                swaps += 1
+
+    def order(i, j):
+        nonlocal comparisons, swaps
+        comparisons += 1
+        if arr[j] < arr[i]:
+            arr[i], arr[j] = arr[j], arr[i]
+            swaps += 1
+
+    def partition(lo, hi):
+        nonlocal comparisons, swaps
+        mid = (lo + hi) // 2
+        order(lo, mid)
+        order(lo, hi)
+        order(mid, hi)
+        pivot = arr[mid]
+
+        i, j = lo, hi
+        while True:
+            i += 1
+            comparisons += 1
+            while arr[i] < pivot:
+                i += 1
+                comparisons += 1
+            j -= 1
+            comparisons += 1
+            while pivot < arr[j]:
+                j -= 1
+                comparisons += 1
+            if i >= j:
+                return j
+            arr[i], arr[j] = arr[j], arr[i]
+            swaps += 1
+
+    stack = [(0, n - 1, 2 * max(n, 1).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo < INTRO_THRESHOLD:
+            if lo < hi:
+                insertion_range(lo, hi)
+        elif depth == 0:
+            heap_range(lo, hi)
+        else:
+            split = partition(lo, hi)
+            stack.append((split + 1, hi, depth - 1))
+            stack.append((lo, split, depth - 1))
+    return comparisons, swaps
+
+
+def count_radix_sort(data: Sequence[int]) -> Counts:
+    if len(data) == 0:
+        return 0, 0
+    values = np.asarray(data, dtype=np.int64)
+    span = int(values.max() - values.min())
+    # Every pass rewrites the whole array
+    passes = -(-span.bit_length() // RADIX_BITS)
+    return 0, passes * len(values)
+
+
+def count_counting_sort(data: Sequence[int]) -> Counts:
+    return 0, len(data)
+
+
+def count_shell_sort(data: Sequence[int]) -> Counts:
+    arr = list(data)
+    n = len(arr)
+    comparisons = swaps = 0
+    for gap in shell_gaps(n):
+        for i in range(gap, n):
+            key = arr[i]
+            j = i
+            while j >= gap:
+                comparisons += 1
+                if not arr[j - gap] > key:
+                    break
+                arr[j] = arr[j - gap]
+                swaps += 1
+                j -= gap
+            if j != i:
+                arr[j] = key
+                swaps += 1
+    return comparisons, swaps
+
+
+def count_bitonic_sort(data: Sequence[int]) -> Counts:
+    values = np.asarray(data, dtype=np.int64).copy()
+    n = len(values)
+    comparisons = swaps = 0
+    positions = np.arange(n)
+    for k, j in bitonic_pairs(n):
+        # Comparators within a stage are disjoint, so one stage is one
+        # vectorized compare-exchange
+        flip = k - 1 if j == k // 2 else j
+        partners = positions ^ flip
+        lower = positions[(positions < partners) & (partners < n)]
+        upper = lower ^ flip
+        exchange = values[lower] > values[upper]
+        comparisons += len(lower)
+        swaps += int(np.count_nonzero(exchange))
+        lower, upper = lower[exchange], upper[exchange]
+        values[lower], values[upper] = values[upper], values[lower]
+    return comparisons, swaps
+
+
+def count_operations(algorithm: str, data: Sequence[int]) -> Counts:
+    """Exact (comparisons, swaps) the named algorithm performs on ``data``"""
+    from src.registry import registry
+    return registry.get(algorithm).count(data)
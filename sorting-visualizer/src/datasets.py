@@ -0,0 +1,124 @@
+"""
+Input distributions for the visualizer and the benchmark.
+
+Every generator is vectorized with NumPy and draws from a
+``numpy.random.Generator`` seeded by the caller, so a (distribution, size,
+seed) triple always names the same input. Values are positive int32 in
+``1..size`` (the renderers scale bar heights by the maximum):
+
+    random         a permutation of 1..n
+    sorted         1..n
+    reversed       n..1
+    nearly_sorted  1..n with 1% of the positions rotated among themselves
+    few_unique     FEW_UNIQUE distinct values, uniformly drawn
+    organ_pipe     rising to n at the middle, then falling again
+    sawtooth       SAWTOOTH_TEETH ascending runs
+    zipf           Zipf-distributed duplicates: value ranks r appear ~1/r^s often
+
+Inputs of at least CACHE_MIN_SIZE elements are cached as ``.npy`` files and
+memory-mapped on later loads, so large benchmark inputs cost no generation
+time across runs. The cache lives in ``$SORTING_VISUALIZER_CACHE`` or
+``~/.cache/sorting-visualizer/datasets``.
+"""
+
+import os
+import tempfile
+from typing import Callable, Dict
+import numpy as np
+
+FEW_UNIQUE = 8
+SAWTOOTH_TEETH = 8
+ZIPF_EXPONENT = 1.5
+# Fraction of positions nearly_sorted shuffles
+DISORDER = 0.01
+# Smaller inputs are generated faster than they load
+CACHE_MIN_SIZE = 100000
+CACHE_ENV = "SORTING_VISUALIZER_CACHE"
+
+Distribution = Callable[[int, np.random.Generator], np.ndarray]
+
+def _random(size: int, rng: np.random.Generator) -> np.ndarray:
+    return rng.permutation(size) + 1
+
+def _sorted(size: int, rng: np.random.Generator) -> np.ndarray:
+    return np.arange(1, size + 1)
+
+def _reversed(size: int, rng: np.random.Generator) -> np.ndarray:
+    return np.arange(size, 0, -1)
+
+def _nearly_sorted(size: int, rng: np.random.Generator) -> np.ndarray:
+    data = np.arange(1, size + 1)
+    positions = rng.choice(size, size=min(size, max(2, int(size * DISORDER))), replace=False)
+    # Rotating the chosen values guarantees every one of them moves
+    data[positions] = data[np.roll(positions, 1)]
+    return data
+
+def _few_unique(size: int, rng: np.random.Generator) -> np.ndarray:
+    return rng.integers(1, FEW_UNIQUE + 1, size)
+
+def _organ_pipe(size: int, rng: np.random.Generator) -> np.ndarray:
+    index = np.arange(size)
+    return 2 * np.minimum(index, size - 1 - index) + 1
+
+def _sawtooth(size: int, rng: np.random.Generator) -> np.ndarray:
+    period = max(1, -(-size // SAWTOOTH_TEETH))
+    return np.arange(size) % period * size // period + 1
+
+def _zipf(size: int, rng: np.random.Generator) -> np.ndarray:
+    ranks = np.minimum(rng.zipf(ZIPF_EXPONENT, size), size)
+    # Spread the frequent ranks over the value range
+    return rng.permutation(size)[ranks - 1] + 1
+
+GENERATORS: Dict[str, Distribution] = {
+    "random": _random,
+    "sorted": _sorted,
+    "reversed": _reversed,
+    "nearly_sorted": _nearly_sorted,
+    "few_unique": _few_unique,
+    "organ_pipe": _organ_pipe,
+    "sawtooth": _sawtooth,
+    "zipf": _zipf,
+}
+DISTRIBUTIONS = list(GENERATORS)
+
+def make_dataset(distribution: str, size: int, seed: int = 0) -> np.ndarray:
+    """Generate an int32 input without touching the cache"""
+    try:
+        generate = GENERATORS[distribution]
+    except KeyError:
+        raise ValueError(f"Unknown distribution: {distribution}") from None
+    return generate(size, np.random.default_rng(seed)).astype(np.int32)
+
+def cache_dir() -> str:
+    return os.environ.get(CACHE_ENV) or os.path.join(
+        os.path.expanduser("~"), ".cache", "sorting-visualizer", "datasets")
+
+def cache_path(distribution: str, size: int, seed: int) -> str:
+    return os.path.join(cache_dir(), f"{distribution}-{size}-{seed}.npy")
+
+def load_dataset(distribution: str, size: int, seed: int = 0, cache: bool = True) -> np.ndarray:
+    """The (distribution, size, seed) input; large ones come memory-mapped
+    (read-only) from the cache, generated and saved there on first use"""
+    if not cache or size < CACHE_MIN_SIZE:
+        return make_dataset(distribution, size, seed)
+    path = cache_path(distribution, size, seed)
+    try:
+        return np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+
+    data = make_dataset(distribution, size, seed)
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary name first so concurrent runs never read a
+        # half-written file
+        fd, tmp = tempfile.mkstemp(suffix=".npy", dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Not caching dataset {os.path.basename(path)}: {e}")
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+    return data
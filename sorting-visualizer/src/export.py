@@ -0,0 +1,319 @@
+"""
+Offline export of a sort as an animated GIF, PNG frames or an MP4, with a
+value-pitch soundtrack as WAV.
+
+The whole step stream is compressed into ``duration`` seconds at ``fps``:
+frame k shows the array after step ``k * steps / (frames - 1)``. A first
+pass counts the steps; a second records, at each frame boundary, the min and
+max of every image column's bucket (see ``src.raster``), the highlighted
+columns and the counters, so the recording costs O(frames x width) memory
+whatever the array size. Worker processes then turn chunks of frames into
+palette-coded pixels and captions, and the parent assembles the GIF or pipes
+the frames into ffmpeg. Neither Tk, matplotlib nor pygame is imported.
+
+The soundtrack samples AUDIO_VOICES evenly spaced steps per frame and plays
+each as a short tone whose pitch follows the value touched, as the live
+"Pitch" mode does (``src.tones``).
+
+Run from the sorting-visualizer directory:
+    python -m src.export "Merge Sort" --size 2000 --duration 60 --gif merge.gif --wav merge.wav
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import wave
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from src.datasets import DISTRIBUTIONS, load_dataset
+from src.raster import (BACKGROUND, RASTER_COLORS, column_buckets, column_extremes,
+                        columns_of, extreme_codes)
+from src.registry import registry
+from src.sorting_algorithms import SortingAlgorithms, PIVOT_STRATEGIES
+from src.step_events import COMPARE, SWAP, WRITE, event_highlights
+from src.tones import SAMPLE_RATE, TONE_FADE, TONE_PITCHES, tone_frequency, value_pitch
+
+CAPTION_HEIGHT = 22
+# Palette codes beyond the raster ones
+CAPTION_BACKGROUND, CAPTION_TEXT = len(RASTER_COLORS), len(RASTER_COLORS) + 1
+PALETTE = np.array([color[:3] for color in RASTER_COLORS] + [(44, 62, 80), (255, 255, 255)],
+                   dtype=np.uint8)
+# Frames handed to a worker at a time
+CHUNK_FRAMES = 48
+AUDIO_VOICES = 3
+AUDIO_AMPLITUDE = 0.3
+
+class Recording:
+    """Per-frame column extremes, highlights and counters of one sort"""
+
+    def __init__(self, name: str, size: int, steps: int, vmax: int, lows: np.ndarray,
+                 highs: np.ndarray, highlighted: np.ndarray, counters: np.ndarray,
+                 frame_steps: np.ndarray, pitches: np.ndarray):
+        self.name = name
+        self.size = size
+        self.steps = steps
+        self.vmax = vmax
+        self.lows = lows
+        self.highs = highs
+        self.highlighted = highlighted
+        self.counters = counters
+        self.frame_steps = frame_steps
+        self.pitches = pitches
+
+    def caption(self, k: int) -> str:
+        comparisons, swaps = self.counters[k]
+        return (f"{self.name}  n={self.size:,}  step {self.frame_steps[k]:,}/{self.steps:,}  "
+                f"comparisons {comparisons:,}  swaps {swaps:,}")
+
+def record(name: str, data, frames: int, width: int,
+           options: Optional[Dict] = None) -> Recording:
+    """Run ``name`` on ``data`` twice: once to count steps, once to sample
+    the state at every frame boundary and the audio voices in between"""
+    spec = registry.get(name)
+    options = spec.accepted(options or {})
+    total = sum(1 for _ in spec.steps(SortingAlgorithms(), array('i', data), **options))
+
+    work = array('i', data)
+    values = np.frombuffer(work, dtype=np.int32)
+    n = len(work)
+    vmax = max(int(values.max()) if n else 1, 1)
+    lo, hi = column_buckets(n, width)
+    lows = np.empty((frames, width), dtype=np.int32)
+    highs = np.empty((frames, width), dtype=np.int32)
+    highlighted = np.zeros((frames, width), dtype=bool)
+    counters = np.zeros((frames, 2), dtype=np.int64)
+    frame_steps = np.arange(frames, dtype=np.int64) * total // max(frames - 1, 1)
+    voices = frames * AUDIO_VOICES
+    marks = (np.arange(voices, dtype=np.int64) * total // voices + 1).tolist()
+    pitches = np.full(voices, -1, dtype=np.int16)
+    sorting = SortingAlgorithms()
+
+    def capture(k, event):
+        lows[k], highs[k] = column_extremes(values, lo)
+        if event is not None:
+            highlighted[k, columns_of(event_highlights(event), lo, hi, n)] = True
+        counters[k] = sorting.comparisons, sorting.swaps
+
+    boundaries = frame_steps.tolist() + [-1]
+    k = 0
+    while boundaries[k] == 0:
+        capture(k, None)
+        k += 1
+    voice = 0
+    marks.append(-1)
+    step = 0
+    for event in spec.steps(sorting, work, **options):
+        step += 1
+        while marks[voice] == step:
+            op, a, _ = event
+            if op in (COMPARE, SWAP, WRITE):
+                pitches[voice] = value_pitch(work[a], vmax)
+            voice += 1
+        while boundaries[k] == step:
+            # The last frame shows the sorted array without highlights
+            capture(k, event if step < total else None)
+            k += 1
+    return Recording(name, n, total, vmax, lows, highs, highlighted, counters,
+                     frame_steps, pitches)
+
+def render_chunk(job: Dict) -> List[bytes]:
+    """Render a chunk of frames to palette codes; writes PNGs when asked and
+    returns the zlib-compressed frames when the caller assembles a video.
+    Module level so it can be submitted to a process pool."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = job['width'], job['height']
+    plot_height = height - CAPTION_HEIGHT
+    palette = PALETTE.ravel().tolist()
+    # The bitmap font draws a caption in microseconds; FreeType takes milliseconds
+    font = getattr(ImageFont, 'load_default_imagefont', ImageFont.load_default)()
+    out = []
+    for i, k in enumerate(range(job['start'], job['start'] + len(job['lows']))):
+        codes = np.empty((height, width), dtype=np.uint8)
+        codes[:CAPTION_HEIGHT] = CAPTION_BACKGROUND
+        codes[CAPTION_HEIGHT:] = extreme_codes(job['lows'][i], job['highs'][i], plot_height,
+                                               job['vmax'], job['highlighted'][i])
+        image = Image.fromarray(codes)
+        image.putpalette(palette)
+        ImageDraw.Draw(image).text((6, 5), job['captions'][i], fill=CAPTION_TEXT,
+                                   font=font)
+        if job['frames_dir']:
+            image.save(os.path.join(job['frames_dir'], f"frame_{k:05d}.png"))
+        if job['keep']:
+            out.append(zlib.compress(image.tobytes(), 1))
+    return out
+
+def render_frames(recording: Recording, width: int, height: int, workers: int,
+                  frames_dir: Optional[str] = None, keep: bool = True) -> Iterator[np.ndarray]:
+    """Yield each frame's (height, width) palette codes in order, rendered
+    CHUNK_FRAMES at a time by ``workers`` processes"""
+    frames = len(recording.lows)
+    jobs = ({'start': start, 'width': width, 'height': height, 'vmax': recording.vmax,
+             'lows': recording.lows[start:start + CHUNK_FRAMES],
+             'highs': recording.highs[start:start + CHUNK_FRAMES],
+             'highlighted': recording.highlighted[start:start + CHUNK_FRAMES],
+             'captions': [recording.caption(k)
+                          for k in range(start, min(start + CHUNK_FRAMES, frames))],
+             'frames_dir': frames_dir, 'keep': keep}
+            for start in range(0, frames, CHUNK_FRAMES))
+    if workers <= 1:
+        chunks = map(render_chunk, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunks = executor.map(render_chunk, jobs)
+    try:
+        for chunk in chunks:
+            for frame in chunk:
+                yield np.frombuffer(zlib.decompress(frame), dtype=np.uint8).reshape(height, width)
+    finally:
+        if workers > 1:
+            executor.shutdown(cancel_futures=True)
+
+def synthesize(pitches: np.ndarray, seconds: float) -> np.ndarray:
+    """int16 mono soundtrack: one faded tone per voice slot, silence for -1"""
+    samples = int(round(seconds * SAMPLE_RATE))
+    starts = np.arange(len(pitches) + 1, dtype=np.int64) * samples // max(len(pitches), 1)
+    lengths = np.diff(starts)
+    slot = np.repeat(np.arange(len(pitches)), lengths)
+    local = np.arange(samples) - starts[slot]
+
+    table = np.array([tone_frequency(p) for p in range(TONE_PITCHES)])
+    freqs = table[np.maximum(pitches, 0)][slot]
+    tone = np.sin(2 * np.pi * freqs * local / SAMPLE_RATE)
+    fade = np.maximum(np.minimum(TONE_FADE * SAMPLE_RATE, lengths[slot] / 2), 1)
+    envelope = np.clip(np.minimum(local + 1, lengths[slot] - local) / fade, 0, 1)
+    envelope[pitches[slot] < 0] = 0
+    return (tone * envelope * AUDIO_AMPLITUDE * 32767).astype(np.int16)
+
+def write_wav(path: str, audio: np.ndarray):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(audio.tobytes())
+
+def write_gif(path: str, frames: Iterator[np.ndarray], fps: int):
+    from PIL import Image
+
+    palette = PALETTE.ravel().tolist()
+
+    def images():
+        for codes in frames:
+            image = Image.fromarray(codes)
+            image.putpalette(palette)
+            yield image
+    sequence = images()
+    first = next(sequence)
+    # GIF delays are in 10 ms units. The palette is already minimal, and
+    # Pillow's palette optimization would otherwise dominate the encode time
+    first.save(path, save_all=True, append_images=sequence, loop=0, optimize=False,
+               duration=max(2, round(100 / fps)) * 10)
+
+def write_mp4(path: str, frames: Iterator[np.ndarray], fps: int, width: int, height: int,
+              wav: Optional[str] = None):
+    """Pipe RGB frames (and the soundtrack, if any) into ffmpeg"""
+    command = ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+               '-s', f'{width}x{height}', '-r', str(fps), '-i', '-']
+    if wav:
+        command += ['-i', wav, '-c:a', 'aac']
+    command += ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-shortest', path]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        for codes in frames:
+            process.stdin.write(PALETTE[codes].tobytes())
+    finally:
+        process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg exited with status {process.returncode}")
+
+def export(name: str, data, duration: float = 20.0, fps: int = 30, width: int = 640,
+           height: int = 360, gif: Optional[str] = None, frames_dir: Optional[str] = None,
+           mp4: Optional[str] = None, wav: Optional[str] = None, workers: Optional[int] = None,
+           options: Optional[Dict] = None) -> Dict:
+    """Export one sort; returns the step count and time spent per stage"""
+    timings = {}
+    start = time.perf_counter()
+    frames = max(int(round(duration * fps)), 2)
+    recording = record(name, data, frames, width, options)
+    timings['record'] = time.perf_counter() - start
+
+    if mp4 and shutil.which('ffmpeg') is None:
+        print("ffmpeg not found; skipping MP4")
+        mp4 = None
+    soundtrack = wav
+    if mp4 and not wav:
+        # ffmpeg muxes the soundtrack from a file
+        fd, soundtrack = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+    if soundtrack:
+        start = time.perf_counter()
+        write_wav(soundtrack, synthesize(recording.pitches, frames / fps))
+        timings['audio'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if frames_dir:
+        os.makedirs(frames_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    try:
+        # One render pass per video; PNGs (if any) are written during the first
+        videos = [(write_gif, gif), (write_mp4, mp4)]
+        pending_frames = frames_dir
+        for write, path in videos:
+            if not path:
+                continue
+            stream = render_frames(recording, width, height, workers, pending_frames)
+            pending_frames = None
+            if write is write_gif:
+                write_gif(path, stream, fps)
+            else:
+                write_mp4(path, stream, fps, width, height, soundtrack)
+        if pending_frames:
+            for _ in render_frames(recording, width, height, workers, pending_frames, keep=False):
+                pass
+    finally:
+        if soundtrack and soundtrack != wav:
+            os.remove(soundtrack)
+    timings['render'] = time.perf_counter() - start
+    return {'steps': recording.steps, 'frames': frames, 'timings': timings}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export a sort as GIF/PNG frames/MP4 and WAV")
+    parser.add_argument("algorithm", choices=registry.names(), metavar="ALGORITHM")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--distribution", default="random", choices=DISTRIBUTIONS)
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed")
+    parser.add_argument("--pivot", default=PIVOT_STRATEGIES[0], choices=PIVOT_STRATEGIES,
+                        help="quick sort pivot strategy")
+    parser.add_argument("--duration", type=float, default=20.0, help="clip length in seconds")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--gif", help="write an animated GIF")
+    parser.add_argument("--frames", help="write PNG frames into this directory")
+    parser.add_argument("--mp4", help="write an MP4 (needs ffmpeg on PATH)")
+    parser.add_argument("--wav", help="write the value-pitch soundtrack")
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    if not (args.gif or args.frames or args.mp4 or args.wav):
+        parser.error("nothing to write: pass --gif, --frames, --mp4 and/or --wav")
+    if args.height <= CAPTION_HEIGHT or args.width < 1:
+        parser.error(f"frames must be at least 1x{CAPTION_HEIGHT + 1} pixels")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    data = load_dataset(args.distribution, args.size, args.seed)
+    result = export(args.algorithm, data, args.duration, args.fps, args.width, args.height,
+                    args.gif, args.frames, args.mp4, args.wav, args.workers,
+                    options={'pivot': args.pivot})
+    stages = ", ".join(f"{stage} {seconds:.2f} s" for stage, seconds in result['timings'].items())
+    print(f"{args.algorithm}: {result['steps']:,} steps in {result['frames']} frames ({stages})")
+
+if __name__ == "__main__":
+    main()
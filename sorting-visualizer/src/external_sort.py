@@ -0,0 +1,433 @@
+"""
+External merge sort of binary record files larger than memory.
+
+The input is a flat file of int32 or float64 records in native byte order,
+as ``ndarray.tofile`` writes them (float64 files must not contain NaN).
+Both phases stay within one memory budget:
+
+Run generation
+    the file is memory-mapped (``np.memmap``) and copied into RAM one chunk
+    at a time; each chunk is sorted and written out sequentially as a
+    sorted run in a temporary directory.
+Merging
+    up to ``fan_in`` runs are merged at a time, each read through its own
+    buffer, into one output buffer, until a single run is left. The runs
+    sit in a heap keyed by the last record of their buffered block. Every
+    buffered record up to the smallest key is final: it is moved to the
+    output in one vectorized step, and the runs whose blocks ran out read
+    their next block. All reads and writes are sequential, one buffer at a
+    time.
+
+``fan_in + 1`` buffers, plus as much again for the records moved in one
+step, must fit in the budget; more runs than the fan-in take several merge
+passes. ``ExternalSortProgress`` is updated after every block with the runs
+created, the merge pass and fan-in, the bytes read and written and the
+disk throughput in MB/s, so chunk and buffer sizes can be tuned against
+the disk. Run from the sorting-visualizer directory:
+    python -m src.external_sort data.bin sorted.bin --generate 500000000 --memory 512M --buffer 8M
+"""
+
+import argparse
+import heapq
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+DTYPES = ('int32', 'float64')
+DEFAULT_MEMORY = 256 << 20
+DEFAULT_BUFFER = 4 << 20
+SIZE_SUFFIXES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+class SortCancelled(Exception):
+    """Raised inside ``external_sort`` once its ``stop`` event is set"""
+
+class ExternalSortProgress:
+    """Counters of one external sort, updated after every block.
+
+    The sorting thread writes them and the UI reads them without locking;
+    each attribute is replaced whole, so a reader always sees a recent value.
+    """
+
+    def __init__(self, total_bytes: int, itemsize: int, chunk_bytes: int,
+                 buffer_bytes: int, fan_in: int):
+        self.total_bytes = total_bytes
+        self.itemsize = itemsize
+        self.chunk_bytes = chunk_bytes
+        self.buffer_bytes = buffer_bytes
+        self.fan_in = fan_in
+        self.phase = 'runs'
+        self.runs_total = -(-total_bytes // chunk_bytes)
+        self.runs_created = 0
+        self.passes_total = merge_passes(self.runs_total, fan_in)
+        self.merge_pass = 0
+        # Sizes and consumed bytes of the runs being merged right now
+        self.group: List[int] = []
+        self.consumed: List[int] = []
+        self.blocks = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        # Seconds spent inside reads and writes, for the disk throughput
+        self.read_seconds = 0.0
+        self.write_seconds = 0.0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def read_mbps(self) -> float:
+        return self.bytes_read / self.read_seconds / 1e6 if self.read_seconds else 0.0
+
+    @property
+    def write_mbps(self) -> float:
+        return self.bytes_written / self.write_seconds / 1e6 if self.write_seconds else 0.0
+
+    @property
+    def throughput_mbps(self) -> float:
+        """Input bytes sorted per second of wall time, so far"""
+        done = self.fraction * self.total_bytes
+        return done / self.elapsed / 1e6 if self.elapsed else 0.0
+
+    @property
+    def fraction(self) -> float:
+        """Share of the bytes every phase reads and writes that is done"""
+        if self.phase == 'done':
+            return 1.0
+        total = 2 * self.total_bytes * (1 + self.passes_total)
+        return min((self.bytes_read + self.bytes_written) / total, 1.0) if total else 0.0
+
+    def summary(self) -> str:
+        if self.phase == 'runs':
+            stage = f"Runs: {self.runs_created}/{self.runs_total}"
+        elif self.phase == 'merge':
+            stage = (f"Merge pass {self.merge_pass}/{self.passes_total}, "
+                     f"fan-in {len(self.group)}/{self.fan_in}")
+        else:
+            stage = f"Done: {self.runs_total} runs, {self.passes_total} merge passes"
+        return (f"{stage} | Read {self.bytes_read / 1e6:,.1f} MB "
+                f"({self.read_mbps:,.0f} MB/s) | Written {self.bytes_written / 1e6:,.1f} MB "
+                f"({self.write_mbps:,.0f} MB/s) | {self.throughput_mbps:,.1f} MB/s overall "
+                f"| {self.elapsed:.1f} s")
+
+def merge_passes(runs: int, fan_in: int) -> int:
+    passes = 0
+    while runs > 1:
+        runs = -(-runs // fan_in)
+        passes += 1
+    return passes
+
+def parse_size(text: str) -> int:
+    """Bytes in ``"4096"``, ``"64K"``, ``"8M"`` or ``"1G"``"""
+    text = text.strip().upper().rstrip('B')
+    scale = SIZE_SUFFIXES.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * scale)
+    except ValueError:
+        raise ValueError(f"Not a size: {text!r}") from None
+
+def plan(itemsize: int, memory: int, chunk: Optional[int] = None, buffer: Optional[int] = None,
+         fan_in: Optional[int] = None) -> Tuple[int, int, int]:
+    """(chunk_items, buffer_items, fan_in) for a memory budget in bytes"""
+    chunk = chunk or memory
+    if chunk > memory:
+        raise ValueError(f"The chunk ({chunk:,} bytes) does not fit in the memory budget "
+                         f"({memory:,} bytes)")
+    # At least two runs and their copies per merge step next to the output
+    buffer = buffer or min(DEFAULT_BUFFER, memory // 5)
+    limit = (memory // buffer - 1) // 2
+    if chunk < itemsize or buffer < itemsize:
+        raise ValueError("The chunk and the buffer must hold at least one record")
+    if limit < 2:
+        raise ValueError(f"A {memory:,} byte budget is too small for {buffer:,} byte merge "
+                         f"buffers (it needs room for five)")
+    if fan_in is None:
+        fan_in = limit
+    if not 2 <= fan_in <= limit:
+        raise ValueError(f"The fan-in must be between 2 and {limit} for this budget and buffer")
+    return chunk // itemsize, buffer // itemsize, fan_in
+
+class RunReader:
+    """Sequential reader of one sorted run, one buffered block at a time"""
+
+    def __init__(self, path: str, dtype: np.dtype, items: int, progress: ExternalSortProgress):
+        self.file = open(path, 'rb', buffering=0)
+        self.size = os.path.getsize(path)
+        self.dtype = dtype
+        self.items = items
+        self.progress = progress
+        self.block = np.empty(0, dtype=dtype)
+        self.read = 0
+
+    @property
+    def consumed(self) -> int:
+        return self.read - self.block.nbytes
+
+    def refill(self) -> bool:
+        """Read the next block; False at the end of the run"""
+        start = time.perf_counter()
+        data = self.file.read(self.items * self.dtype.itemsize)
+        self.progress.read_seconds += time.perf_counter() - start
+        self.progress.bytes_read += len(data)
+        self.read += len(data)
+        self.block = np.frombuffer(data, dtype=self.dtype)
+        return len(self.block) > 0
+
+    def close(self):
+        self.file.close()
+
+class RunWriter:
+    """Sequential writer that collects records into one buffer per write"""
+
+    def __init__(self, path: str, dtype: np.dtype, items: int, progress: ExternalSortProgress):
+        self.file = open(path, 'wb', buffering=0)
+        self.buffer = np.empty(items, dtype=dtype)
+        self.fill = 0
+        self.progress = progress
+
+    def write(self, values: np.ndarray):
+        while len(values):
+            taken = min(len(values), len(self.buffer) - self.fill)
+            self.buffer[self.fill:self.fill + taken] = values[:taken]
+            self.fill += taken
+            values = values[taken:]
+            if self.fill == len(self.buffer):
+                self.flush()
+
+    def flush(self):
+        if not self.fill:
+            return
+        start = time.perf_counter()
+        self.file.write(self.buffer[:self.fill].data)
+        self.progress.write_seconds += time.perf_counter() - start
+        self.progress.bytes_written += self.fill * self.buffer.itemsize
+        self.fill = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def check_stop(stop: Optional[threading.Event]):
+    if stop is not None and stop.is_set():
+        raise SortCancelled("External sort cancelled")
+
+def make_runs(source: np.ndarray, chunk_items: int, run_dir: str,
+              progress: ExternalSortProgress, on_block: Callable,
+              stop: Optional[threading.Event]) -> List[str]:
+    """Sort ``source`` chunk by chunk into run files"""
+    runs = []
+    for lo in range(0, len(source), chunk_items):
+        check_stop(stop)
+        start = time.perf_counter()
+        chunk = np.array(source[lo:lo + chunk_items])
+        progress.read_seconds += time.perf_counter() - start
+        progress.bytes_read += chunk.nbytes
+        chunk.sort()
+
+        path = os.path.join(run_dir, f"run-0-{len(runs):06d}.bin")
+        start = time.perf_counter()
+        chunk.tofile(path)
+        progress.write_seconds += time.perf_counter() - start
+        progress.bytes_written += chunk.nbytes
+        del chunk
+        runs.append(path)
+        progress.runs_created = len(runs)
+        progress.blocks += 1
+        on_block(progress)
+    return runs
+
+def merge_runs(paths: List[str], output: str, dtype: np.dtype, buffer_items: int,
+               progress: ExternalSortProgress, on_block: Callable,
+               stop: Optional[threading.Event]):
+    """k-way merge of sorted run files into ``output``"""
+    readers = [RunReader(path, dtype, buffer_items, progress) for path in paths]
+    writer = RunWriter(output, dtype, buffer_items, progress)
+    progress.group = [reader.size for reader in readers]
+    progress.consumed = [0] * len(readers)
+    try:
+        heap = [(reader.block[-1].item(), r) for r, reader in enumerate(readers) if reader.refill()]
+        heapq.heapify(heap)
+        while heap:
+            check_stop(stop)
+            # Nothing after the smallest last key can sort before it, so
+            # every buffered record up to it is final
+            limit = heap[0][0]
+            pieces = []
+            for reader in readers:
+                taken = int(reader.block.searchsorted(limit, side='right'))
+                if taken:
+                    pieces.append(reader.block[:taken])
+                    reader.block = reader.block[taken:]
+            merged = np.concatenate(pieces)
+            merged.sort()
+            writer.write(merged)
+            del merged, pieces
+
+            while heap and not len(readers[heap[0][1]].block):
+                _, r = heapq.heappop(heap)
+                if readers[r].refill():
+                    heapq.heappush(heap, (readers[r].block[-1].item(), r))
+            progress.consumed = [reader.consumed for reader in readers]
+            progress.blocks += 1
+            on_block(progress)
+    finally:
+        for reader in readers:
+            reader.close()
+        writer.close()
+
+def external_sort(input_path: str, output_path: str, dtype: str = 'int32',
+                  memory: int = DEFAULT_MEMORY, chunk: Optional[int] = None,
+                  buffer: Optional[int] = None, fan_in: Optional[int] = None,
+                  temp_dir: Optional[str] = None,
+                  on_block: Optional[Callable[[ExternalSortProgress], None]] = None,
+                  stop: Optional[threading.Event] = None) -> ExternalSortProgress:
+    """Sort the records of ``input_path`` into ``output_path``.
+
+    ``memory``, ``chunk`` and ``buffer`` are in bytes; ``chunk`` (default:
+    the whole budget) sizes the runs and ``buffer`` each merge buffer.
+    Runs live in a temporary directory under ``temp_dir`` (default: next
+    to the output), removed afterwards. The result is written to
+    ``<output_path>.partial`` and only renamed to ``output_path`` once it is
+    complete; a cancelled or failed sort removes it. ``on_block`` is called with the
+    progress after every block; setting ``stop`` cancels the sort with
+    ``SortCancelled``. Returns the final progress.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown record type: {dtype} (expected one of {', '.join(DTYPES)})")
+    dtype = np.dtype(dtype)
+    total = os.path.getsize(input_path)
+    if total % dtype.itemsize:
+        raise ValueError(f"{input_path} holds {total:,} bytes, not a whole number of "
+                         f"{dtype.itemsize}-byte {dtype} records")
+    chunk_items, buffer_items, fan_in = plan(dtype.itemsize, memory, chunk, buffer, fan_in)
+    progress = ExternalSortProgress(total, dtype.itemsize, chunk_items * dtype.itemsize,
+                                    buffer_items * dtype.itemsize, fan_in)
+    on_block = on_block or (lambda progress: None)
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    partial_path = output_path + ".partial"
+    run_dir = tempfile.mkdtemp(prefix="external-sort-", dir=temp_dir or output_dir)
+    try:
+        source = np.memmap(input_path, dtype=dtype, mode='r') if total else np.empty(0, dtype)
+        runs = make_runs(source, chunk_items, run_dir, progress, on_block, stop)
+        del source
+
+        progress.phase = 'merge'
+        while len(runs) > fan_in:
+            progress.merge_pass += 1
+            merged = []
+            for g in range(0, len(runs), fan_in):
+                group = runs[g:g + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                path = os.path.join(run_dir, f"run-{progress.merge_pass}-{len(merged):06d}.bin")
+                merge_runs(group, path, dtype, buffer_items, progress, on_block, stop)
+                for run in group:
+                    os.remove(run)
+                merged.append(path)
+            runs = merged
+
+        if len(runs) > 1:
+            progress.merge_pass += 1
+            merge_runs(runs, partial_path, dtype, buffer_items, progress, on_block, stop)
+        elif runs:
+            shutil.move(runs[0], partial_path)
+        else:
+            open(partial_path, 'wb').close()
+        os.replace(partial_path, output_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    progress.phase = 'done'
+    progress.finished = time.perf_counter()
+    on_block(progress)
+    return progress
+
+def generate_file(path: str, count: int, dtype: str = 'int32', seed: int = 0,
+                  block: int = 1 << 24):
+    """Write ``count`` uniformly random records, ``block`` at a time"""
+    rng = np.random.default_rng(seed)
+    info = np.iinfo(np.int32)
+    with open(path, 'wb') as f:
+        for lo in range(0, count, block):
+            size = min(block, count - lo)
+            if dtype == 'int32':
+                values = rng.integers(info.min, info.max, size, dtype=np.int32, endpoint=True)
+            else:
+                values = rng.standard_normal(size)
+            values.tofile(f)
+
+def is_sorted_file(path: str, dtype: str = 'int32', block: int = 1 << 24) -> bool:
+    """Check a record file block by block, including across block edges"""
+    if not os.path.getsize(path):
+        return True
+    values = np.memmap(path, dtype=dtype, mode='r')
+    for lo in range(0, len(values), block):
+        part = values[max(lo - 1, 0):lo + block]
+        if np.any(part[1:] < part[:-1]):
+            return False
+    return True
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sort a binary record file larger than memory")
+    parser.add_argument("input", help="file of native-endian records")
+    parser.add_argument("output", help="where the sorted records go")
+    parser.add_argument("--dtype", default=DTYPES[0], choices=DTYPES)
+    parser.add_argument("--memory", type=parse_size, default=DEFAULT_MEMORY,
+                        help="memory budget, e.g. 512M (default: 256M)")
+    parser.add_argument("--chunk", type=parse_size, help="run size (default: the whole budget)")
+    parser.add_argument("--buffer", type=parse_size,
+                        help=f"merge read/write buffer (default: {DEFAULT_BUFFER >> 20}M)")
+    parser.add_argument("--fan-in", type=int, help="runs merged at once (default: as many as fit)")
+    parser.add_argument("--temp-dir", help="directory for the runs (default: next to the output)")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="first write N random records to the input file")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --generate")
+    parser.add_argument("--check", action="store_true", help="verify the output afterwards")
+    args = parser.parse_args(argv)
+
+    if args.generate is not None:
+        start = time.perf_counter()
+        generate_file(args.input, args.generate, args.dtype, args.seed)
+        print(f"Generated {args.generate:,} records in {time.perf_counter() - start:.1f} s")
+
+    last = [0.0]
+
+    def report(progress: ExternalSortProgress):
+        now = time.perf_counter()
+        if now - last[0] >= 0.5 or progress.phase == 'done':
+            last[0] = now
+            end = "\n" if progress.phase == 'done' else "\r"
+            print(f"{progress.fraction:6.1%} | {progress.summary()}", end=end, flush=True)
+
+    try:
+        progress = external_sort(args.input, args.output, args.dtype, args.memory, args.chunk,
+                                 args.buffer, args.fan_in, args.temp_dir, report)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"error: {e}")
+    print(f"{progress.total_bytes / 1e6:,.1f} MB in {progress.elapsed:.2f} s: "
+          f"{progress.throughput_mbps:,.1f} MB/s, {progress.runs_total} runs of "
+          f"{progress.chunk_bytes >> 20} MB, fan-in {progress.fan_in}, "
+          f"{progress.buffer_bytes >> 10} KB buffers, {progress.blocks:,} blocks")
+    if args.check:
+        ok = is_sorted_file(args.output, args.dtype) and \
+            os.path.getsize(args.output) == progress.total_bytes
+        print("Output is sorted" if ok else "Output is NOT sorted")
+        if not ok:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""
+Plain in-place implementations of the algorithms in SortingAlgorithms.
+
+They follow the same structure as the step generators but emit no events and
+keep no counters, which makes them the baseline for measuring visualization
+overhead.
+"""
+
+import random
+from typing import List
+from src.sorting_algorithms import (INTRO_THRESHOLD, MIN_GALLOP, PIVOT_SEED, PIVOT_STRATEGIES,
+                                    RADIX_BITS, bitonic_pairs, merge_scratch, min_run,
+                                    shell_gaps)
+
+
+def bubble_sort(data: List[int]) -> None:
+    n = len(data)
+    for i in range(n):
+        swapped = False
+        for j in range(0, n - i - 1):
+            if data[j] > data[j + 1]:
+                data[j], data[j + 1] = data[j + 1], data[j]
+                swapped = True
+        if not swapped:
+            break
+
+
+def selection_sort(data: List[int]) -> None:
+    n = len(data)
+    for i in range(n):
+        min_idx = i
+        for j in range(i + 1, n):
+            if data[j] < data[min_idx]:
+                min_idx = j
+        if min_idx != i:
+            data[i], data[min_idx] = data[min_idx], data[i]
+
+
+def insertion_sort(data: List[int]) -> None:
+    for i in range(1, len(data)):
+        key = data[i]
+        j = i - 1
+        while j >= 0 and data[j] > key:
+            data[j + 1] = data[j]
+            j -= 1
+        data[j + 1] = key
+
+
+def merge_sort(data: List[int]) -> None:
+    n = len(data)
+    scratch = merge_scratch(n)
+    width = 1
+    while width < n:
+        for left in range(0, n - width, 2 * width):
+            mid = left + width
+            right = min(left + 2 * width, n)
+            scratch[:width] = data[left:mid]
+            i, j, k = 0, mid, left
+            while i < width and j < right:
+                if scratch[i] <= data[j]:
+                    data[k] = scratch[i]
+                    i += 1
+                else:
+                    data[k] = data[j]
+                    j += 1
+                k += 1
+            data[k:k + width - i] = scratch[i:width]
+        width *= 2
+
+
+def quick_sort(data: List[int], pivot: str = 'median3') -> None:
+    rng = random.Random(PIVOT_SEED)
+
+    def choose_pivot(low, high):
+        if pivot == 'last':
+            return high
+        if pivot == 'first':
+            return low
+        if pivot == 'middle':
+            return (low + high) // 2
+        if pivot == 'random':
+            return rng.randint(low, high)
+        mid = (low + high) // 2
+        small, large = (low, mid) if data[low] <= data[mid] else (mid, low)
+        if data[large] <= data[high]:
+            return large
+        return high if data[small] <= data[high] else small
+
+    if pivot not in PIVOT_STRATEGIES:
+        raise ValueError(f"Unknown pivot strategy: {pivot}")
+    stack = [(0, len(data) - 1)]
+    while stack:
+        low, high = stack.pop()
+        if low >= high:
+            continue
+        p = choose_pivot(low, high)
+        data[p], data[high] = data[high], data[p]
+        pivot_value = data[high]
+        i = low - 1
+        for j in range(low, high):
+            if data[j] <= pivot_value:
+                i += 1
+                data[i], data[j] = data[j], data[i]
+        data[i + 1], data[high] = data[high], data[i + 1]
+        pi = i + 1
+        if pi - low < high - pi:
+            stack.append((pi + 1, high))
+            stack.append((low, pi - 1))
+        else:
+            stack.append((low, pi - 1))
+            stack.append((pi + 1, high))
+
+
+def heap_sort(data: List[int]) -> None:
+    def heapify(arr, n, i):
+        while True:
+            largest = i
+            left = 2 * i + 1
+            right = 2 * i + 2
+            if left < n and arr[left] > arr[largest]:
+                largest = left
+            if right < n and arr[right] > arr[largest]:
+                largest = right
+            if largest == i:
+                return
+            arr[i], arr[largest] = arr[largest], arr[i]
+            i = largest
+
+    n = len(data)
+    for i in range(n // 2 - 1, -1, -1):
+        heapify(data, n, i)
+    for i in range(n - 1, 0, -1):
+        data[i], data[0] = data[0], data[i]
+        heapify(data, i, 0)
+
+
+def _gallop(key, seq, base, length, hint, right):
+    """Offset in seq[base:base + length] where key belongs (after equal
+    elements when ``right``), searching outwards from ``hint``"""
+    def before(x):
+        return key < x if right else not x < key
+
+    last, ofs = 0, 1
+    if before(seq[base + hint]):
+        max_ofs = hint + 1
+        while ofs < max_ofs and before(seq[base + hint - ofs]):
+            last, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last, ofs = hint - ofs, hint - last
+    else:
+        max_ofs = length - hint
+        while ofs < max_ofs and not before(seq[base + hint + ofs]):
+            last, ofs = ofs, (ofs << 1) + 1
+        ofs = min(ofs, max_ofs)
+        last, ofs = last + hint, ofs + hint
+    last += 1
+    while last < ofs:
+        m = last + ((ofs - last) >> 1)
+        if before(seq[base + m]):
+            ofs = m
+        else:
+            last = m + 1
+    return ofs
+
+
+def timsort(data: List[int]) -> None:
+    n = len(data)
+    runs = []
+    min_gallop = MIN_GALLOP
+
+    def count_run(lo):
+        hi = lo + 1
+        if hi == n:
+            return 1
+        if data[hi] < data[lo]:
+            hi += 1
+            while hi < n and data[hi] < data[hi - 1]:
+                hi += 1
+            data[lo:hi] = data[lo:hi][::-1]
+        else:
+            hi += 1
+            while hi < n and not data[hi] < data[hi - 1]:
+                hi += 1
+        return hi - lo
+
+    def binary_insertion(lo, hi, start):
+        for i in range(start, hi):
+            pivot = data[i]
+            left, right = lo, i
+            while left < right:
+                mid = (left + right) // 2
+                if pivot < data[mid]:
+                    right = mid
+                else:
+                    left = mid + 1
+            if left != i:
+                data[left + 1:i + 1] = data[left:i]
+                data[left] = pivot
+
+    def merge_at(i):
+        nonlocal min_gallop
+        base1, len1 = runs[i]
+        base2, len2 = runs[i + 1]
+        runs[i] = [base1, len1 + len2]
+        del runs[i + 1]
+
+        k = _gallop(data[base2], data, base1, len1, 0, True)
+        base1 += k
+        len1 -= k
+        if len1 == 0:
+            return
+        len2 = _gallop(data[base1 + len1 - 1], data, base2, len2, len2 - 1, False)
+        if len2 == 0:
+            return
+
+        tmp = data[base1:base1 + len1]
+        i, j, k = 0, base2, base1
+        end2 = base2 + len2
+        while i < len1 and j < end2:
+            count1 = count2 = 0
+            while i < len1 and j < end2:
+                if data[j] < tmp[i]:
+                    data[k] = data[j]
+                    j += 1
+                    count1, count2 = 0, count2 + 1
+                else:
+                    data[k] = tmp[i]
+                    i += 1
+                    count1, count2 = count1 + 1, 0
+                k += 1
+                if count1 >= min_gallop or count2 >= min_gallop:
+                    break
+
+            min_gallop += 1
+            while i < len1 and j < end2:
+                min_gallop -= min_gallop > 1
+                count1 = _gallop(data[j], tmp, i, len1 - i, 0, True)
+                data[k:k + count1] = tmp[i:i + count1]
+                i += count1
+                k += count1
+                if i == len1:
+                    break
+                data[k] = data[j]
+                j += 1
+                k += 1
+                if j == end2:
+                    break
+                count2 = _gallop(tmp[i], data, j, end2 - j, 0, False)
+                data[k:k + count2] = data[j:j + count2]
+                j += count2
+                k += count2
+                if j == end2:
+                    break
+                data[k] = tmp[i]
+                i += 1
+                k += 1
+                if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                    break
+            min_gallop += 1
+
+        data[k:k + len1 - i] = tmp[i:]
+
+    def merge_collapse():
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                    (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                break
+            merge_at(i)
+
+    run_min = min_run(n)
+    lo = 0
+    while lo < n:
+        run_len = count_run(lo)
+        if run_len < run_min:
+            force = min(run_min, n - lo)
+            binary_insertion(lo, lo + force, lo + run_len)
+            run_len = force
+        runs.append([lo, run_len])
+        merge_collapse()
+        lo += run_len
+
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        merge_at(i)
+
+
+def introsort(data: List[int]) -> None:
+    def sift(lo, size, i):
+        while True:
+            largest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and data[lo + child] > data[lo + largest]:
+                    largest = child
+            if largest == i:
+                return
+            data[lo + i], data[lo + largest] = data[lo + largest], data[lo + i]
+            i = largest
+
+    def heap_range(lo, hi):
+        size = hi - lo + 1
+        for i in range(size // 2 - 1, -1, -1):
+            sift(lo, size, i)
+        for end in range(size - 1, 0, -1):
+            data[lo], data[lo + end] = data[lo + end], data[lo]
+            sift(lo, end, 0)
+
+    def insertion_range(lo, hi):
+        for i in range(lo + 1, hi + 1):
+            key = data[i]
+            j = i - 1
+            while j >= lo and data[j] > key:
+                data[j + 1] = data[j]
+                j -= 1
+            data[j + 1] = key
+
+    def partition(lo, hi):
+        mid = (lo + hi) // 2
+        if data[mid] < data[lo]:
+            data[lo], data[mid] = data[mid], data[lo]
+        if data[hi] < data[lo]:
+            data[lo], data[hi] = data[hi], data[lo]
+        if data[hi] < data[mid]:
+            data[mid], data[hi] = data[hi], data[mid]
+        pivot = data[mid]
+
+        i, j = lo, hi
+        while True:
+            i += 1
+            while data[i] < pivot:
+                i += 1
+            j -= 1
+            while pivot < data[j]:
+                j -= 1
+            if i >= j:
+                return j
+            data[i], data[j] = data[j], data[i]
+
+    n = len(data)
+    stack = [(0, n - 1, 2 * max(n, 1).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo < INTRO_THRESHOLD:
+            if lo < hi:
+                insertion_range(lo, hi)
+        elif depth == 0:
+            heap_range(lo, hi)
+        else:
+            split = partition(lo, hi)
+            stack.append((split + 1, hi, depth - 1))
+            stack.append((lo, split, depth - 1))
+
+
+def radix_sort(data: List[int]) -> None:
+    if not data:
+        return
+    low = min(data)
+    span = max(data) - low
+    mask = (1 << RADIX_BITS) - 1
+    shift = 0
+    while span >> shift:
+        buckets = [[] for _ in range(mask + 1)]
+        for value in data:
+            buckets[(value - low) >> shift & mask].append(value)
+        data[:] = [value for bucket in buckets for value in bucket]
+        shift += RADIX_BITS
+
+
+def counting_sort(data: List[int]) -> None:
+    if not data:
+        return
+    low = min(data)
+    counts = [0] * (max(data) - low + 1)
+    for value in data:
+        counts[value - low] += 1
+    k = 0
+    for offset, count in enumerate(counts):
+        data[k:k + count] = [low + offset] * count
+        k += count
+
+
+def shell_sort(data: List[int]) -> None:
+    n = len(data)
+    for gap in shell_gaps(n):
+        for i in range(gap, n):
+            key = data[i]
+            j = i
+            while j >= gap and data[j - gap] > key:
+                data[j] = data[j - gap]
+                j -= gap
+            data[j] = key
+
+
+def bitonic_sort(data: List[int]) -> None:
+    n = len(data)
+    for k, j in bitonic_pairs(n):
+        flip = k - 1 if j == k // 2 else j
+        for i in range(n):
+            partner = i ^ flip
+            if i < partner < n and data[i] > data[partner]:
+                data[i], data[partner] = data[partner], data[i]
@@ -1,36 +1,174 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import ttk, messagebox, filedialog
+import argparse
+import math
+import os
 import random
+import struct
 import time
 import threading
-from src.sorting_algorithms import SortingAlgorithms
-from src.visualizer import SortingVisualizer
+from array import array
+from src.sorting_algorithms import (SortingAlgorithms, PIVOT_STRATEGIES, GRANULARITIES,
+                                    PARALLEL_WORKERS)
+from src.step_events import (COMPARE, SWAP, WRITE, EVENT_SOUNDS, apply_event,
+                             changed_indices, event_highlights)
 from src.audio_manager import AudioManager
+from src.processes import ProcessGroup
+from src.registry import registry
+from src.trace import TraceWriter, TraceReader, TracePlayer
+
+# NumPy, matplotlib and everything built on them (the renderers, datasets,
+# playback, profiler, race) are imported where they are used, and preloaded
+# in the background once the window is up; see SortingVisualizerApp.start_loading.
+
+TARGET_FPS = 60
+# Profiling overlay refresh period (s) and histogram bar width (characters)
+OVERLAY_INTERVAL = 0.25
+# Sortedness metrics refresh period (s); changes queue up in between. Slow
+# refreshes (large rebuilds) are spaced out to keep within this share of the UI thread
+SORTEDNESS_INTERVAL = 0.1
+SORTEDNESS_SHARE = 0.2
+HISTOGRAM_WIDTH = 20
+# How often the UI checks on the background imports (ms)
+LOADING_POLL_MS = 20
+
+class StartupTimer:
+    """Startup milestones, printed by ``--measure-startup``"""
+    
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.marks = []
+        
+    def mark(self, label):
+        # list.append is atomic, so the audio thread can mark too
+        self.marks.append((label, time.perf_counter()))
+        
+    def report(self):
+        print("Startup (ms since launch, ms for the step):")
+        previous = self.started
+        for label, at in sorted(self.marks, key=lambda mark: mark[1]):
+            print(f"  {(at - self.started) * 1000:8.1f} {(at - previous) * 1000:8.1f}  {label}")
+            previous = at
 
 class SortingVisualizerApp:
-    def __init__(self, root):
+    def __init__(self, root, timer=None):
         self.root = root
         self.root.title("Sorting Algorithm Visualizer")
         self.root.geometry("1200x800")
         self.root.configure(bg='#2c3e50')
+        self.timer = timer or StartupTimer()
         
-        # Initialize audio manager
-        self.audio_manager = AudioManager()
+        # Initialize audio manager; pygame and the sounds load after first paint
+        self.audio_manager = AudioManager(setup=False)
         self.sorting = SortingAlgorithms(self.audio_manager)
-        self.visualizer = SortingVisualizer()
+        # Renderers and data arrive with load_backends, just after first paint
+        self.bar_view = None
+        self.raster_view = None
+        self.visualizer = None
+        self.fig = self.ax = self.canvas = None
         
         self.data_size = tk.IntVar(value=50)
-        self.speed = tk.DoubleVar(value=0.05)
+        # Data size slider works on log10(size) so it spans 10 to 100,000
+        self.size_exponent = tk.DoubleVar(value=1.7)
+        # Playback speed as log10(steps per second), 0 -> 1 step/s, 6 -> 1M steps/s
+        self.speed = tk.DoubleVar(value=1.3)
+        self.speed_text = tk.StringVar()
         self.current_algorithm = tk.StringVar(value="Bubble Sort")
+        self.pivot_strategy = tk.StringVar(value=PIVOT_STRATEGIES[0])
+        # Worker processes of the parallel sorts
+        self.workers = tk.IntVar(value=PARALLEL_WORKERS)
+        self.distribution = tk.StringVar(value="random")
+        # Which step events the generators emit, and one in how many
+        self.granularity = tk.StringVar(value=GRANULARITIES[0])
+        self.every = tk.IntVar(value=1)
+        # Blank draws a fresh seed on every Generate Data
+        self.seed_text = tk.StringVar(value="")
         self.sound_enabled = tk.BooleanVar(value=True)
+        self.value_pitch = tk.BooleanVar(value=True)
+        self.max_value = 1
         self.is_sorting = False
         self.sorting_thread = None
+        self.scheduler = None
+        self.seed = 0
+        # Replaced by a SharedArray once NumPy is loaded
         self.data = []
+        self.record_trace = tk.BooleanVar(value=False)
+        self.trace_path = None
+        self.replay = None
+        self.replay_start = 0
+        self.replay_position = tk.IntVar(value=0)
+        self.replay_text = tk.StringVar()
+        self.profile_enabled = tk.BooleanVar(value=False)
+        # Live sortedness of self.data (see src.sortedness); None means the
+        # queued changes are unknown and the whole array is compared
+        self.sortedness = None
+        self.sortedness_changed = set()
+        self.sortedness_due = 0.0
+        self.sortedness_progress = tk.DoubleVar(value=0.0)
+        self.sortedness_text = tk.StringVar()
+        self.profiler = None
+        self.overlay_updated = 0.0
+        # Controls that need the renderers, enabled by load_backends
+        self.backend_widgets = []
+        self.backends_imported = threading.Event()
         
         self.setup_ui()
+        self.update_stats("Loading...")
+        # Idle callbacks run after Tk's own redraws, so this waits for first paint
+        self.root.after_idle(self.start_loading)
+        
+    def start_loading(self):
+        """Import the heavy modules and set up audio on background threads.
+        
+        Imports mostly run Python code, so the window stays responsive while
+        they share the GIL with it; only building the Tk canvas has to
+        happen on this thread, in load_backends.
+        """
+        self.audio_manager.setup_in_background(
+            on_ready=lambda: self.timer.mark("audio ready (pygame, sounds)"))
+        threading.Thread(target=self.import_backends, name="backend-import", daemon=True).start()
+        self.root.after(LOADING_POLL_MS, self.poll_loading)
+        
+    def import_backends(self):
+        try:
+            import matplotlib.backends.backend_tkagg
+            import src.datasets, src.playback, src.shared_array, src.sortedness, src.visualizer
+            self.timer.mark("NumPy, matplotlib and renderers imported")
+        finally:
+            # On failure load_backends repeats the import and reports the error
+            self.backends_imported.set()
+        
+    def poll_loading(self):
+        if self.backends_imported.is_set():
+            self.load_backends()
+        else:
+            self.root.after(LOADING_POLL_MS, self.poll_loading)
+        
+    def load_backends(self):
+        """Build the plot and the first dataset"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from src.datasets import DISTRIBUTIONS
+        from src.visualizer import SortingVisualizer, RasterVisualizer
+        
+        self.bar_view = SortingVisualizer()
+        self.raster_view = RasterVisualizer()
+        self.visualizer = self.bar_view
+        # A plain Figure avoids pyplot, which would load its own backend machinery
+        self.fig = Figure(figsize=(12, 6))
+        self.ax = self.fig.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.viz_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.visualizer.setup_plot(self.fig, self.ax, self.canvas)
+        self.overlay.lift()
+        self.distribution_combo.configure(values=DISTRIBUTIONS)
+        self.timer.mark("plot created")
+        
         self.generate_data()
+        for widget in self.backend_widgets:
+            widget.state(['!disabled'])
+        self.root.update_idletasks()
+        self.timer.mark("plot drawn, data generated")
         
     def setup_ui(self):
         # Main frame
@@ -43,35 +181,77 @@ class SortingVisualizerApp:
         
         # Algorithm selection
         ttk.Label(control_frame, text="Algorithm:").grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
-        algorithms = ["Bubble Sort", "Selection Sort", "Insertion Sort", 
-                     "Merge Sort", "Quick Sort", "Heap Sort"]
         algo_combo = ttk.Combobox(control_frame, textvariable=self.current_algorithm, 
-                                 values=algorithms, state="readonly", width=15)
+                                 values=registry.names(), state="readonly", width=15)
         algo_combo.grid(row=0, column=1, padx=(0, 20))
         
+        # Options understood by some algorithms only (see AlgorithmSpec.options)
+        ttk.Label(control_frame, text="Pivot:").grid(row=1, column=0, sticky=tk.W, padx=(0, 10), pady=(5, 0))
+        pivot_combo = ttk.Combobox(control_frame, textvariable=self.pivot_strategy, 
+                                  values=PIVOT_STRATEGIES, state="readonly", width=15)
+        pivot_combo.grid(row=1, column=1, padx=(0, 20), pady=(5, 0))
+        ttk.Label(control_frame, text="Workers:").grid(row=2, column=0, sticky=tk.W, padx=(0, 10), pady=(5, 0))
+        ttk.Spinbox(control_frame, from_=1, to=64, textvariable=self.workers, 
+                    width=6).grid(row=2, column=1, sticky=tk.W, pady=(5, 0))
+        
+        # Input distribution and seed (see src.datasets)
+        ttk.Label(control_frame, text="Input:").grid(row=1, column=2, sticky=tk.W, padx=(0, 10), pady=(5, 0))
+        self.distribution_combo = ttk.Combobox(control_frame, textvariable=self.distribution, 
+                                              values=[self.distribution.get()], state="readonly", 
+                                              width=13)
+        self.distribution_combo.grid(row=1, column=3, padx=(0, 10), pady=(5, 0))
+        ttk.Label(control_frame, text="Seed:").grid(row=1, column=5, sticky=tk.W, padx=(0, 10), pady=(5, 0))
+        ttk.Entry(control_frame, textvariable=self.seed_text, width=12).grid(
+            row=1, column=6, padx=(0, 10), pady=(5, 0))
+        
         # Data size control
         ttk.Label(control_frame, text="Data Size:").grid(row=0, column=2, sticky=tk.W, padx=(0, 10))
-        size_scale = ttk.Scale(control_frame, from_=10, to=100, variable=self.data_size, 
-                              orient=tk.HORIZONTAL, length=100)
+        size_scale = ttk.Scale(control_frame, from_=1, to=5, variable=self.size_exponent, 
+                              orient=tk.HORIZONTAL, length=100,
+                              command=lambda v: self.data_size.set(int(round(10 ** float(v)))))
         size_scale.grid(row=0, column=3, padx=(0, 10))
         ttk.Label(control_frame, textvariable=self.data_size).grid(row=0, column=4, padx=(0, 20))
         
         # Speed control
         ttk.Label(control_frame, text="Speed:").grid(row=0, column=5, sticky=tk.W, padx=(0, 10))
-        speed_scale = ttk.Scale(control_frame, from_=0.01, to=0.5, variable=self.speed, 
-                               orient=tk.HORIZONTAL, length=100)
+        speed_scale = ttk.Scale(control_frame, from_=0, to=6.5, variable=self.speed, 
+                               orient=tk.HORIZONTAL, length=100,
+                               command=lambda _: self.update_speed_text())
         speed_scale.grid(row=0, column=6, padx=(0, 10))
-        ttk.Label(control_frame, textvariable=self.speed).grid(row=0, column=7, padx=(0, 20))
+        ttk.Label(control_frame, textvariable=self.speed_text, width=12).grid(row=0, column=7, padx=(0, 20))
+        self.update_speed_text()
         
         # Sound control
         sound_check = ttk.Checkbutton(control_frame, text="🔊 Sound", 
                                      variable=self.sound_enabled,
                                      command=self.toggle_sound)
-        sound_check.grid(row=0, column=8, padx=(0, 20))
+        sound_check.grid(row=0, column=8, padx=(0, 10))
+        pitch_check = ttk.Checkbutton(control_frame, text="🎵 Pitch", 
+                                     variable=self.value_pitch,
+                                     command=self.toggle_value_pitch)
+        pitch_check.grid(row=0, column=9, padx=(0, 10))
+        record_check = ttk.Checkbutton(control_frame, text="⏺ Record", 
+                                      variable=self.record_trace)
+        record_check.grid(row=0, column=10, padx=(0, 20))
+        profile_check = ttk.Checkbutton(control_frame, text="⏱ Profile", 
+                                       variable=self.profile_enabled,
+                                       command=self.toggle_profiling)
+        profile_check.grid(row=1, column=8, padx=(0, 10), pady=(5, 0))
+        self.backend_widgets.append(profile_check)
+        
+        # Step granularity (see SortingAlgorithms.set_granularity)
+        ttk.Label(control_frame, text="Detail:").grid(row=1, column=9, sticky=tk.W, padx=(0, 10), pady=(5, 0))
+        detail_frame = ttk.Frame(control_frame)
+        detail_frame.grid(row=1, column=10, columnspan=2, sticky=tk.W, pady=(5, 0))
+        ttk.Combobox(detail_frame, textvariable=self.granularity, values=GRANULARITIES, 
+                     state="readonly", width=10).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(detail_frame, text="every").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Spinbox(detail_frame, from_=1, to=1000, textvariable=self.every, 
+                    width=6).pack(side=tk.LEFT)
         
         # Buttons
         button_frame = ttk.Frame(control_frame)
-        button_frame.grid(row=0, column=9, sticky=tk.E)
+        button_frame.grid(row=0, column=11, sticky=tk.E)
         
         ttk.Button(button_frame, text="Generate Data", 
                   command=self.generate_data).pack(side=tk.LEFT, padx=(0, 5))
@@ -80,23 +260,77 @@ class SortingVisualizerApp:
         ttk.Button(button_frame, text="Reset", 
                   command=self.reset).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="Compare All", 
-                  command=self.compare_algorithms).pack(side=tk.LEFT)
+                  command=self.compare_algorithms).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="Race", 
+                  command=self.race_algorithms).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="Load Trace", 
+                  command=self.load_trace).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="External Sort", 
+                  command=self.external_sort).pack(side=tk.LEFT)
+        self.backend_widgets.extend(button_frame.winfo_children())
+        for widget in self.backend_widgets:
+            widget.state(['disabled'])
+        
+        # Replay controls, shown only while a trace is loaded
+        self.replay_frame = ttk.LabelFrame(main_frame, text="Replay", padding=10)
+        ttk.Button(self.replay_frame, text="◀ Step", 
+                  command=self.replay_step_back).pack(side=tk.LEFT, padx=(0, 5))
+        self.play_button = ttk.Button(self.replay_frame, text="▶ Play", 
+                                      command=self.toggle_replay)
+        self.play_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(self.replay_frame, text="Step ▶", 
+                  command=self.replay_step_forward).pack(side=tk.LEFT, padx=(0, 10))
+        self.seek_scale = ttk.Scale(self.replay_frame, from_=0, to=1, 
+                                    variable=self.replay_position, orient=tk.HORIZONTAL,
+                                    command=lambda _: self.replay_seek(self.replay_position.get()))
+        self.seek_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
+        ttk.Label(self.replay_frame, textvariable=self.replay_text, width=24).pack(side=tk.LEFT)
+        ttk.Button(self.replay_frame, text="Close", 
+                  command=self.close_replay).pack(side=tk.LEFT, padx=(10, 0))
         
         # Stats frame
         stats_frame = ttk.LabelFrame(main_frame, text="Statistics", padding=10)
         stats_frame.pack(fill=tk.X, pady=(0, 10))
+        self.stats_frame = stats_frame
         
         self.stats_text = tk.Text(stats_frame, height=4, width=80, font=('Consolas', 10))
         self.stats_text.pack(fill=tk.X)
+        sortedness_frame = ttk.Frame(stats_frame)
+        sortedness_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Progressbar(sortedness_frame, variable=self.sortedness_progress, maximum=100, 
+                        length=150).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(sortedness_frame, textvariable=self.sortedness_text, 
+                  font=('Consolas', 9)).pack(side=tk.LEFT)
         
         # Visualization frame
         viz_frame = ttk.LabelFrame(main_frame, text="Visualization", padding=10)
         viz_frame.pack(fill=tk.BOTH, expand=True)
+        # The matplotlib canvas is added by load_backends
+        self.viz_frame = viz_frame
         
-        # Matplotlib figure
-        self.fig, self.ax = plt.subplots(figsize=(12, 6))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=viz_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Profiling overlay, placed over the plot while profiling is on
+        self.overlay = tk.Frame(viz_frame, bg='#1c2833')
+        self.overlay_text = tk.StringVar()
+        tk.Label(self.overlay, textvariable=self.overlay_text, font=('Consolas', 9),
+                 fg='white', bg='#1c2833', justify=tk.LEFT).pack(padx=6, pady=(4, 0))
+        ttk.Button(self.overlay, text="Export Trace", 
+                  command=self.export_profile).pack(anchor=tk.E, padx=6, pady=4)
+        
+    def select_renderer(self, size):
+        """Use bar artists for small arrays and the raster image beyond that"""
+        renderer, _ = registry.modes(self.current_algorithm.get(), size)
+        view = self.bar_view if renderer == 'bars' else self.raster_view
+        if view is not self.visualizer:
+            self.visualizer.detach()
+            self.visualizer = view
+            view.setup_plot(self.fig, self.ax, self.canvas)
+        
+    def steps_per_second(self):
+        """Current playback rate selected on the speed slider"""
+        return 10 ** self.speed.get()
+        
+    def update_speed_text(self):
+        self.speed_text.set(f"{self.steps_per_second():,.0f} steps/s")
         
     def toggle_sound(self):
         """Toggle sound effects on/off"""
@@ -105,68 +339,82 @@ class SortingVisualizerApp:
         status = "enabled" if enabled else "disabled"
         self.update_stats(f"Sound {status}")
         
+    def toggle_value_pitch(self):
+        """Toggle value-mapped pitch tones on/off"""
+        enabled = self.value_pitch.get()
+        self.audio_manager.toggle_value_pitch(enabled)
+        status = "enabled" if enabled else "disabled"
+        self.update_stats(f"Value pitch {status}")
+        
     def generate_data(self):
         if self.is_sorting:
             messagebox.showwarning("Warning", "Please wait for current sorting to complete!")
             return
             
         size = self.data_size.get()
-        self.data = list(range(1, size + 1))
-        random.shuffle(self.data)
-        self.update_visualization()
-        self.update_stats("Data generated successfully!")
-        
-    def update_visualization(self, highlights=None, title=None):
-        self.ax.clear()
-        
-        colors = ['#3498db'] * len(self.data)
-        if highlights:
-            for idx in highlights:
-                if 0 <= idx < len(colors):
-                    colors[idx] = '#e74c3c'
-        
-        bars = self.ax.bar(range(len(self.data)), self.data, color=colors, alpha=0.7, edgecolor='white')
+        # Seeded so a recorded trace can name the exact input it sorted
+        seed_text = self.seed_text.get().strip()
+        try:
+            self.seed = int(seed_text) if seed_text else random.randrange(2**31)
+        except ValueError:
+            messagebox.showwarning("Warning", f"Seed must be an integer, not {seed_text!r}")
+            return
+        from src.datasets import load_dataset
+        from src.shared_array import SharedArray
+        distribution = self.distribution.get()
+        self.data = SharedArray(load_dataset(distribution, size, self.seed))
+        self.select_renderer(size)
+        self.visualizer.draw_data(self.data, title=f"{self.current_algorithm.get()} - Ready to Sort")
+        self.update_sortedness(rebuild=True)
+        self.update_stats(f"Data generated successfully! ({distribution}, seed {self.seed})")
         
-        # Customize the plot
-        self.ax.set_facecolor('#ecf0f1')
-        self.fig.patch.set_facecolor('#2c3e50')
+    def update_visualization(self, highlights=None, title=None, changed=None, partitions=None):
+        """Redraw the bars touched since the last frame"""
+        if title is None:
+            title = f"{self.current_algorithm.get()} - Ready to Sort"
+        profiler = self.profiler
+        start = profiler.clock() if profiler is not None else 0
+        self.visualizer.update_plot(self.data, highlights, title, changed, partitions)
+        if profiler is not None:
+            from src.profiler import RENDER
+            profiler.record(RENDER, start, profiler.clock() - start)
+        self.track_sortedness(changed)
         
-        for spine in self.ax.spines.values():
-            spine.set_color('white')
+    def track_sortedness(self, changed):
+        """Queue a frame's changed indices (None: unknown) and refresh the
+        metrics when due"""
+        if changed is None:
+            self.sortedness_changed = None
+        elif self.sortedness_changed is not None:
+            self.sortedness_changed.update(changed)
+        if time.perf_counter() >= self.sortedness_due:
+            self.update_sortedness()
             
-        self.ax.tick_params(colors='white')
-        self.ax.xaxis.label.set_color('white')
-        self.ax.yaxis.label.set_color('white')
-        
-        if title:
-            self.ax.set_title(title, fontsize=14, fontweight='bold', color='white', pad=20)
-        else:
-            self.ax.set_title(f"{self.current_algorithm.get()} - Ready to Sort", 
-                            fontsize=14, fontweight='bold', color='white', pad=20)
-        
-        self.ax.set_xlabel('Index', color='white', fontsize=12)
-        self.ax.set_ylabel('Value', color='white', fontsize=12)
-        self.ax.set_ylim(0, max(self.data) * 1.1)
-        
-        # Add value labels with better visibility
-        if len(self.data) <= 50:
-            for i, bar in enumerate(bars):
-                height = bar.get_height()
-                # Use black text for better contrast on light blue bars
-                text_color = 'black' if colors[i] == '#3498db' else 'white'
-                self.ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                           f'{int(height)}', ha='center', va='bottom', 
-                           fontsize=8, color=text_color, fontweight='bold',
-                           bbox=dict(boxstyle="round,pad=0.1", facecolor='white', alpha=0.7))
-        
-        self.canvas.draw()
+    def update_sortedness(self, rebuild=False):
+        """Fold the queued changes into the sortedness metrics and show them"""
+        import numpy as np
+        from src.sortedness import SortednessTracker
+        start = time.perf_counter()
+        changed, self.sortedness_changed = self.sortedness_changed, set()
+        tracker = self.sortedness
+        if rebuild or tracker is None or tracker.n != len(self.data):
+            tracker = self.sortedness = SortednessTracker(self.data.snapshot())
+        elif changed is None:
+            tracker.sync(self.data.snapshot())
+        elif changed:
+            indices = np.fromiter(changed, dtype=np.int64, count=len(changed))
+            tracker.update(indices, self.data.take(indices))
+        now = time.perf_counter()
+        self.sortedness_due = now + max(SORTEDNESS_INTERVAL, (now - start) / SORTEDNESS_SHARE)
+        self.sortedness_progress.set(tracker.progress * 100)
+        self.sortedness_text.set(tracker.summary())
         
     def update_stats(self, message):
         self.stats_text.delete(1.0, tk.END)
         self.stats_text.insert(tk.END, f"{message}\n")
         self.stats_text.insert(tk.END, f"Data Size: {len(self.data)}\n")
         self.stats_text.insert(tk.END, f"Current Algorithm: {self.current_algorithm.get()}\n")
-        self.stats_text.insert(tk.END, f"Speed: {self.speed.get():.2f} seconds\n")
+        self.stats_text.insert(tk.END, f"Speed: {self.steps_per_second():,.0f} steps/s\n")
         self.stats_text.insert(tk.END, f"Sound: {'ON' if self.sound_enabled.get() else 'OFF'}")
         
     def start_sorting(self):
@@ -175,60 +423,357 @@ class SortingVisualizerApp:
             return
             
         algorithm = self.current_algorithm.get()
+        try:
+            self.sorting.set_granularity(self.granularity.get(), self.every.get())
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Invalid step detail: {e}")
+            return
+        options = self.sort_options()
+        if options is None:
+            return
+        if self.record_trace.get() and not self.sorting.lossless:
+            # A replay has to rebuild the array from the events alone
+            messagebox.showwarning("Warning", "Recording needs every write: set Detail to "
+                                              "'all' or 'writes' with every 1.")
+            return
+        self.trace_path = None
+        if self.record_trace.get():
+            self.trace_path = filedialog.asksaveasfilename(
+                title="Record trace to", defaultextension=".svt",
+                filetypes=[("Sorting traces", "*.svt"), ("All files", "*.*")])
+            if not self.trace_path:
+                return
+        self.close_replay()
         self.is_sorting = True
+        self.max_value = max(self.data, default=1)
+        
+        options = registry.get(algorithm).accepted(options)
+        _, playback = registry.modes(algorithm, len(self.data))
+        if playback == 'fast' and not self.trace_path:
+            # Too many steps to watch: sort once and show the exact counts
+            self.update_stats(f"{algorithm}: {len(self.data):,} elements is above the "
+                              f"animation limit, sorting without playback...")
+            self.sorting_thread = threading.Thread(target=self.run_fast_path, args=(algorithm, options))
+            self.sorting_thread.daemon = True
+            self.sorting_thread.start()
+            return
         
-        # Run sorting in a separate thread to keep UI responsive
-        self.sorting_thread = threading.Thread(target=self.run_sorting_algorithm, args=(algorithm,))
+        from src.playback import PlaybackScheduler
+        self.scheduler = PlaybackScheduler(self.steps_per_second, fps=TARGET_FPS,
+                                           profiler=self.profiler)
+        
+        # Run sorting in a separate thread to keep UI responsive; the UI
+        # thread renders whatever the scheduler has accumulated once per tick
+        self.sorting_thread = threading.Thread(target=self.run_sorting_algorithm, args=(algorithm, options))
         self.sorting_thread.daemon = True
         self.sorting_thread.start()
+        self.root.after(0, self.render_tick, algorithm)
         
-    def run_sorting_algorithm(self, algorithm):
+    def run_sorting_algorithm(self, algorithm, options):
+        recorder = None
         try:
             start_time = time.time()
             steps_generator = None
             
-            if algorithm == "Bubble Sort":
-                steps_generator = self.sorting.bubble_sort(self.data.copy())
-            elif algorithm == "Selection Sort":
-                steps_generator = self.sorting.selection_sort(self.data.copy())
-            elif algorithm == "Insertion Sort":
-                steps_generator = self.sorting.insertion_sort(self.data.copy())
-            elif algorithm == "Merge Sort":
-                steps_generator = self.sorting.merge_sort(self.data.copy())
-            elif algorithm == "Quick Sort":
-                steps_generator = self.sorting.quick_sort(self.data.copy())
-            elif algorithm == "Heap Sort":
-                steps_generator = self.sorting.heap_sort(self.data.copy())
-            else:
-                steps_generator = self.sorting.bubble_sort(self.data.copy())
+            if self.trace_path:
+                recorder = TraceWriter(self.trace_path, algorithm, self.seed, self.data.array)
             
-            # Animate the sorting steps
-            for step_data, highlights, comparisons, swaps in steps_generator:
-                if not self.is_sorting:  # Allow cancellation
-                    break
-                    
-                self.data = step_data
-                title = f"{algorithm} - Comparisons: {comparisons}, Swaps: {swaps}"
-                self.root.after(0, lambda: self.update_visualization(highlights, title))
-                time.sleep(self.speed.get())
+            # The algorithm sorts the shared buffer itself; the scheduler
+            # paces it and tells the renderer which indices changed
+            steps_generator = registry.get(algorithm).steps(self.sorting, self.data.array, **options)
+            if recorder is not None:
+                steps_generator = recorder.record(steps_generator)
+            completed = self.scheduler.run(steps_generator, self.data, self.sorting,
+                                           on_event=self.play_event_sound, in_place=True,
+                                           exact_changes=self.sorting.lossless)
+            if completed:
+                self.sorting.play_sound('complete')
             
             elapsed_time = time.time() - start_time
-            final_message = f"{algorithm} completed in {elapsed_time:.2f} seconds"
+            final_message = (f"{algorithm} completed in {elapsed_time:.2f} seconds "
+                             f"({self.scheduler.steps:,} steps, "
+                             f"{self.scheduler.frames_rendered} frames, "
+                             f"{self.scheduler.frames_dropped} dropped)")
             self.root.after(0, lambda: self.update_stats(final_message))
             
         except Exception as e:
             # FIXED: Properly capture the exception in lambda
             error_msg = str(e)
             self.root.after(0, lambda msg=error_msg: messagebox.showerror("Error", f"An error occurred: {msg}"))
+        finally:
+            if recorder is not None:
+                recorder.close()
+            self.is_sorting = False
+            
+    def run_fast_path(self, algorithm, options):
+        """Sort with the non-visual implementation and report exact counts"""
+        try:
+            spec = registry.get(algorithm)
+            comparisons, swaps = spec.count(self.data.array, **options)
+            work = self.data.tolist()
+            start_time = time.time()
+            spec.fast(work, **options)
+            elapsed_time = time.time() - start_time
+            
+            def finish():
+                self.data.assign(work)
+                title = f"{algorithm} - Comparisons: {comparisons}, Swaps: {swaps}"
+                self.visualizer.draw_data(self.data, title=title)
+                self.sortedness_changed = None
+                self.update_sortedness()
+                self.update_stats(f"{algorithm} completed in {elapsed_time:.2f} seconds "
+                                  f"without playback ({comparisons:,} comparisons, "
+                                  f"{swaps:,} swaps)")
+            self.root.after(0, finish)
+            self.sorting.play_sound('complete')
+        except Exception as e:
+            error_msg = str(e)
+            self.root.after(0, lambda msg=error_msg: messagebox.showerror("Error", f"An error occurred: {msg}"))
         finally:
             self.is_sorting = False
             
+    def play_event_sound(self, event):
+        op, a, b = event
+        if self.audio_manager.value_pitch and op in (COMPARE, SWAP, WRITE):
+            # Sound of sorting: pitch follows the value being touched
+            self.audio_manager.play_value(self.data[a], self.max_value)
+        else:
+            self.sorting.play_sound(EVENT_SOUNDS.get(op))
+        
+    def render_tick(self, algorithm):
+        """Draw one coalesced frame and schedule the next tick"""
+        scheduler = self.scheduler
+        frame = scheduler.take_frame()
+        if frame is not None:
+            title = f"{algorithm} - Comparisons: {frame.comparisons}, Swaps: {frame.swaps}"
+            self.update_visualization(frame.highlights, title, frame.changed, frame.partitions)
+        self.update_overlay()
+            
+        if frame is not None or self.sorting_thread.is_alive():
+            self.root.after(int(1000 / TARGET_FPS), self.render_tick, algorithm)
+        else:
+            # Show the final state's metrics without waiting for the interval
+            self.update_sortedness()
+            
+    def toggle_profiling(self):
+        """Install or remove the profiler; a run in progress keeps the
+        setting it started with"""
+        if self.profile_enabled.get():
+            from src.profiler import Profiler, BLIT, DRAW
+            self.profiler = Profiler()
+            self.profiler.wrap(self.canvas, 'blit', BLIT)
+            self.profiler.wrap(self.canvas, 'draw', DRAW)
+            self.overlay.place(relx=1.0, rely=0.0, x=-10, y=10, anchor=tk.NE)
+            self.update_overlay(force=True)
+        elif self.profiler is not None:
+            self.profiler.unwrap()
+            self.profiler = None
+            self.overlay.place_forget()
+            
+    def update_overlay(self, force=False):
+        """Refresh the profiling overlay, at most every OVERLAY_INTERVAL"""
+        if self.profiler is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self.overlay_updated < OVERLAY_INTERVAL:
+            return
+        self.overlay_updated = now
+        
+        from src.profiler import histogram_labels
+        stats = self.profiler.summary()
+        dropped = self.scheduler.frames_dropped if self.scheduler is not None else 0
+        p50, p95, worst = stats['frame_ms']
+        lines = [f"FPS {stats['fps']:5.1f}  steps/s {stats['steps_per_second']:>11,.0f}  "
+                 f"dropped {dropped}",
+                 f"frame ms  p50 {p50:.1f}  p95 {p95:.1f}  max {worst:.1f}"]
+        peak = max(stats['histogram']) or 1
+        for label, count in zip(histogram_labels(), stats['histogram']):
+            bar = '█' * round(HISTOGRAM_WIDTH * count / peak)
+            lines.append(f"{label:>9} ms {bar:<{HISTOGRAM_WIDTH}} {count}")
+        if stats['shares']:
+            lines.append('  '.join(f"{name} {share:.0%}" for name, share in stats['shares'].items()))
+        self.overlay_text.set('\n'.join(lines))
+        
+    def export_profile(self):
+        if self.profiler is None:
+            return
+        path = filedialog.asksaveasfilename(
+            title="Export Chrome trace", defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.profiler.export_chrome_trace(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not write trace: {e}")
+            return
+        self.update_stats(f"Profile written to {path} (open in chrome://tracing or ui.perfetto.dev)")
+        
+    def load_trace(self):
+        """Open a recorded trace and switch the view to replay mode"""
+        if self.is_sorting:
+            messagebox.showwarning("Warning", "Please wait for current sorting to complete!")
+            return
+        path = filedialog.askopenfilename(
+            title="Open trace", filetypes=[("Sorting traces", "*.svt"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            reader = TraceReader(path)
+        except (OSError, ValueError, struct.error) as e:
+            messagebox.showerror("Error", f"Could not open trace: {e}")
+            return
+            
+        from src.shared_array import SharedArray
+        self.close_replay()
+        self.replay = TracePlayer(reader)
+        self.replay_start = 0
+        self.data = SharedArray(self.replay.state)
+        self.max_value = max(self.data, default=1)
+        self.seek_scale.configure(to=max(reader.count, 1))
+        self.select_renderer(len(self.data))
+        self.replay_position.set(0)
+        self.replay_frame.pack(fill=tk.X, pady=(0, 10), before=self.stats_frame)
+        self.visualizer.draw_data(self.data, title=self.replay_title())
+        self.update_sortedness(rebuild=True)
+        self.update_stats(f"Loaded trace of {reader.algorithm} "
+                          f"({reader.count:,} steps, seed {reader.seed})")
+        
+    def replay_title(self):
+        reader = self.replay.reader
+        self.replay_text.set(f"Step {self.replay.position:,} / {reader.count:,}")
+        return f"Replay: {reader.algorithm} - Step {self.replay.position:,}/{reader.count:,}"
+        
+    def toggle_replay(self):
+        if self.replay is None:
+            return
+        if self.is_sorting:
+            self.pause_replay()
+            return
+        if self.replay.position >= self.replay.reader.count:
+            self.replay_seek(0)
+            
+        self.is_sorting = True
+        self.play_button.configure(text="⏸ Pause")
+        self.replay_start = self.replay.position
+        from src.playback import PlaybackScheduler
+        self.scheduler = PlaybackScheduler(self.steps_per_second, fps=TARGET_FPS,
+                                           profiler=self.profiler)
+        events = self.replay.reader.events(self.replay_start)
+        self.sorting_thread = threading.Thread(target=self.run_replay, args=(events,))
+        self.sorting_thread.daemon = True
+        self.sorting_thread.start()
+        self.root.after(0, self.replay_tick)
+        
+    def run_replay(self, events):
+        try:
+            self.scheduler.run(events, self.data, None, on_event=self.play_event_sound)
+        finally:
+            self.is_sorting = False
+            
+    def replay_tick(self):
+        """Replay counterpart of render_tick, tracking the trace position"""
+        if self.replay is None:
+            return
+        frame = self.scheduler.take_frame()
+        if frame is not None:
+            self.replay.position = self.replay_start + frame.steps
+            self.replay_position.set(self.replay.position)
+            self.update_visualization(frame.highlights, self.replay_title(), frame.changed,
+                                      frame.partitions)
+        self.update_overlay()
+            
+        if frame is not None or self.sorting_thread.is_alive():
+            self.root.after(int(1000 / TARGET_FPS), self.replay_tick)
+        else:
+            self.replay.state = array('i', self.data.array)
+            self.play_button.configure(text="▶ Play")
+            self.update_sortedness()
+            
+    def pause_replay(self):
+        """Stop playback and wait for the worker so the buffer is settled"""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.sorting_thread is not None:
+            self.sorting_thread.join()
+        # Discard the worker's last frame; the position is settled below
+        self.scheduler.take_frame()
+        self.sortedness_changed = None
+        if self.replay is not None:
+            self.replay.position = self.replay_start + self.scheduler.steps
+            self.replay.state = array('i', self.data.array)
+            self.play_button.configure(text="▶ Play")
+            
+    def replay_seek(self, step):
+        if self.replay is None:
+            return
+        if self.is_sorting:
+            self.pause_replay()
+        self.data.assign(self.replay.seek(int(step)))
+        self.update_visualization([], self.replay_title())
+        
+    def replay_step_forward(self):
+        if self.replay is None:
+            return
+        if self.is_sorting:
+            self.pause_replay()
+        event = self.replay.step_forward()
+        if event is not None:
+            apply_event(self.data, event)
+            self.replay_position.set(self.replay.position)
+            self.update_visualization(event_highlights(event), self.replay_title(),
+                                      changed_indices(event))
+            
+    def replay_step_back(self):
+        if self.replay is None:
+            return
+        if self.is_sorting:
+            self.pause_replay()
+        event = self.replay.step_back()
+        if event is not None:
+            self.data.assign(self.replay.state)
+            self.replay_position.set(self.replay.position)
+            self.update_visualization(event_highlights(event), self.replay_title())
+            
+    def close_replay(self):
+        if self.replay is None:
+            return
+        if self.is_sorting:
+            self.pause_replay()
+        self.replay.reader.close()
+        self.replay = None
+        self.replay_frame.pack_forget()
+        
     def reset(self):
+        self.close_replay()
         self.is_sorting = False
+        if self.scheduler is not None:
+            self.scheduler.stop()
         self.generate_data()
         
+    def sort_options(self):
+        """Pivot and workers options of a run, or None after reporting a bad value"""
+        try:
+            workers = self.workers.get()
+        except tk.TclError:
+            workers = 0
+        if workers < 1:
+            messagebox.showerror("Error", "Workers must be a whole number of at least 1")
+            return None
+        return {'pivot': self.pivot_strategy.get(), 'workers': workers}
+        
     def compare_algorithms(self):
-        CompareWindow(self.root, self.data_size.get())
+        options = self.sort_options()
+        if options is not None:
+            CompareWindow(self.root, self.data.tolist(), options)
+        
+    def race_algorithms(self):
+        options = self.sort_options()
+        if options is not None:
+            RaceWindow(self.root, self.data.tolist(), self.speed.get(), options)
+        
+    def external_sort(self):
+        ExternalSortWindow(self.root)
         
     def __del__(self):
         """Clean up audio resources when application closes"""
@@ -236,14 +781,22 @@ class SortingVisualizerApp:
             self.audio_manager.cleanup()
 
 class CompareWindow:
-    def __init__(self, parent, data_size):
+    POLL_MS = 50
+    
+    def __init__(self, parent, data, options=None):
         self.window = tk.Toplevel(parent)
         self.window.title("Algorithm Comparison")
         self.window.geometry("1000x700")
         self.window.configure(bg='#2c3e50')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
         
-        self.data_size = data_size
-        self.sorting = SortingAlgorithms()  # No audio for comparison
+        self.data = data
+        self.data_size = len(data)
+        self.options = options or {}
+        self.processes = None
+        self.futures = {}
+        self.results = []
+        self.status = tk.StringVar(value="")
         
         self.setup_ui()
         self.run_comparison()
@@ -267,89 +820,529 @@ class CompareWindow:
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=(10, 0))
         
+        ttk.Label(button_frame, textvariable=self.status).pack(side=tk.LEFT)
         ttk.Button(button_frame, text="Close", 
-                  command=self.window.destroy).pack(side=tk.RIGHT)
+                  command=self.close).pack(side=tk.RIGHT)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel)
+        self.cancel_button.pack(side=tk.RIGHT, padx=(0, 5))
         
     def run_comparison(self):
-        algorithms = ["Bubble Sort", "Selection Sort", "Insertion Sort", 
-                     "Merge Sort", "Quick Sort", "Heap Sort"]
+        """Run every algorithm in its own worker process.
         
-        results = []
+        Workers only send back counters and timings; results are shown as
+        each algorithm finishes. O(n^2) algorithms above the benchmark's
+        size cutoff only report their counts; timing them would keep the
+        window busy for far longer than everything else.
+        """
+        from src.benchmark import measure_counters, MAX_QUADRATIC_SIZE
+        self.max_quadratic_size = MAX_QUADRATIC_SIZE
+        algorithms = registry.names()
         
-        for algo in algorithms:
-            # Generate test data
-            test_data = list(range(1, self.data_size + 1))
-            random.shuffle(test_data)
-            
-            start_time = time.time()
+        # Every algorithm gets the current input so the counts are comparable
+        test_data = self.data
+        
+        self.processes = ProcessGroup(max_workers=min(len(algorithms), os.cpu_count() or 1))
+        self.futures = {self.processes.submit(measure_counters, algo, test_data, self.options,
+                                             self.max_quadratic_size): algo
+                        for algo in algorithms}
+        self.status.set(f"Running 0/{len(algorithms)}...")
+        self.display_results(self.results)
+        self.window.after(self.POLL_MS, self.poll_results)
+        
+    def poll_results(self):
+        """Collect finished workers and refresh the table"""
+        if self.processes is None:
+            return
             
-            try:
-                if algo == "Bubble Sort":
-                    steps = list(self.sorting.bubble_sort(test_data.copy()))
-                elif algo == "Selection Sort":
-                    steps = list(self.sorting.selection_sort(test_data.copy()))
-                elif algo == "Insertion Sort":
-                    steps = list(self.sorting.insertion_sort(test_data.copy()))
-                elif algo == "Merge Sort":
-                    steps = list(self.sorting.merge_sort(test_data.copy()))
-                elif algo == "Quick Sort":
-                    steps = list(self.sorting.quick_sort(test_data.copy()))
-                elif algo == "Heap Sort":
-                    steps = list(self.sorting.heap_sort(test_data.copy()))
-                
-                elapsed_time = time.time() - start_time
-                
-                # Get final statistics
-                if steps:
-                    final_comparisons = steps[-1][2]
-                    final_swaps = steps[-1][3]
-                else:
-                    final_comparisons = final_swaps = 0
-                    
-                results.append({
-                    'algorithm': algo,
-                    'time': elapsed_time,
-                    'comparisons': final_comparisons,
-                    'swaps': final_swaps
-                })
-                
-            except Exception as e:
-                results.append({
+        self.processes.poll()
+        for future in [f for f in self.futures if f.done()]:
+            algo = self.futures.pop(future)
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is None:
+                self.results.append(future.result())
+            else:
+                self.results.append({
                     'algorithm': algo,
                     'time': 0,
                     'comparisons': 0,
                     'swaps': 0,
-                    'error': str(e)
+                    'error': f"{type(error).__name__}: {error}"
                 })
+            self.display_results(self.results)
+            
+        total = len(self.results) + len(self.futures)
+        if self.futures:
+            self.status.set(f"Running {len(self.results)}/{total}...")
+            self.window.after(self.POLL_MS, self.poll_results)
+        else:
+            self.status.set(f"Done {len(self.results)}/{total}")
+            self.cancel_button.state(['disabled'])
+            self.shutdown()
             
-        # Display results
-        self.display_results(results)
+    def cancel(self):
+        """Stop the algorithms that have not finished yet"""
+        if self.processes is None:
+            return
+        remaining = sorted(self.futures.values())
+        self.futures.clear()
+        self.shutdown(terminate=True)
+        self.cancel_button.state(['disabled'])
+        self.status.set(f"Cancelled ({', '.join(remaining)} not finished)")
+        
+    def shutdown(self, terminate=False):
+        if self.processes is not None:
+            self.processes.shutdown(terminate)
+            self.processes = None
+        
+    def close(self):
+        self.cancel()
+        self.window.destroy()
         
     def display_results(self, results):
         self.results_text.delete(1.0, tk.END)
         
-        # Sort by execution time
-        results.sort(key=lambda x: x['time'])
+        # Sort by execution time; untimed algorithms go last
+        results.sort(key=lambda x: math.inf if x['time'] is None else x['time'])
         
         self.results_text.insert(tk.END, "ALGORITHM COMPARISON RESULTS\n")
         self.results_text.insert(tk.END, "=" * 50 + "\n\n")
         self.results_text.insert(tk.END, f"Data Size: {self.data_size}\n\n")
         
+        width = registry.name_width()
         for i, result in enumerate(results, 1):
             if 'error' in result:
                 self.results_text.insert(tk.END, 
-                    f"{i}. {result['algorithm']:15} | "
+                    f"{i:2}. {result['algorithm']:{width}} | "
                     f"ERROR: {result['error']}\n")
+            elif result['time'] is None:
+                self.results_text.insert(tk.END, 
+                    f"{i:2}. {result['algorithm']:{width}} | "
+                    f"Time: skipped (O(n^2) above {self.max_quadratic_size:,}) | "
+                    f"Comparisons: {result['comparisons']:6} | "
+                    f"Swaps: {result['swaps']:6}\n")
             else:
                 self.results_text.insert(tk.END, 
-                    f"{i}. {result['algorithm']:15} | "
+                    f"{i:2}. {result['algorithm']:{width}} | "
                     f"Time: {result['time']:6.3f}s | "
                     f"Comparisons: {result['comparisons']:6} | "
                     f"Swaps: {result['swaps']:6}\n")
 
-def main():
+class ExternalSortWindow:
+    """Sorts a record file larger than memory (``src.external_sort``) on a
+    background thread and shows its progress block by block"""
+    POLL_MS = 100
+    # More runs than this share cells in the run view
+    MAX_CELLS = 256
+    
+    def __init__(self, parent):
+        self.window = tk.Toplevel(parent)
+        self.window.title("External Sort")
+        self.window.geometry("900x520")
+        self.window.configure(bg='#2c3e50')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        from src.external_sort import DTYPES
+        self.input_path = tk.StringVar()
+        self.output_path = tk.StringVar()
+        self.dtype = tk.StringVar(value=DTYPES[0])
+        self.memory = tk.StringVar(value="256M")
+        self.chunk = tk.StringVar(value="")
+        self.buffer = tk.StringVar(value="4M")
+        self.fan_in = tk.StringVar(value="")
+        self.fraction = tk.DoubleVar(value=0.0)
+        self.status = tk.StringVar(value="Choose a file of int32 or float64 records")
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.progress = None
+        self.error = None
+        
+        self.setup_ui(DTYPES)
+        
+    def setup_ui(self, dtypes):
+        main_frame = ttk.Frame(self.window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        file_frame = ttk.LabelFrame(main_frame, text="Files", padding=10)
+        file_frame.pack(fill=tk.X, pady=(0, 10))
+        for row, (label, variable, browse) in enumerate((
+                ("Input:", self.input_path, self.browse_input),
+                ("Output:", self.output_path, self.browse_output))):
+            ttk.Label(file_frame, text=label).grid(row=row, column=0, sticky=tk.W, padx=(0, 10))
+            ttk.Entry(file_frame, textvariable=variable, width=80).grid(row=row, column=1, padx=(0, 10))
+            ttk.Button(file_frame, text="Browse...", command=browse).grid(row=row, column=2)
+        
+        # Sizes take K/M/G suffixes; a blank chunk or fan-in follows the budget
+        settings_frame = ttk.LabelFrame(main_frame, text="Settings", padding=10)
+        settings_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(settings_frame, text="Records:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Combobox(settings_frame, textvariable=self.dtype, values=dtypes, 
+                     state="readonly", width=8).pack(side=tk.LEFT, padx=(0, 15))
+        for label, variable in (("Memory:", self.memory), ("Chunk:", self.chunk),
+                                ("Buffer:", self.buffer), ("Fan-in:", self.fan_in)):
+            ttk.Label(settings_frame, text=label).pack(side=tk.LEFT, padx=(0, 5))
+            ttk.Entry(settings_frame, textvariable=variable, width=8).pack(side=tk.LEFT, padx=(0, 15))
+        self.start_button = ttk.Button(settings_frame, text="Start", command=self.start)
+        self.start_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.cancel_button = ttk.Button(settings_frame, text="Cancel", command=self.cancel)
+        self.cancel_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.cancel_button.state(['disabled'])
+        ttk.Button(settings_frame, text="Close", command=self.close).pack(side=tk.LEFT)
+        
+        progress_frame = ttk.LabelFrame(main_frame, text="Progress", padding=10)
+        progress_frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Progressbar(progress_frame, variable=self.fraction, maximum=1.0).pack(fill=tk.X)
+        ttk.Label(progress_frame, textvariable=self.status).pack(anchor=tk.W, pady=(5, 5))
+        # Runs as cells while they are created, then the merged runs as
+        # bars filled up to the bytes consumed
+        self.blocks = tk.Canvas(progress_frame, bg='#ecf0f1', highlightthickness=0)
+        self.blocks.pack(fill=tk.BOTH, expand=True)
+        
+    def browse_input(self):
+        path = filedialog.askopenfilename(title="Records to sort", parent=self.window)
+        if path:
+            self.input_path.set(path)
+            if not self.output_path.get():
+                self.output_path.set(path + ".sorted")
+        
+    def browse_output(self):
+        path = filedialog.asksaveasfilename(title="Write sorted records to", parent=self.window)
+        if path:
+            self.output_path.set(path)
+        
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        from src.external_sort import parse_size
+        try:
+            memory = parse_size(self.memory.get())
+            chunk = parse_size(self.chunk.get()) if self.chunk.get().strip() else None
+            buffer = parse_size(self.buffer.get()) if self.buffer.get().strip() else None
+            fan_in = int(self.fan_in.get()) if self.fan_in.get().strip() else None
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid setting: {e}", parent=self.window)
+            return
+        source, target = self.input_path.get(), self.output_path.get()
+        if not source or not target:
+            messagebox.showerror("Error", "Choose an input and an output file", parent=self.window)
+            return
+        
+        self.stop_event.clear()
+        self.progress = None
+        self.error = None
+        self.thread = threading.Thread(
+            target=self.run, args=(source, target, self.dtype.get(), memory, chunk, buffer, fan_in),
+            daemon=True)
+        self.thread.start()
+        self.start_button.state(['disabled'])
+        self.cancel_button.state(['!disabled'])
+        self.status.set("Starting...")
+        self.window.after(self.POLL_MS, self.poll)
+        
+    def run(self, source, target, dtype, memory, chunk, buffer, fan_in):
+        from src.external_sort import external_sort
+        
+        def on_block(progress):
+            self.progress = progress
+        
+        try:
+            external_sort(source, target, dtype, memory, chunk, buffer, fan_in,
+                          on_block=on_block, stop=self.stop_event)
+        except Exception as e:
+            self.error = e
+        
+    def poll(self):
+        """Show the latest progress; the sort thread only updates counters"""
+        if not self.window.winfo_exists():
+            return
+        progress = self.progress
+        if progress is not None:
+            self.fraction.set(progress.fraction)
+            self.status.set(progress.summary())
+            self.draw_blocks(progress)
+        if self.thread.is_alive():
+            self.window.after(self.POLL_MS, self.poll)
+            return
+        
+        self.start_button.state(['!disabled'])
+        self.cancel_button.state(['disabled'])
+        if self.error is not None:
+            self.status.set(f"Stopped: {self.error} (output not written)")
+        
+    def draw_blocks(self, progress):
+        canvas = self.blocks
+        canvas.delete('all')
+        width = max(canvas.winfo_width(), 1)
+        height = max(canvas.winfo_height(), 1)
+        
+        if progress.phase == 'merge' and progress.group:
+            # One bar per run being merged, filled up to the bytes consumed
+            rows = len(progress.group)
+            row_height = height / rows
+            for i, (size, consumed) in enumerate(zip(progress.group, progress.consumed)):
+                top = i * row_height
+                bottom = top + max(row_height - 2, 1)
+                canvas.create_rectangle(0, top, width, bottom, fill='#bdc3c7', outline='')
+                filled = width * consumed / size if size else width
+                canvas.create_rectangle(0, top, filled, bottom, fill='#3498db', outline='')
+            return
+        
+        # One cell per run (or per group of runs), filled once created
+        runs = max(progress.runs_total, 1)
+        cells = min(runs, self.MAX_CELLS)
+        columns = min(cells, 32)
+        cell_width = width / columns
+        cell_height = min(height / -(-cells // columns), cell_width)
+        done = cells if progress.phase == 'done' else progress.runs_created * cells // runs
+        for cell in range(cells):
+            x = (cell % columns) * cell_width
+            y = (cell // columns) * cell_height
+            color = '#2ecc71' if progress.phase == 'done' else '#3498db' if cell < done else '#bdc3c7'
+            canvas.create_rectangle(x + 1, y + 1, x + cell_width - 1, y + cell_height - 1,
+                                    fill=color, outline='')
+        
+    def cancel(self):
+        self.stop_event.set()
+        
+    def close(self):
+        self.stop_event.set()
+        self.window.destroy()
+
+class RacePanel:
+    """One racing algorithm: its ring, its copy of the array and its axes"""
+    
+    def __init__(self, name, ring, values, visualizer):
+        self.name = name
+        self.ring = ring
+        self.values = values
+        self.visualizer = visualizer
+        self.future = None
+        self.place = None
+        self.error = None
+        self.title_text = ""
+        self.title_time = 0.0
+        
+    def title(self, now=None):
+        """Panel title; with ``now`` given it is refreshed at most every
+        TITLE_INTERVAL seconds, as redrawing text costs more than the bars"""
+        if now is not None and now - self.title_time < RaceWindow.TITLE_INTERVAL:
+            return self.title_text
+        from src.race import COMPARISONS, SWAPS, ELAPSED_US
+        header = self.ring.header
+        title = (f"{self.name} - C: {int(header[COMPARISONS]):,} "
+                 f"S: {int(header[SWAPS]):,}")
+        if self.error:
+            title = f"{self.name} - ERROR"
+        elif self.place is not None:
+            title += f"  #{self.place} in {header[ELAPSED_US] / 1e6:.2f}s"
+        self.title_text, self.title_time = title, now or 0.0
+        return title
+
+class RaceWindow:
+    """Runs several algorithms side by side on the same input.
+    
+    Each algorithm sorts in its own worker process and streams its writes
+    through a shared-memory ring (see ``src.race``); a single render loop on
+    the Tk thread drains every ring and redraws all panels once per tick.
+    """
+    TITLE_INTERVAL = 0.1
+    
+    def __init__(self, parent, data, speed, options):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Algorithm Race")
+        self.window.geometry("1400x900")
+        self.window.configure(bg='#2c3e50')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.data = data
+        self.options = options
+        self.speed = tk.DoubleVar(value=speed)
+        self.speed_text = tk.StringVar()
+        self.status = tk.StringVar(value="")
+        self.processes = None
+        self.panels = []
+        self.finished = 0
+        self.tick_ms = 0.0
+        
+        self.setup_ui()
+        
+    def setup_ui(self):
+        main_frame = ttk.Frame(self.window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        control_frame = ttk.LabelFrame(main_frame, text="Race", padding=10)
+        control_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # Everything except the O(n^2) sorts races by default
+        self.algorithm_list = tk.Listbox(control_frame, selectmode=tk.MULTIPLE, 
+                                         height=4, exportselection=False)
+        for i, name in enumerate(registry.names()):
+            self.algorithm_list.insert(tk.END, name)
+            if not registry.get(name).quadratic:
+                self.algorithm_list.selection_set(i)
+        self.algorithm_list.pack(side=tk.LEFT, padx=(0, 20))
+        
+        ttk.Label(control_frame, text="Speed:").pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Scale(control_frame, from_=0, to=6.5, variable=self.speed, 
+                 orient=tk.HORIZONTAL, length=150,
+                 command=lambda _: self.update_speed_text()).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(control_frame, textvariable=self.speed_text, width=16).pack(side=tk.LEFT, padx=(0, 20))
+        self.update_speed_text()
+        
+        ttk.Button(control_frame, text="Start Race", 
+                  command=self.start).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(control_frame, text="Stop", 
+                  command=self.stop).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(control_frame, text="Close", 
+                  command=self.close).pack(side=tk.LEFT, padx=(0, 20))
+        ttk.Label(control_frame, textvariable=self.status).pack(side=tk.LEFT)
+        
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        viz_frame = ttk.Frame(main_frame)
+        viz_frame.pack(fill=tk.BOTH, expand=True)
+        self.fig = Figure(figsize=(14, 8))
+        self.fig.patch.set_facecolor('#2c3e50')
+        self.canvas = FigureCanvasTkAgg(self.fig, master=viz_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+    def steps_per_second(self):
+        return 10 ** self.speed.get()
+        
+    def update_speed_text(self):
+        self.speed_text.set(f"{self.steps_per_second():,.0f} steps/s")
+        
+    def start(self):
+        names = [self.algorithm_list.get(i) for i in self.algorithm_list.curselection()]
+        if not names:
+            messagebox.showwarning("Warning", "Select at least one algorithm to race!", 
+                                   parent=self.window)
+            return
+        self.stop()
+        
+        import numpy as np
+        from src.race import EventRing, race_worker, RATE
+        from src.visualizer import SortingVisualizer, RasterVisualizer
+        # Lay the panels out on a near-square grid
+        cols = math.ceil(math.sqrt(len(names)))
+        rows = math.ceil(len(names) / cols)
+        self.fig.clear()
+        n = len(self.data)
+        for i, name in enumerate(names):
+            ax = self.fig.add_subplot(rows, cols, i + 1)
+            renderer, _ = registry.modes(name, n)
+            view = SortingVisualizer(title_size=10) if renderer == 'bars' \
+                else RasterVisualizer(title_size=10)
+            view.setup_plot(self.fig, ax, self.canvas)
+            self.panels.append(RacePanel(name, EventRing.create(), 
+                                         np.array(self.data, dtype=np.int64), view))
+        self.fig.subplots_adjust(hspace=0.45, wspace=0.25)
+        for panel in self.panels:
+            panel.visualizer.draw_data(panel.values, title=panel.title(), redraw=False)
+            panel.visualizer.ax.set_xlabel('')
+            panel.visualizer.ax.set_ylabel('')
+        self.canvas.draw()
+        
+        rate = int(self.steps_per_second())
+        self.processes = ProcessGroup(max_workers=len(self.panels))
+        for panel in self.panels:
+            panel.ring.header[RATE] = rate
+            panel.future = self.processes.submit(race_worker, panel.name, panel.ring.name,
+                                                panel.ring.capacity, self.data,
+                                                self.options)
+        self.finished = 0
+        self.window.after(0, self.render_tick)
+        
+    def render_tick(self):
+        """Drain every ring, redraw every panel, then schedule the next tick"""
+        if self.processes is None:
+            return
+        self.processes.poll()
+        from src.race import (apply_writes, LAST_OP, LAST_A, LAST_B, STATE, RATE,
+                              RUNNING, DONE)
+        started = time.perf_counter()
+        rate = int(self.steps_per_second())
+        
+        for panel in self.panels:
+            header = panel.ring.header
+            header[RATE] = rate
+            # Read the state before draining: a worker only reports DONE
+            # after publishing its last batch, so that batch is in this pull
+            state = header[STATE]
+            changed = apply_writes(panel.values, panel.ring.pull())
+            highlights = event_highlights((int(header[LAST_OP]), int(header[LAST_A]), 
+                                           int(header[LAST_B])))
+            if panel.place is None and state != RUNNING:
+                if state == DONE:
+                    self.finished += 1
+                    panel.place = self.finished
+                    highlights = []
+                else:
+                    error = panel.future.exception() if panel.future.done() else None
+                    panel.error = f"{type(error).__name__}: {error}" if error else "worker failed"
+                    panel.place = 0
+            title = panel.title(None if panel.place is not None else started)
+            panel.visualizer.update_plot(panel.values, highlights, title, changed)
+            
+        elapsed = (time.perf_counter() - started) * 1000
+        self.tick_ms = 0.9 * self.tick_ms + 0.1 * elapsed
+        running = sum(panel.place is None for panel in self.panels)
+        self.status.set(f"{running} running, {self.finished} finished | "
+                        f"render {self.tick_ms:.1f} ms/frame")
+        if running:
+            self.window.after(max(1, int(1000 / TARGET_FPS - elapsed)), self.render_tick)
+        else:
+            self.shutdown()
+            
+    def stop(self):
+        """Stop any running workers and release the rings"""
+        from src.race import STOP
+        for panel in self.panels:
+            if panel.ring.header is not None:
+                panel.ring.header[STOP] = 1
+        self.shutdown(terminate=True)
+        for panel in self.panels:
+            panel.visualizer.detach()
+            panel.ring.close(unlink=True)
+        self.panels = []
+        
+    def shutdown(self, terminate=False):
+        if self.processes is not None:
+            self.processes.shutdown(terminate)
+            self.processes = None
+        
+    def close(self):
+        self.stop()
+        self.window.destroy()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sorting Algorithm Visualizer")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="print import and initialization timings once everything has loaded")
+    return parser.parse_args(argv)
+
+def main(argv=None, started=None):
+    """Start the app; ``started`` is the launch time (time.perf_counter()),
+    taken by run.py before any of the app was imported"""
+    args = parse_args(argv)
+    timer = StartupTimer(started)
+    timer.mark("src.main imported")
     root = tk.Tk()
-    app = SortingVisualizerApp(root)
+    timer.mark("Tk initialized")
+    app = SortingVisualizerApp(root, timer)
+    timer.mark("controls built")
+    root.update()
+    timer.mark("first paint")
+    
+    if args.measure_startup:
+        def report():
+            audio = app.audio_manager.setup_thread
+            if app.visualizer is None or audio is None or audio.is_alive():
+                root.after(LOADING_POLL_MS, report)
+            else:
+                timer.report()
+        root.after(LOADING_POLL_MS, report)
     
     # Handle application close properly
     def on_closing():
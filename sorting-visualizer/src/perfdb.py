@@ -0,0 +1,337 @@
+"""
+Benchmark history in a local SQLite database, growth-curve fits and
+regression checks between commits.
+
+``python -m src.benchmark --record`` stores every timing sample of a run
+under the current commit (``git describe --always --dirty``). Samples are
+keyed by commit, algorithm, distribution, size and path (fast,
+instrumented, counting); runs recorded for the same commit are pooled.
+
+Each (algorithm, distribution, path) gets a fitted growth curve
+
+    t(n) = a * n^b * (ln n)^c
+
+by least squares on log t, over every sample at sizes of at least
+FIT_MIN_SIZE (smaller inputs are dominated by call overhead). The 95%
+confidence intervals of b and c come from a bootstrap that resamples the
+timings within each size. With only two sizes c is fixed at 0.
+
+``compare`` checks a candidate commit against a baseline, size by size,
+with a one-sided Mann-Whitney test of the timing samples. A cell is
+flagged when the test is significant at --alpha and the median slowed down
+by more than --min-slowdown. A growth curve is flagged when the candidate's
+interval for b lies entirely above the baseline's. The command exits with
+status 1 if anything was flagged, so it can gate CI.
+
+The database lives in ``$SORTING_VISUALIZER_PERFDB`` or
+``~/.local/share/sorting-visualizer/benchmarks.sqlite``. Run from the
+sorting-visualizer directory:
+    python -m src.benchmark --sizes 1000 10000 100000 --repeats 7 --record
+    python -m src.perfdb runs
+    python -m src.perfdb fit --paths instrumented
+    python -m src.perfdb compare 9d5c12a --alpha 0.01
+"""
+
+import argparse
+import itertools
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+DB_ENV = "SORTING_VISUALIZER_PERFDB"
+FIT_MIN_SIZE = 64
+BOOTSTRAP_ROUNDS = 500
+CONFIDENCE = 0.95
+# Exact permutation test up to this many rank arrangements, normal approximation beyond
+EXACT_LIMIT = 20000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    commit_id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    host TEXT,
+    python TEXT,
+    seed INTEGER
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    algorithm TEXT NOT NULL,
+    distribution TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_case ON samples (algorithm, distribution, path, size);
+"""
+
+Key = Tuple[str, str, str]
+
+
+def db_path() -> str:
+    return os.environ.get(DB_ENV) or os.path.join(
+        os.path.expanduser("~"), ".local", "share", "sorting-visualizer", "benchmarks.sqlite")
+
+
+def current_commit() -> str:
+    """Short commit of the working tree, ``-dirty`` if it has local changes"""
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"],
+                                capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return result.stdout.strip() or "unknown"
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    path = path or db_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def record_run(db: sqlite3.Connection, rows: List[Dict], commit: Optional[str] = None,
+               seed: int = 0) -> int:
+    """Store the timing samples of benchmark ``rows``; returns the run id"""
+    with db:
+        run_id = db.execute(
+            "INSERT INTO runs (commit_id, recorded_at, host, python, seed) VALUES (?, ?, ?, ?, ?)",
+            (commit or current_commit(), datetime.now(timezone.utc).isoformat(timespec="seconds"),
+             platform.node(), platform.python_version(), seed)).lastrowid
+        db.executemany(
+            "INSERT INTO samples (run_id, algorithm, distribution, size, path, ns) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(run_id, row["algorithm"], row["distribution"], row["size"], row["path"], ns)
+             for row in rows if not row.get("error") for ns in row.get("samples", ())])
+    return run_id
+
+
+def list_runs(db: sqlite3.Connection) -> List[Dict]:
+    query = ("SELECT runs.id, commit_id, recorded_at, host, COUNT(samples.run_id) "
+             "FROM runs LEFT JOIN samples ON samples.run_id = runs.id "
+             "GROUP BY runs.id ORDER BY runs.id")
+    return [{"id": run_id, "commit": commit, "recorded_at": recorded_at, "host": host,
+             "samples": count} for run_id, commit, recorded_at, host, count in db.execute(query)]
+
+
+def latest_commit(db: sqlite3.Connection) -> Optional[str]:
+    row = db.execute("SELECT commit_id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def load_samples(db: sqlite3.Connection, commit: str,
+                 paths: Optional[Sequence[str]] = None) -> Dict[Key, Dict[int, List[int]]]:
+    """{(algorithm, distribution, path): {size: [ns, ...]}} for one commit"""
+    cases: Dict[Key, Dict[int, List[int]]] = {}
+    query = ("SELECT algorithm, distribution, path, size, ns FROM samples "
+             "JOIN runs ON runs.id = samples.run_id WHERE commit_id = ?")
+    for algorithm, distribution, path, size, ns in db.execute(query, (commit,)):
+        if paths and path not in paths:
+            continue
+        cases.setdefault((algorithm, distribution, path), {}).setdefault(size, []).append(ns)
+    return cases
+
+
+def design(sizes: np.ndarray, with_log: bool) -> np.ndarray:
+    logs = np.log(sizes)
+    columns = [np.ones_like(logs), logs] + ([np.log(logs)] if with_log else [])
+    return np.column_stack(columns)
+
+
+def fit_growth(by_size: Dict[int, List[int]], min_size: int = FIT_MIN_SIZE,
+               rounds: int = BOOTSTRAP_ROUNDS, seed: int = 0) -> Optional[Dict]:
+    """Fit ``a * n^b * (ln n)^c`` to timings in ns; None with fewer than
+    two sizes of at least ``min_size``"""
+    groups = [(size, np.log(np.asarray(times, dtype=np.float64)))
+              for size, times in sorted(by_size.items()) if size >= max(min_size, 3) and times]
+    if len(groups) < 2:
+        return None
+    with_log = len(groups) >= 3
+    sizes = np.concatenate([np.full(len(times), size, dtype=np.float64) for size, times in groups])
+    y = np.concatenate([times for _, times in groups])
+    X = design(sizes, with_log)
+    coef = np.linalg.lstsq(X, y, rcond=None)[0]
+
+    # Resample within each size so every bootstrap fit sees the same sizes
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum([0] + [len(times) for _, times in groups[:-1]])
+    lengths = [len(times) for _, times in groups]
+    boot = np.empty((rounds, X.shape[1]))
+    for r in range(rounds):
+        picks = np.concatenate([start + rng.integers(0, length, length)
+                                for start, length in zip(starts, lengths)])
+        boot[r] = np.linalg.lstsq(X[picks], y[picks], rcond=None)[0]
+    tail = (1 - CONFIDENCE) / 2 * 100
+    low, high = np.percentile(boot, [tail, 100 - tail], axis=0)
+
+    residuals = y - X @ coef
+    return {
+        "a": float(np.exp(coef[0])),
+        "b": float(coef[1]),
+        "c": float(coef[2]) if with_log else 0.0,
+        "b_ci": (float(low[1]), float(high[1])),
+        "c_ci": (float(low[2]), float(high[2])) if with_log else (0.0, 0.0),
+        "sizes": len(groups),
+        "samples": len(y),
+        # Typical relative error of the curve
+        "scatter": float(np.exp(np.std(residuals)) - 1),
+    }
+
+
+def predict(fit: Dict, size: int) -> float:
+    """Fitted time in ns at ``size``"""
+    return fit["a"] * size ** fit["b"] * math.log(size) ** fit["c"]
+
+
+def mann_whitney_greater(baseline: Sequence[float], candidate: Sequence[float]) -> float:
+    """One-sided p-value that ``candidate`` tends to be larger than ``baseline``"""
+    pooled = list(baseline) + list(candidate)
+    n1, n2 = len(baseline), len(candidate)
+    if not n1 or not n2:
+        return 1.0
+    # Mid-ranks, so ties share their rank
+    order = sorted(range(len(pooled)), key=pooled.__getitem__)
+    ranks = [0.0] * len(pooled)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and pooled[order[j + 1]] == pooled[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    observed = sum(ranks[n1:])
+
+    if math.comb(n1 + n2, n2) <= EXACT_LIMIT:
+        # Every way the candidate's ranks could have fallen
+        tolerance = 1e-9
+        at_least = sum(1 for chosen in itertools.combinations(ranks, n2)
+                       if sum(chosen) >= observed - tolerance)
+        return at_least / math.comb(n1 + n2, n2)
+
+    n = n1 + n2
+    mean = n2 * (n + 1) / 2
+    ties = sum(count ** 3 - count for count in
+               (sum(1 for r in ranks if r == value) for value in set(ranks)))
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (observed - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(db: sqlite3.Connection, baseline: str, candidate: str, alpha: float = 0.01,
+            min_slowdown: float = 0.10, paths: Optional[Sequence[str]] = None,
+            min_size: int = FIT_MIN_SIZE) -> Tuple[List[Dict], List[Dict]]:
+    """(per-size rows, per-curve rows) of ``candidate`` against ``baseline``"""
+    before = load_samples(db, baseline, paths)
+    after = load_samples(db, candidate, paths)
+    cells, curves = [], []
+    for key in sorted(set(before) & set(after)):
+        algorithm, distribution, path = key
+        label = {"algorithm": algorithm, "distribution": distribution, "path": path}
+        for size in sorted(set(before[key]) & set(after[key])):
+            old, new = before[key][size], after[key][size]
+            ratio = statistics.median(new) / statistics.median(old)
+            p_value = mann_whitney_greater(old, new)
+            cells.append(dict(label, size=size, baseline_ms=statistics.median(old) / 1e6,
+                              candidate_ms=statistics.median(new) / 1e6, ratio=ratio,
+                              p_value=p_value,
+                              regression=p_value < alpha and ratio > 1 + min_slowdown))
+        old_fit = fit_growth(before[key], min_size)
+        new_fit = fit_growth(after[key], min_size)
+        if old_fit and new_fit:
+            curves.append(dict(label, baseline=old_fit, candidate=new_fit,
+                               regression=new_fit["b_ci"][0] > old_fit["b_ci"][1]))
+    return cells, curves
+
+
+def format_fit(fit: Dict) -> str:
+    b_low, b_high = fit["b_ci"]
+    text = f"n^{fit['b']:.3f} [{b_low:.3f}, {b_high:.3f}]"
+    if fit["sizes"] >= 3:
+        c_low, c_high = fit["c_ci"]
+        text += f" * ln^{fit['c']:.2f} n [{c_low:.2f}, {c_high:.2f}]"
+    return f"{fit['a']:.3g} ns * {text}  (+/-{fit['scatter']:.0%}, {fit['sizes']} sizes)"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark history, growth fits and regressions")
+    parser.add_argument("--db", help=f"SQLite database (default: ${DB_ENV} or {db_path()})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("runs", help="list the recorded runs")
+    fit = commands.add_parser("fit", help="fit growth curves for one commit")
+    fit.add_argument("--commit", help="commit to fit (default: the latest recorded)")
+    compare_parser = commands.add_parser("compare", help="flag slowdowns against a baseline")
+    compare_parser.add_argument("baseline", help="baseline commit")
+    compare_parser.add_argument("candidate", nargs="?",
+                                help="candidate commit (default: the latest recorded)")
+    compare_parser.add_argument("--alpha", type=float, default=0.01,
+                                help="significance level of the per-size test")
+    compare_parser.add_argument("--min-slowdown", type=float, default=0.10,
+                                help="ignore median slowdowns below this fraction")
+    compare_parser.add_argument("--all", action="store_true", help="print unflagged cells too")
+    for sub in (fit, compare_parser):
+        sub.add_argument("--paths", nargs="+", choices=["fast", "instrumented", "counting"],
+                         help="benchmark paths to include (default: all)")
+        sub.add_argument("--min-size", type=int, default=FIT_MIN_SIZE,
+                         help="smallest size used in the growth fits")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    db = connect(args.db)
+
+    if args.command == "runs":
+        for run in list_runs(db):
+            print(f"{run['id']:>5} | {run['commit']:20} | {run['recorded_at']} | "
+                  f"{run['host']} | {run['samples']:,} samples")
+        return
+
+    if args.command == "fit":
+        commit = args.commit or latest_commit(db)
+        if commit is None:
+            raise SystemExit("error: no runs recorded")
+        print(f"Growth curves for {commit}")
+        for (algorithm, distribution, path), by_size in sorted(load_samples(db, commit, args.paths).items()):
+            fit = fit_growth(by_size, args.min_size)
+            curve = format_fit(fit) if fit else "(needs two sizes)"
+            print(f"{algorithm:15} | {distribution:13} | {path:12} | {curve}")
+        return
+
+    candidate = args.candidate or latest_commit(db)
+    cells, curves = compare(db, args.baseline, candidate, args.alpha, args.min_slowdown,
+                            args.paths, args.min_size)
+    if not cells:
+        raise SystemExit(f"error: no cases recorded for both {args.baseline} and {candidate}")
+    print(f"{candidate} against {args.baseline}")
+    for cell in cells:
+        if cell["regression"] or args.all:
+            flag = "SLOWER" if cell["regression"] else ""
+            print(f"{cell['algorithm']:15} | {cell['distribution']:13} | {cell['path']:12} | "
+                  f"{cell['size']:>8} | {cell['baseline_ms']:10.3f} -> {cell['candidate_ms']:10.3f} ms "
+                  f"| x{cell['ratio']:.3f} | p {cell['p_value']:.4f} {flag}")
+    for curve in curves:
+        if curve["regression"] or args.all:
+            flag = "STEEPER" if curve["regression"] else ""
+            print(f"{curve['algorithm']:15} | {curve['distribution']:13} | {curve['path']:12} | "
+                  f"b {curve['baseline']['b']:.3f} -> {curve['candidate']['b']:.3f} {flag}")
+    slower = sum(cell["regression"] for cell in cells)
+    steeper = sum(curve["regression"] for curve in curves)
+    print(f"{len(cells)} cases, {slower} significantly slower; "
+          f"{len(curves)} curves, {steeper} with steeper growth")
+    if slower or steeper:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
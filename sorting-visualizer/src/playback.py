@@ -0,0 +1,202 @@
+"""
+Frame-rate-decoupled playback of step-event streams.
+
+The sort thread advances the generator at a requested number of steps per
+second and folds every event into a pending frame. The UI thread picks that
+frame up once per display tick, so any number of steps between two ticks
+costs a single redraw, and ticks the UI misses are simply merged into the
+next one.
+
+The array itself is a ``SharedArray``: each batch of steps is one write
+under its sequence counter, and the renderer reads the indices a frame
+changed straight from it instead of receiving a copy. Streams thinned at
+the source (see ``SortingAlgorithms.set_granularity``) no longer name every
+changed index, so their frames leave ``changed`` unset and the renderer
+compares the whole array instead.
+
+Streams of the parallel sorts name their worker before each burst of
+events (``WORKER``) and open every task with the worker's RANGE; frames
+carry the latest range claimed by each worker so the renderer can colour
+the partitions.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from src.profiler import Profiler, GENERATE, AUDIO
+from src.shared_array import SharedArray
+from src.step_events import (RANGE, WORKER, StepEvent, apply_event, changed_indices,
+                              event_highlights)
+
+# Upper bound on steps processed between two checks of the clock/stop flag
+MAX_BATCH = 4096
+
+class Frame:
+    """Everything the renderer needs to draw the state after a batch of steps"""
+
+    __slots__ = ('changed', 'highlights', 'steps', 'comparisons', 'swaps', 'partitions')
+
+    def __init__(self, changed: Optional[Set[int]], highlights: List[int], steps: int,
+                 comparisons: int, swaps: int,
+                 partitions: Optional[Dict[int, Tuple[int, int]]] = None):
+        self.changed = changed
+        self.highlights = highlights
+        self.steps = steps
+        self.comparisons = comparisons
+        self.swaps = swaps
+        # Worker -> inclusive (lo, hi) it last claimed, oldest claim first;
+        # None for streams without workers
+        self.partitions = partitions
+
+class PlaybackScheduler:
+    def __init__(self, rate: Callable[[], float], fps: int = 60,
+                 profiler: Optional[Profiler] = None):
+        """``rate`` is polled for the current steps-per-second target"""
+        self.rate = rate
+        self.profiler = profiler
+        self.fps = fps
+        self.frame_interval = 1.0 / fps
+        self.steps = 0
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+        self.running = False
+        self.finished = False
+        self.counters = None
+        self.exact_changes = True
+        self._lock = threading.Lock()
+        self._changed = set()
+        self._highlights = []
+        self._partitions = None
+        self._dirty = False
+        self._last_take = None
+
+    def stop(self):
+        """Ask the worker loop to stop after its current batch"""
+        self.running = False
+
+    def run(self, events: Iterable[StepEvent], buffer: SharedArray, counters,
+            on_event: Optional[Callable[[StepEvent], None]] = None,
+            in_place: bool = False, exact_changes: bool = True) -> bool:
+        """Drive ``events`` into ``buffer`` at the requested rate.
+
+        ``counters`` is the object holding ``comparisons``/``swaps`` (the
+        SortingAlgorithms instance), or None when replaying a trace. With
+        ``in_place`` the events come from a generator sorting
+        ``buffer.array`` itself, so they are not applied a second time.
+        Pass ``exact_changes=False`` when the events skip some of the
+        generator's writes; frames then carry no changed-index set.
+        Returns True if the stream was exhausted and False if playback was
+        stopped.
+        """
+        self.running = True
+        self.finished = False
+        self.counters = counters
+        self.exact_changes = exact_changes
+        with self._lock:
+            self._partitions = None
+        partitions = {}
+        worker = None
+        iterator = iter(events)
+        target = buffer.array
+        profiler = self.profiler
+        if profiler is not None:
+            iterator = profiler.timed(GENERATE, iterator)
+            if on_event is not None:
+                on_event = profiler.timed_call(AUDIO, on_event)
+
+        rate = max(self.rate(), 1e-3)
+        anchor_time = time.perf_counter()
+        anchor_step = 0
+        done = 0
+        exhausted = False
+
+        while self.running and not exhausted:
+            current_rate = max(self.rate(), 1e-3)
+            now = time.perf_counter()
+            if current_rate != rate:
+                # Re-anchor so a speed change applies from now on
+                rate = current_rate
+                anchor_time = now
+                anchor_step = done
+
+            due = anchor_step + int((now - anchor_time) * rate)
+            if due <= done:
+                wait = (done + 1 - anchor_step) / rate - (now - anchor_time)
+                time.sleep(min(max(wait, 0.0), self.frame_interval))
+                continue
+
+            batch = min(due - done, MAX_BATCH)
+            changed = set()
+            last_event = None
+            batch_start, first = (profiler.clock() if profiler is not None else 0), done
+            buffer.begin_write()
+            try:
+                for _ in range(batch):
+                    event = next(iterator, None)
+                    if event is None:
+                        exhausted = True
+                        break
+                    if not in_place:
+                        apply_event(target, event)
+                    if exact_changes:
+                        changed.update(changed_indices(event))
+                    if event[0] >= RANGE:
+                        if event[0] == WORKER:
+                            worker = event[1]
+                        elif worker is not None:
+                            # Re-inserted so later claims are painted last
+                            partitions.pop(worker, None)
+                            partitions[worker] = (event[1], event[2])
+                    if on_event is not None:
+                        on_event(event)
+                    last_event = event
+                    done += 1
+            finally:
+                buffer.end_write()
+            if profiler is not None:
+                profiler.batch(batch_start, profiler.clock(), done - first)
+
+            with self._lock:
+                self._changed |= changed
+                if last_event is not None:
+                    self._highlights = event_highlights(last_event)
+                if worker is not None:
+                    self._partitions = dict(partitions)
+                self.steps = done
+                self._dirty = True
+            # Hand the GIL to a renderer waiting for an even sequence number
+            time.sleep(0)
+
+        with self._lock:
+            self._highlights = []
+            self._dirty = True
+            self.finished = exhausted
+        self.running = False
+        return exhausted
+
+    def take_frame(self) -> Optional[Frame]:
+        """Collect everything that happened since the previous call.
+
+        Called from the UI thread once per tick; returns None when there is
+        nothing new to draw.
+        """
+        now = time.perf_counter()
+        last_take, self._last_take = self._last_take, now
+
+        with self._lock:
+            if not self._dirty:
+                return None
+            counters = self.counters
+            frame = Frame(self._changed if self.exact_changes else None, self._highlights, self.steps,
+                          counters.comparisons if counters else 0,
+                          counters.swaps if counters else 0, self._partitions)
+            self._changed = set()
+            self._dirty = False
+
+        # Ticks the UI was too busy to serve were folded into this frame
+        if last_take is not None:
+            missed = int((now - last_take) / self.frame_interval) - 1
+            if missed > 0:
+                self.frames_dropped += missed
+        self.frames_rendered += 1
+        return frame
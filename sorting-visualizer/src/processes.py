@@ -0,0 +1,98 @@
+"""
+Worker processes that the Tk windows can stop.
+
+``ProcessPoolExecutor`` cannot stop a call once it is running, so the
+windows that fan work out to processes (Compare All, Race) use
+``ProcessGroup`` instead: it starts one ``multiprocessing.Process`` per
+call, at most ``max_workers`` at a time, and owns them, so
+``shutdown(terminate=True)`` can stop the running ones. Calls are handed out
+as ordinary ``concurrent.futures.Future`` objects. The group has no
+background thread; its owner calls ``poll`` from a Tk timer to collect
+finished calls and start queued ones.
+"""
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Optional, Tuple
+
+
+def _call(connection, fn: Callable, args: Tuple) -> None:
+    """Process target: run ``fn(*args)`` and send back (ok, result or error)"""
+    try:
+        outcome = (True, fn(*args))
+    except Exception as e:
+        outcome = (False, e)
+    try:
+        connection.send(outcome)
+    except Exception as e:
+        # The result or the exception does not pickle
+        connection.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+    finally:
+        connection.close()
+
+
+class ProcessGroup:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.context = multiprocessing.get_context()
+        self.queued: Deque[Tuple[Future, Callable, Tuple]] = deque()
+        # (future, process, receiving end of its result pipe)
+        self.running: List[Tuple[Future, multiprocessing.Process, object]] = []
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue ``fn(*args)``; ``fn`` must be module level so it pickles"""
+        future = Future()
+        self.queued.append((future, fn, args))
+        self.poll()
+        return future
+
+    def poll(self) -> None:
+        """Resolve the futures of finished calls and start queued ones"""
+        running = []
+        for future, process, connection in self.running:
+            # Check before reading: a worker sends its outcome, then exits
+            alive = process.is_alive()
+            if connection.poll():
+                try:
+                    ok, value = connection.recv()
+                except EOFError:
+                    ok, value = False, None
+            elif alive:
+                running.append((future, process, connection))
+                continue
+            else:
+                ok, value = False, None
+            process.join()
+            connection.close()
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value or RuntimeError(
+                    f"Worker process exited with code {process.exitcode}"))
+        self.running = running
+
+        while self.queued and len(self.running) < self.max_workers:
+            future, fn, args = self.queued.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            receiver, sender = self.context.Pipe(duplex=False)
+            process = self.context.Process(target=_call, args=(sender, fn, args))
+            process.start()
+            sender.close()
+            self.running.append((future, process, receiver))
+
+    def shutdown(self, terminate: bool = False) -> None:
+        """Cancel the queued calls; with ``terminate`` also stop the running
+        ones, whose futures then fail"""
+        for future, _, _ in self.queued:
+            future.cancel()
+        self.queued.clear()
+        if not terminate:
+            return
+        for future, process, connection in self.running:
+            process.terminate()
+            process.join()
+            connection.close()
+            future.set_exception(RuntimeError("Worker process terminated"))
+        self.running = []
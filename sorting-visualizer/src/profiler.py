@@ -0,0 +1,207 @@
+"""
+Opt-in profiling of the playback hot path.
+
+Phases are timed per batch of steps on the sort thread and per frame on the
+UI thread, and each measurement is written to a preallocated ring of
+(phase, thread, start, duration) records. Nothing is timed unless a
+``Profiler`` is installed: the scheduler and the app check for one once per
+batch or frame, and the step iterator, sound callback and canvas methods
+are only wrapped while profiling is on.
+
+    generate  advancing the step generator (the algorithm and its writes)
+    apply     folding events into the buffer and the changed-index set
+    audio     the per-event sound callback (enqueueing a tone)
+    render    updating the artists for one frame, blits included
+    blit      copying dirty regions of the canvas to the screen
+    draw      full canvas redraws (new data, window resize)
+
+Within a batch, generate/apply/audio are sums over many short intervals;
+they are recorded as consecutive slices of the batch so the trace shows
+how the batch time was split. ``export_chrome_trace`` writes the ring as
+Chrome trace-event JSON for chrome://tracing or ui.perfetto.dev.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+GENERATE, APPLY, AUDIO, RENDER, BLIT, DRAW = range(6)
+PHASES = ('generate', 'apply', 'audio', 'render', 'blit', 'draw')
+
+RING_CAPACITY = 1 << 16
+# Items timed when measuring the profiler's own per-step cost
+CALIBRATION_ITEMS = 20000
+# Upper edges (ms) of the frame-time histogram buckets; the last is open
+HISTOGRAM_EDGES_MS = (4, 8, 16.7, 33.3, 50, 100)
+
+class Profiler:
+    clock = staticmethod(time.perf_counter_ns)
+
+    def __init__(self, capacity: int = RING_CAPACITY):
+        self.capacity = capacity
+        self.phase = np.zeros(capacity, dtype=np.int8)
+        self.thread = np.zeros(capacity, dtype=np.int64)
+        self.start = np.full(capacity, -1, dtype=np.int64)
+        self.duration = np.zeros(capacity, dtype=np.int64)
+        # next() on a count is atomic under the GIL, so both threads can record
+        self._slots = itertools.count()
+        self._pending = [0] * len(PHASES)
+        self._wrapped: List[Tuple[object, str, Optional[Callable]]] = []
+        self.thread_names: Dict[int, str] = {}
+        self.origin = self.clock()
+        self.steps = 0
+        self._last_summary = (self.origin, 0)
+        self._calibrate()
+
+    def _calibrate(self):
+        """Measure what timing one step costs, so it is not booked as apply
+        time (it happens between the generate and audio intervals)"""
+        clock = self.clock
+        start = clock()
+        for _ in range(CALIBRATION_ITEMS):
+            pass
+        plain = clock() - start
+        start = clock()
+        for _ in self.timed(GENERATE, range(CALIBRATION_ITEMS)):
+            pass
+        timed = clock() - start
+        noop = self.timed_call(AUDIO, lambda: None)
+        start = clock()
+        for _ in range(CALIBRATION_ITEMS):
+            noop()
+        called = clock() - start
+        # Subtract what the intervals themselves captured
+        self.step_overhead = max(timed - plain - self._pending[GENERATE], 0) / CALIBRATION_ITEMS
+        self.call_overhead = max(called - plain - self._pending[AUDIO], 0) / CALIBRATION_ITEMS
+        self._pending = [0] * len(PHASES)
+
+    def record(self, phase: int, start: int, duration: int):
+        slot = next(self._slots) % self.capacity
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.phase[slot] = phase
+        self.thread[slot] = tid
+        self.start[slot] = start
+        self.duration[slot] = duration
+
+    def timed(self, phase: int, iterable: Iterable) -> Iterator:
+        """Pass ``iterable`` through, adding the time spent in it to ``phase``"""
+        clock, pending = self.clock, self._pending
+        iterator = iter(iterable)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                pending[phase] += clock() - start
+                return
+            pending[phase] += clock() - start
+            yield item
+
+    def timed_call(self, phase: int, function: Callable) -> Callable:
+        """Wrap ``function`` so its time is added to ``phase``"""
+        clock, pending = self.clock, self._pending
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                pending[phase] += clock() - start
+        return timed
+
+    def batch(self, start: int, end: int, steps: int):
+        """Record one scheduler batch; time not spent generating, in the
+        sound callback or timing them was spent applying the events"""
+        pending = self._pending
+        generate, audio = pending[GENERATE], pending[AUDIO]
+        overhead = steps * (self.step_overhead + (self.call_overhead if audio else 0))
+        apply = max(int(end - start - generate - audio - overhead), 0)
+        offset = start
+        for phase, duration in ((GENERATE, generate), (APPLY, apply), (AUDIO, audio)):
+            if duration:
+                self.record(phase, offset, duration)
+                offset += duration
+        pending[GENERATE] = pending[AUDIO] = 0
+        self.steps += steps
+
+    def wrap(self, target, method: str, phase: int):
+        """Time every call of ``target.method`` as its own record until
+        ``unwrap`` restores it"""
+        original = getattr(target, method)
+        clock = self.clock
+        own = vars(target).get(method)
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(phase, start, clock() - start)
+        setattr(target, method, timed)
+        self._wrapped.append((target, method, own))
+
+    def unwrap(self):
+        for target, method, own in reversed(self._wrapped):
+            if own is None:
+                # Drop the instance attribute so the class method shows through
+                delattr(target, method)
+            else:
+                setattr(target, method, own)
+        self._wrapped = []
+
+    def _records(self) -> np.ndarray:
+        """Indices of the filled slots, oldest first"""
+        filled = np.nonzero(self.start >= 0)[0]
+        return filled[np.argsort(self.start[filled], kind='stable')]
+
+    def summary(self, window: float = 1.0) -> Dict:
+        """Frame rate, step rate, frame times and phase shares over the last
+        ``window`` seconds"""
+        now = self.clock()
+        since = now - int(window * 1e9)
+        recent = (self.start >= since)
+        frames = self.duration[recent & (self.phase == RENDER)] / 1e6
+
+        last_time, last_steps = self._last_summary
+        self._last_summary = (now, self.steps)
+        elapsed = (now - last_time) / 1e9
+
+        totals = np.bincount(self.phase[recent], weights=self.duration[recent],
+                             minlength=len(PHASES))
+        # Blits happen inside render; count them once
+        totals[RENDER] = max(totals[RENDER] - totals[BLIT], 0)
+        busy = totals.sum()
+        bins = np.searchsorted(HISTOGRAM_EDGES_MS, frames, side='right')
+        return {
+            'fps': len(frames) / window,
+            'steps_per_second': (self.steps - last_steps) / elapsed if elapsed > 0 else 0.0,
+            'frame_ms': (float(np.median(frames)), float(np.percentile(frames, 95)),
+                         float(frames.max())) if len(frames) else (0.0, 0.0, 0.0),
+            'histogram': np.bincount(bins, minlength=len(HISTOGRAM_EDGES_MS) + 1).tolist(),
+            'shares': {name: totals[phase] / busy for phase, name in enumerate(PHASES)
+                       if busy and totals[phase]},
+        }
+
+    def export_chrome_trace(self, path: str):
+        """Write the ring as Chrome trace-event JSON"""
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                   'args': {'name': name}} for tid, name in self.thread_names.items()]
+        for slot in self._records():
+            events.append({'name': PHASES[self.phase[slot]], 'cat': 'playback', 'ph': 'X',
+                           'ts': (int(self.start[slot]) - self.origin) / 1000,
+                           'dur': int(self.duration[slot]) / 1000,
+                           'pid': pid, 'tid': int(self.thread[slot])})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+def histogram_labels() -> List[str]:
+    """Bucket labels matching ``summary()['histogram']``"""
+    edges = [f'{edge:g}' for edge in HISTOGRAM_EDGES_MS]
+    return [f'<{edges[0]}'] + [f'{a}-{b}' for a, b in zip(edges, edges[1:])] + [f'>{edges[-1]}']
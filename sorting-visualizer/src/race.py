@@ -0,0 +1,185 @@
+"""
+Shared-memory plumbing for the race view.
+
+Every racing algorithm runs in its own worker process and streams the values
+it writes through an ``EventRing``: a single-producer/single-consumer ring
+buffer in ``multiprocessing.shared_memory``. Comparisons never touch the
+ring; a swap becomes two ``(index, value)`` records and a write becomes one,
+so the UI only ever receives deltas it can apply to its copy of the array.
+
+The ring header doubles as the control block: the UI publishes the playback
+rate and a stop flag there, and the worker publishes its counters, last
+event (for highlights) and state at every batch.
+"""
+
+import os
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.registry import registry
+from src.shared_array import attach_shared_memory
+from src.sorting_algorithms import SortingAlgorithms
+from src.step_events import SWAP, WRITE
+
+RING_CAPACITY = 1 << 16
+# Most records a worker buffers before publishing them
+MAX_BATCH = 4096
+# Workers yield the CPU to the render loop when there are more of them than cores
+WORKER_NICENESS = 5
+
+# Header slots (int64)
+WRITE_POS, READ_POS, STEPS, COMPARISONS, SWAPS, LAST_OP, LAST_A, LAST_B, \
+    STATE, STOP, RATE, ELAPSED_US = range(12)
+HEADER_SLOTS = 16
+HEADER_BYTES = HEADER_SLOTS * 8
+
+# Worker states
+RUNNING, DONE, FAILED, STOPPED = range(4)
+
+class EventRing:
+    """(index, value) write records in shared memory plus a control header"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.capacity = capacity
+        self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        self.records = np.ndarray((capacity, 2), dtype=np.int32, buffer=shm.buf,
+                                  offset=HEADER_BYTES)
+
+    @classmethod
+    def create(cls, capacity: int = RING_CAPACITY) -> 'EventRing':
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + capacity * 8)
+        ring = cls(shm, capacity)
+        ring.header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> 'EventRing':
+        return cls(attach_shared_memory(name), capacity)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def push(self, records: np.ndarray) -> bool:
+        """Append (n, 2) records, waiting for the reader when the ring is
+        full; returns False if the run was stopped meanwhile"""
+        done = 0
+        while done < len(records):
+            write, read = self.header[WRITE_POS], self.header[READ_POS]
+            free = self.capacity - (write - read)
+            if free == 0:
+                if self.header[STOP]:
+                    return False
+                time.sleep(0.001)
+                continue
+            count = min(free, len(records) - done, self.capacity - write % self.capacity)
+            start = write % self.capacity
+            self.records[start:start + count] = records[done:done + count]
+            # Publish only after the records are in place
+            self.header[WRITE_POS] = write + count
+            done += count
+        return True
+
+    def pull(self) -> np.ndarray:
+        """Every record published since the last pull, oldest first"""
+        write, read = self.header[WRITE_POS], self.header[READ_POS]
+        if write == read:
+            return np.empty((0, 2), dtype=np.int32)
+        start, stop = read % self.capacity, write % self.capacity
+        if start < stop:
+            records = self.records[start:stop].copy()
+        else:
+            records = np.concatenate((self.records[start:], self.records[:stop]))
+        self.header[READ_POS] = write
+        return records
+
+    def close(self, unlink: bool = False):
+        # Drop the views first; SharedMemory refuses to close while exported
+        self.header = self.records = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def apply_writes(values: np.ndarray, records: np.ndarray) -> np.ndarray:
+    """Apply write records in order and return the indices that changed"""
+    if not len(records):
+        return np.empty(0, dtype=np.int64)
+    # Only the last write to each index matters
+    indices = records[::-1, 0]
+    unique, first = np.unique(indices, return_index=True)
+    values[unique] = records[::-1, 1][first]
+    return unique.astype(np.int64)
+
+def race_worker(name: str, ring_name: str, capacity: int, data: List[int],
+                options: Optional[Dict] = None) -> Tuple[str, int]:
+    """Run one algorithm's step stream into its ring at the shared rate.
+
+    Module level so it can be submitted to a process pool.
+    """
+    if hasattr(os, 'nice'):
+        os.nice(WORKER_NICENESS)
+    ring = EventRing.attach(ring_name, capacity)
+    sorting = SortingAlgorithms()
+    spec = registry.get(name)
+    work = list(data)
+    pending = array('i')
+    steps = batch_end = 0
+    tokens = 0.0
+    start = last = time.perf_counter()
+    state = DONE
+
+    def publish(event):
+        nonlocal pending
+        ok = not pending or ring.push(np.frombuffer(pending, dtype=np.int32).reshape(-1, 2))
+        pending = array('i')
+        ring.header[STEPS] = steps
+        ring.header[COMPARISONS] = sorting.comparisons
+        ring.header[SWAPS] = sorting.swaps
+        ring.header[LAST_OP], ring.header[LAST_A], ring.header[LAST_B] = event
+        ring.header[ELAPSED_US] = int((time.perf_counter() - start) * 1e6)
+        return ok
+
+    try:
+        ring.header[STATE] = RUNNING
+        for event in spec.steps(sorting, work, **spec.accepted(options or {})):
+            op, a, b = event
+            if op == SWAP:
+                pending.extend((a, work[a], b, work[b]))
+            elif op == WRITE:
+                pending.extend((a, b))
+            steps += 1
+            if steps < batch_end:
+                continue
+
+            if not publish(event):
+                state = STOPPED
+                break
+            # Token bucket: wait until the shared rate allows the next batch
+            while True:
+                if ring.header[STOP]:
+                    break
+                rate = max(int(ring.header[RATE]), 1)
+                now = time.perf_counter()
+                tokens = min(tokens + (now - last) * rate, rate / 10 + 1)
+                last = now
+                batch = max(1, min(MAX_BATCH, rate // 120))
+                if tokens >= batch:
+                    tokens -= batch
+                    batch_end = steps + batch
+                    break
+                time.sleep(min((batch - tokens) / rate, 0.05))
+            if ring.header[STOP]:
+                state = STOPPED
+                break
+        else:
+            publish((0, -1, -1))
+    except Exception:
+        state = FAILED
+        raise
+    finally:
+        ring.header[STATE] = state
+        ring.close()
+    return name, steps
@@ -0,0 +1,93 @@
+"""
+Pure NumPy pixel math behind the raster renderer.
+
+Kept free of matplotlib so offline export workers can render frames without
+importing a plotting backend. An image of ``width`` columns shows ``n``
+elements: column p covers elements ``lo[p]..hi[p]-1`` and is drawn as the
+bucket maximum (a light envelope) over the bucket minimum. Pixels are
+classified into palette codes, which map to RGBA (``RASTER_PALETTE``) or
+straight into a paletted GIF. Columns owned by a worker of a parallel sort
+draw their bars in that worker's colour.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+
+# RGBA equivalents of the bar colours (bars drawn at alpha 0.7 on #ecf0f1)
+RASTER_BACKGROUND = (236, 240, 241, 255)
+RASTER_BAR = (107, 171, 219, 255)
+RASTER_ENVELOPE = (172, 206, 231, 255)
+RASTER_HIGHLIGHT = (232, 105, 94, 255)
+# Bar colours of the workers of the parallel sorts, cycled past the eighth
+WORKER_COLORS = ('#1abc9c', '#9b59b6', '#f39c12', '#2ecc71',
+                 '#e67e22', '#34495e', '#16a085', '#d35400')
+
+def blend(color: str, alpha: float = 0.7) -> Tuple[int, int, int, int]:
+    """RGBA of a ``#rrggbb`` bar drawn at ``alpha`` over the background"""
+    rgb = (int(color[k:k + 2], 16) for k in (1, 3, 5))
+    return tuple(round(alpha * c + (1 - alpha) * b) for c, b in zip(rgb, RASTER_BACKGROUND)) + (255,)
+
+# Pixel codes, indexing the palette below; WORKER + w is worker w's bar
+BACKGROUND, ENVELOPE, BAR, HIGHLIGHT, WORKER = range(5)
+RASTER_COLORS = (RASTER_BACKGROUND, RASTER_ENVELOPE, RASTER_BAR, RASTER_HIGHLIGHT) + \
+    tuple(blend(color) for color in WORKER_COLORS)
+RASTER_PALETTE = np.array(RASTER_COLORS, dtype=np.uint8).view(np.uint32).ravel()
+
+def column_buckets(n: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(lo, hi) element bounds of each of ``width`` image columns"""
+    pixels = np.arange(width + 1, dtype=np.int64)
+    bounds = (pixels * n) // width
+    # With fewer elements than pixels, neighbouring columns repeat the same element
+    lo = np.minimum(bounds[:-1], max(n - 1, 0))
+    hi = np.maximum(bounds[1:], lo + 1)
+    return lo, hi
+
+def columns_of(indices, lo: np.ndarray, hi: np.ndarray, n: int) -> np.ndarray:
+    """Image columns showing any of the given element indices"""
+    indices = np.asarray(indices, dtype=np.int64)
+    indices = indices[(indices >= 0) & (indices < n)]
+    if not len(indices):
+        return np.empty(0, dtype=np.int64)
+    first = np.searchsorted(hi, indices, side='right')
+    last = np.searchsorted(lo, indices, side='right')
+    if np.all(last - first == 1):
+        return np.unique(first)
+    return np.unique(np.concatenate([np.arange(a, b) for a, b in zip(first, last)]))
+
+def column_codes(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, columns: np.ndarray,
+                 height: int, vmax: int, highlighted: np.ndarray,
+                 owners: Optional[np.ndarray] = None) -> np.ndarray:
+    """(height, len(columns)) uint8 pixel codes for the given columns.
+
+    ``highlighted`` flags which of ``columns`` are highlighted and
+    ``owners`` gives the worker owning each (-1 for none). Rows count from
+    the top, matching image buffers.
+    """
+    if len(columns) > 64 and len(values) >= len(lo):
+        # Cheaper to reduce every bucket at once than to slice many
+        lows, highs = column_extremes(values, lo)
+        lows, highs = lows[columns], highs[columns]
+    else:
+        lows = np.array([values[lo[c]:hi[c]].min() for c in columns])
+        highs = np.array([values[lo[c]:hi[c]].max() for c in columns])
+
+    return extreme_codes(lows, highs, height, vmax, highlighted, owners)
+
+def column_extremes(values: np.ndarray, lo: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Minimum and maximum of every column's bucket"""
+    return np.minimum.reduceat(values, lo), np.maximum.reduceat(values, lo)
+
+def extreme_codes(lows: np.ndarray, highs: np.ndarray, height: int, vmax: int,
+                  highlighted: np.ndarray, owners: Optional[np.ndarray] = None) -> np.ndarray:
+    """(height, len(lows)) uint8 pixel codes from per-column extremes"""
+    scale = height / (vmax * 1.1)
+    low_tops = height - (lows * scale).astype(np.int64)
+    high_tops = height - (highs * scale).astype(np.int64)
+    rows = np.arange(height)[:, None]
+
+    codes = (rows >= high_tops[None, :]).astype(np.uint8)
+    codes += (rows >= low_tops[None, :]) * (1 + highlighted.astype(np.uint8))[None, :]
+    if owners is not None and np.any(owners >= 0):
+        worker_codes = np.where(owners >= 0, WORKER + owners % len(WORKER_COLORS), BAR)
+        codes = np.where(codes == BAR, worker_codes[None, :].astype(np.uint8), codes)
+    return codes
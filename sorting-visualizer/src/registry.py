@@ -0,0 +1,172 @@
+"""
+Registry of the sorting algorithms known to the app.
+
+Each algorithm registers its step generator, fast non-visual implementation,
+exact counter, complexity class, the largest n it is worth animating and the
+keyword options (e.g. quick sort's ``pivot`` or the parallel sorts'
+``workers``) all three accept.
+Implementations are given as ``"module:attribute"`` references and only
+imported the first time they are used, so listing the algorithms (for the
+UI combobox or ``--help``) imports nothing heavy.
+
+Third-party algorithms are discovered from the ``sorting_visualizer.algorithms``
+entry point group the first time the registry is queried; each entry point
+names a callable that receives the registry and calls ``register`` on it.
+
+The registry also picks how a run of a given size should be shown:
+    renderer  'bars' up to BAR_RENDER_LIMIT elements, 'raster' beyond
+    playback  'animate' up to the algorithm's max_n, otherwise 'fast'
+              (sort with the fast path, report exact counts, draw once)
+"""
+
+import importlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+ENTRY_POINT_GROUP = "sorting_visualizer.algorithms"
+# Above this many elements the bar chart gives way to the raster renderer
+BAR_RENDER_LIMIT = 500
+
+QUADRATIC = "O(n^2)"
+LINEARITHMIC = "O(n log n)"
+
+def _resolve(reference: str) -> Callable:
+    """Import ``"package.module:Attr.attr"`` and return the attribute"""
+    module_name, _, path = reference.partition(':')
+    target = importlib.import_module(module_name)
+    for part in path.split('.'):
+        target = getattr(target, part)
+    return target
+
+class AlgorithmSpec:
+    """One registered algorithm; implementations resolve on first access"""
+    __slots__ = ('name', 'complexity', 'max_n', 'options', '_refs', '_loaded')
+
+    def __init__(self, name: str, steps: str, fast: str, counter: Optional[str],
+                 complexity: str, max_n: int, options: Tuple[str, ...] = ()):
+        self.name = name
+        self.complexity = complexity
+        self.max_n = max_n
+        self.options = options
+        self._refs = {'steps': steps, 'fast': fast, 'counter': counter}
+        self._loaded = {}
+
+    def _get(self, key: str) -> Optional[Callable]:
+        if key not in self._loaded:
+            ref = self._refs[key]
+            self._loaded[key] = _resolve(ref) if ref else None
+        return self._loaded[key]
+
+    @property
+    def quadratic(self) -> bool:
+        return self.complexity == QUADRATIC
+
+    def accepted(self, options: Dict) -> Dict:
+        """The subset of ``options`` this algorithm understands"""
+        return {key: value for key, value in options.items() if key in self.options}
+
+    def steps(self, sorting, data: List[int], **options) -> Iterator:
+        """Step-event generator; counters accumulate on ``sorting``"""
+        return self._get('steps')(sorting, data, **options)
+
+    def fast(self, data: List[int], **options) -> None:
+        """Sort ``data`` in place without events or counters"""
+        self._get('fast')(data, **options)
+
+    def count(self, data: List[int], **options) -> Tuple[int, int]:
+        """Exact (comparisons, swaps), replaying the steps if there is no counter"""
+        counter = self._get('counter')
+        if counter is not None:
+            return counter(data, **options)
+        from src.sorting_algorithms import SortingAlgorithms
+        sorting = SortingAlgorithms()
+        for _ in self.steps(sorting, list(data), **options):
+            pass
+        return sorting.comparisons, sorting.swaps
+
+class AlgorithmRegistry:
+    def __init__(self):
+        self._specs: Dict[str, AlgorithmSpec] = {}
+        self._discovered = False
+
+    def register(self, name: str, steps: str, fast: str, counter: Optional[str] = None,
+                 complexity: str = LINEARITHMIC, max_n: int = 100000,
+                 options: Tuple[str, ...] = ()) -> AlgorithmSpec:
+        if name in self._specs:
+            raise ValueError(f"Algorithm already registered: {name}")
+        spec = AlgorithmSpec(name, steps, fast, counter, complexity, max_n, options)
+        self._specs[name] = spec
+        return spec
+
+    def discover(self):
+        """Load plugins from installed entry points, once"""
+        if self._discovered:
+            return
+        self._discovered = True
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return
+        eps = entry_points()
+        group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, 'select') \
+            else eps.get(ENTRY_POINT_GROUP, [])
+        for ep in group:
+            try:
+                ep.load()(self)
+            except Exception as e:
+                print(f"Skipping algorithm plugin {ep.name}: {e}")
+
+    def names(self) -> List[str]:
+        self.discover()
+        return list(self._specs)
+
+    def get(self, name: str) -> AlgorithmSpec:
+        self.discover()
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise KeyError(f"Unknown algorithm: {name}") from None
+
+    def name_width(self) -> int:
+        """Length of the longest name, for the name column of text tables"""
+        return max(map(len, self.names()), default=0)
+
+    def __contains__(self, name: str) -> bool:
+        self.discover()
+        return name in self._specs
+
+    def modes(self, name: str, n: int) -> Tuple[str, str]:
+        """(renderer, playback) suited to running ``name`` on ``n`` elements"""
+        renderer = 'bars' if n <= BAR_RENDER_LIMIT else 'raster'
+        playback = 'animate' if n <= self.get(name).max_n else 'fast'
+        return renderer, playback
+
+registry = AlgorithmRegistry()
+
+def _register_builtins():
+    steps = "src.sorting_algorithms:SortingAlgorithms."
+    fast = "src.fast_sorts:"
+    counter = "src.counting:"
+    # max_n keeps an animated run within a few million steps
+    for name, stem, complexity, max_n in (
+            ("Bubble Sort", "bubble_sort", QUADRATIC, 2000),
+            ("Selection Sort", "selection_sort", QUADRATIC, 2000),
+            ("Insertion Sort", "insertion_sort", QUADRATIC, 2000),
+            ("Merge Sort", "merge_sort", LINEARITHMIC, 100000),
+            ("Quick Sort", "quick_sort", LINEARITHMIC, 100000),
+            ("Heap Sort", "heap_sort", LINEARITHMIC, 100000),
+            ("Timsort", "timsort", LINEARITHMIC, 100000),
+            ("Introsort", "introsort", LINEARITHMIC, 100000),
+            ("Radix Sort", "radix_sort", "O(nk)", 1000000),
+            ("Counting Sort", "counting_sort", "O(n + k)", 1000000),
+            ("Shell Sort", "shell_sort", "O(n^4/3)", 100000),
+            ("Bitonic Sort", "bitonic_sort", "O(n log^2 n)", 30000)):
+        registry.register(name, steps=f"{steps}{stem}_steps", fast=f"{fast}{stem}",
+                          counter=f"{counter}count_{stem}", complexity=complexity,
+                          max_n=max_n, options=('pivot',) if stem == "quick_sort" else ())
+    # Split across ``workers`` processes; their steps are counted by replaying
+    for name, stem in (("Parallel Merge Sort", "parallel_merge_sort"),
+                       ("Parallel Sample Sort", "parallel_sample_sort")):
+        registry.register(name, steps=f"{steps}{stem}_steps", fast=f"src.parallel_sorts:{stem}",
+                          complexity=LINEARITHMIC, max_n=100000, options=('workers',))
+
+_register_builtins()
@@ -0,0 +1,175 @@
+"""
+The working array shared by the sort worker and the renderer.
+
+Values live in one flat int32 buffer, so n = 10**6 costs 4 MB instead of a
+list of a million Python ints. In-process the buffer is an ``array('i')``
+that the step generators mutate directly; with ``shared=True`` it is a
+``multiprocessing.shared_memory`` block that NumPy workers in other
+processes can attach to by name. Either way ``values`` is a zero-copy NumPy
+view of the same memory for the renderer.
+
+Readers and the writer coordinate through a sequence counter (a seqlock):
+the writer makes it odd before a batch of mutations and even again after
+it, and a reader only keeps what it read if the counter was even and
+unchanged around the read. Nothing is copied except what the reader asks
+for, and neither side ever blocks the other.
+"""
+
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+import numpy as np
+
+T = TypeVar('T')
+
+# Header slots (int64); the rest is reserved so the values stay 64-byte aligned
+SEQ = 0
+HEADER_SLOTS = 8
+HEADER_BYTES = HEADER_SLOTS * 8
+# Attempts at a consistent read before settling for the latest values
+READ_RETRIES = 64
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Open an existing block without registering it with the resource
+    tracker; the creating process owns (and unlinks) it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Before Python 3.13 attaching always registers, and a forked worker
+    # shares the parent's tracker, so registration is skipped by hand
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+class SharedArray:
+    """Flat int32 array with a sequence counter.
+
+    ``array`` is what the algorithm mutates: an ``array('i')`` in-process
+    (slices are copies, as with a list), or the NumPy view itself for a
+    shared block. The object also behaves as a sequence of ints, so it can
+    stand in wherever the app used to pass a list.
+    """
+
+    def __init__(self, values: Iterable[int] = (), shared: bool = False):
+        if isinstance(values, np.ndarray):
+            initial = array('i')
+            initial.frombytes(np.ascontiguousarray(values, dtype=np.int32).tobytes())
+        else:
+            initial = array('i', values)
+        self.shm = None
+        self.torn_reads = 0
+        if shared:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=HEADER_BYTES + max(len(initial), 1) * 4)
+            self._bind(len(initial))
+            self.header[:] = 0
+            self.values[:] = initial
+            self.array = self.values
+        else:
+            self.array = initial
+            self.header = np.zeros(HEADER_SLOTS, dtype=np.int64)
+            self.values = np.frombuffer(self.array, dtype=np.int32)
+
+    @classmethod
+    def attach(cls, name: str, size: int) -> 'SharedArray':
+        """Open a shared block created by another process"""
+        instance = cls.__new__(cls)
+        instance.shm = attach_shared_memory(name)
+        instance.torn_reads = 0
+        instance._bind(size)
+        instance.array = instance.values
+        return instance
+
+    def _bind(self, size: int):
+        self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+        self.values = np.ndarray((size,), dtype=np.int32, buffer=self.shm.buf,
+                                 offset=HEADER_BYTES)
+
+    @property
+    def name(self) -> Optional[str]:
+        """Shared memory block name, or None for an in-process buffer"""
+        return self.shm.name if self.shm is not None else None
+
+    @property
+    def seq(self) -> int:
+        return int(self.header[SEQ])
+
+    def begin_write(self):
+        """Mark the buffer as being modified (sequence becomes odd)"""
+        self.header[SEQ] += 1
+
+    def end_write(self):
+        """Publish the modifications (sequence becomes even again)"""
+        self.header[SEQ] += 1
+
+    def assign(self, values: Iterable[int]):
+        """Replace every value in one write"""
+        self.begin_write()
+        try:
+            self.values[:] = np.asarray(values, dtype=np.int32)
+        finally:
+            self.end_write()
+
+    def read(self, reader: Callable[[np.ndarray], T]) -> T:
+        """Call ``reader`` on ``values`` until it sees no concurrent write.
+
+        ``reader`` should be short (e.g. gather a few indices) so it fits
+        between two writer batches. If the writer never pauses long enough
+        the last result is returned anyway and counted in ``torn_reads``;
+        anything it was writing shows up in its next frame's changes.
+        """
+        for _ in range(READ_RETRIES):
+            start = self.header[SEQ]
+            if not start & 1:
+                result = reader(self.values)
+                if self.header[SEQ] == start:
+                    return result
+            # Let the writer finish its batch
+            time.sleep(0)
+        self.torn_reads += 1
+        return reader(self.values)
+
+    def take(self, indices) -> np.ndarray:
+        """Consistent copy of the values at ``indices``"""
+        return self.read(lambda values: values[indices])
+
+    def snapshot(self) -> np.ndarray:
+        """Consistent copy of every value"""
+        return self.read(np.copy)
+
+    def tolist(self) -> List[int]:
+        return self.array.tolist()
+
+    def close(self, unlink: bool = False):
+        """Release a shared block; the creating process passes ``unlink=True``"""
+        if self.shm is None:
+            return
+        # Drop the views first; SharedMemory refuses to close while exported
+        self.header = self.values = self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        self.shm = None
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.array)
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __setitem__(self, index, value):
+        self.array[index] = value
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None and not copy:
+            return self.values
+        return np.array(self.values, dtype=dtype)
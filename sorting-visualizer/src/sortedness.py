@@ -0,0 +1,246 @@
+"""
+Live sortedness metrics, kept up to date as the array changes.
+
+    inversions  pairs i < j with a[i] > a[j] (0 when sorted)
+    runs        maximal ascending runs (1 when sorted)
+    in_place    elements already equal to the sorted array at their index
+    prefix      length of the longest ascending prefix
+    suffix      length of the longest ascending suffix
+
+``SortednessTracker`` is built once per input and then told which indices
+changed; each change is folded in without rescanning the array. Values are
+replaced by their rank among the input's distinct values, and
+
+  * a Fenwick tree over ranks counts the values below any rank;
+  * a Fenwick tree over the descents (a[k] > a[k + 1]) gives the number of
+    runs and finds the first and last descent, i.e. the sorted prefix and
+    suffix, in O(log n);
+  * the positions are cut into blocks of about sqrt(n) whose ranks are kept
+    sorted, so the values above or below a rank in front of an index are
+    counted with one vectorized search over the whole blocks plus a scan
+    of the partial one.
+
+A change of a[i] from u to v shifts the inversions by
+``f(i, v) - f(i, u)``, where ``f(i, x)`` counts the elements before i greater
+than x and the elements after i less than x. One change costs O(log n) in
+the Fenwick trees and O(sqrt(n)) in compiled NumPy code. When a frame
+changes a large share of the array at once (see ``REBUILD_SHARE``) the
+structures are rebuilt from scratch instead, which takes O(n log n) in
+vectorized passes.
+"""
+
+import math
+from typing import Iterable, List
+import numpy as np
+
+# Smallest block of positions with its own sorted ranks
+BLOCK_MIN = 64
+# Rebuild instead of updating when more than this share of the array changed
+REBUILD_SHARE = 1 / 128
+
+class Fenwick:
+    """Binary indexed tree of counts over ``0..n-1``"""
+
+    def __init__(self, counts: np.ndarray):
+        n = len(counts)
+        # Node i (1-based) holds the sum of the lowbit(i) counts ending at i
+        cumulative = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        nodes = np.arange(1, n + 1)
+        self.tree: List[int] = [0] + (cumulative[nodes] - cumulative[nodes - (nodes & -nodes)]).tolist()
+        self.n = n
+        self.total = int(cumulative[-1])
+        self.top = 1 << (n.bit_length() - 1) if n else 0
+
+    def add(self, i: int, delta: int):
+        tree, n = self.tree, self.n
+        self.total += delta
+        i += 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i: int) -> int:
+        """Sum of the counts at ``0..i-1``"""
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, k: int) -> int:
+        """Smallest index whose prefix sum reaches ``k`` (``n`` if none)"""
+        tree, n = self.tree, self.n
+        position = 0
+        step = self.top
+        while step:
+            node = position + step
+            if node <= n and tree[node] < k:
+                position = node
+                k -= tree[node]
+            step >>= 1
+        return position
+
+def count_inversions(ranks: np.ndarray, pad: int) -> int:
+    """Inversions of ``ranks`` (all below ``pad``) by bottom-up merging.
+
+    Each level sorts rows of twice the previous width and counts, for every
+    element of a right half, the left-half elements above it with a single
+    search over all rows at once.
+    """
+    n = len(ranks)
+    if n < 2:
+        return 0
+    size = 1 << (n - 1).bit_length()
+    # Trailing pads are larger than everything, so they add no inversions
+    rows = np.full(size, pad, dtype=np.int64)
+    rows[:n] = ranks
+    span = pad + 1
+    total = 0
+    width = 1
+    while width < size:
+        pairs = rows.reshape(-1, 2 * width)
+        offsets = np.arange(len(pairs), dtype=np.int64)[:, None] * span
+        left = (pairs[:, :width] + offsets).ravel()
+        right = (pairs[:, width:] + offsets).ravel()
+        at_most = np.searchsorted(left, right, side='right')
+        # Minus the left elements of earlier rows gives the row's own count
+        at_most -= np.repeat(np.arange(len(pairs), dtype=np.int64) * width, width)
+        total += int(right.size * width - at_most.sum())
+        rows = np.sort(pairs, axis=1).ravel()
+        width *= 2
+    return total
+
+class SortednessTracker:
+    def __init__(self, values: Iterable[int]):
+        values = np.asarray(values, dtype=np.int64)
+        self.distinct = np.unique(values)
+        self.n = len(values)
+        # Sorting only permutes the values, so the final array is known up front
+        self.target = np.searchsorted(self.distinct, np.sort(values))
+        self.block = max(BLOCK_MIN, math.isqrt(self.n))
+        self.rebuild_limit = max(int(self.n * REBUILD_SHARE), 1)
+        self.rebuilds = 0
+        self.build(self.ranks(values))
+        self.initial_inversions = self.inversions
+
+    def ranks(self, values) -> np.ndarray:
+        return np.searchsorted(self.distinct, np.asarray(values, dtype=np.int64))
+
+    def build(self, ranks: np.ndarray):
+        """Set up every structure for ``ranks`` from scratch"""
+        n, block, pad = self.n, self.block, len(self.distinct)
+        self.current = ranks.astype(np.int64)
+        self.inversions = count_inversions(self.current, pad)
+        self.in_place = int(np.count_nonzero(self.current == self.target))
+        descents = (self.current[:-1] > self.current[1:]).astype(np.int64)
+        self.descent_flags = bytearray(descents.astype(np.uint8).tobytes())
+        self.descents = Fenwick(descents)
+        self.values = Fenwick(np.bincount(self.current, minlength=pad))
+
+        # Each block's ranks sorted and offset by block * (pad + 1), so the
+        # whole array is one ascending sequence that searchsorted can share
+        blocks = -(-n // block)
+        rows = np.full(blocks * block, pad, dtype=np.int64)
+        rows[:n] = self.current
+        rows = np.sort(rows.reshape(blocks, block), axis=1)
+        self.bases = np.arange(blocks, dtype=np.int64) * (pad + 1)
+        self.starts = np.arange(blocks, dtype=np.int64) * block
+        self.keyed = (rows + self.bases[:, None]).ravel()
+
+    @property
+    def runs(self) -> int:
+        return self.descents.total + 1 if self.n else 0
+
+    @property
+    def prefix(self) -> int:
+        return min(self.descents.find(1) + 1, self.n)
+
+    @property
+    def suffix(self) -> int:
+        if not self.descents.total:
+            return self.n
+        return self.n - 1 - self.descents.find(self.descents.total)
+
+    @property
+    def progress(self) -> float:
+        """Share of the starting inversions removed so far"""
+        if not self.initial_inversions:
+            return 1.0 if not self.inversions else 0.0
+        return max(0.0, 1.0 - self.inversions / self.initial_inversions)
+
+    def update(self, indices: np.ndarray, values: np.ndarray):
+        """Fold in the new ``values`` at ``indices`` (each index at most once)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        ranks = self.ranks(values)
+        moved = ranks != self.current[indices]
+        indices, ranks = indices[moved], ranks[moved]
+        if len(indices) > self.rebuild_limit:
+            current = self.current.copy()
+            current[indices] = ranks
+            self.rebuilds += 1
+            self.build(current)
+            return
+        for i, rank in zip(indices.tolist(), ranks.tolist()):
+            self.change(i, rank)
+
+    def sync(self, values: np.ndarray):
+        """Catch up with a full copy of the array, for frames that do not
+        say which indices changed"""
+        changed = np.flatnonzero(self.ranks(values) != self.current)
+        self.update(changed, np.asarray(values)[changed])
+
+    def change(self, i: int, new: int):
+        """Set position ``i`` to rank ``new``"""
+        current = self.current
+        old = int(current[i])
+        block = i // self.block
+        start = block * self.block
+
+        # Ranks before i below old, old + 1, new and new + 1 (at most r is
+        # below r + 1): whole blocks by one search, the rest of i's block by scan
+        queries = np.array([old, old + 1, new, new + 1], dtype=np.int64)
+        found = self.keyed[:start].searchsorted((self.bases[:block, None] + queries).ravel())
+        below = (found.reshape(block, 4) - self.starts[:block, None]).sum(axis=0)
+        below += (current[start:i, None] < queries).sum(axis=0)
+        below = below.tolist()
+
+        def crossing(rank: int, k: int) -> int:
+            # Greater before i, plus less after i (excluding i itself)
+            less_after = self.values.prefix(rank) - below[k] - (old < rank)
+            return i - below[k + 1] + less_after
+
+        self.inversions += crossing(new, 2) - crossing(old, 0)
+        target = int(self.target[i])
+        self.in_place += (new == target) - (old == target)
+        self.values.add(old, -1)
+        self.values.add(new, 1)
+        self.move(block, old, new)
+        current[i] = new
+
+        flags = self.descent_flags
+        for k in (i - 1, i):
+            if 0 <= k < self.n - 1:
+                now = int(current[k] > current[k + 1])
+                if now != flags[k]:
+                    self.descents.add(k, now - flags[k])
+                    flags[k] = now
+
+    def move(self, block: int, old: int, new: int):
+        """Replace one ``old`` by ``new`` in a block's sorted ranks"""
+        row = self.keyed[block * self.block:(block + 1) * self.block]
+        base = int(self.bases[block])
+        p = int(row.searchsorted(old + base))
+        q = int(row.searchsorted(new + base))
+        if q > p:
+            row[p:q - 1] = row[p + 1:q]
+            q -= 1
+        elif q < p:
+            row[q + 1:p + 1] = row[q:p]
+        row[q] = new + base
+
+    def summary(self) -> str:
+        n = max(self.n, 1)
+        return (f"Inversions: {self.inversions:,} ({self.progress:.1%} removed) | "
+                f"Runs: {self.runs:,} | In place: {self.in_place / n:.1%} | "
+                f"Sorted prefix: {self.prefix:,} / suffix: {self.suffix:,}")
@@ -1,243 +1,1210 @@
+import itertools
 import random
-from typing import List, Tuple, Generator
+from typing import Callable, List, Optional, Tuple, Generator, Iterable
+from src.step_events import (COMPARE, SWAP, WRITE, SELECT, PIVOT, RANGE, WORKER,
+                             StepEvent, EVENT_SOUNDS, event_highlights)
+
+Snapshots = Generator[Tuple[List[int], List[int], int, int], None, None]
+StepEvents = Generator[StepEvent, None, None]
+
+# Timsort: shortest natural run before binary insertion extends it, and the
+# number of consecutive wins that switches a merge into galloping mode
+MIN_MERGE = 32
+MIN_GALLOP = 7
+# Introsort hands ranges up to this size to insertion sort
+INTRO_THRESHOLD = 16
+# LSD radix sort digit width (one byte per pass)
+RADIX_BITS = 8
+# Ciura's experimentally tuned gaps, extended by a factor of 2.25 beyond 701
+CIURA_GAPS = [1, 4, 10, 23, 57, 132, 301, 701]
+# Quick sort pivot choices; 'random' draws from a fixed seed so a run and its
+# exact counters (src.counting) pick the same pivots
+PIVOT_STRATEGIES = ('median3', 'last', 'first', 'middle', 'random')
+PIVOT_SEED = 0x5EED
+# Which events the generators emit:
+#   all         everything
+#   writes      SWAP and WRITE only (still enough to follow the array)
+#   boundaries  RANGE only: each pass, partition, merge or gap
+GRANULARITIES = ('all', 'writes', 'boundaries')
+# Workers simulated by the parallel sorts' step streams, and how many events
+# one worker emits before the next takes its turn
+PARALLEL_WORKERS = 4
+WORKER_BURST = 32
+# Sample sort draws this many random elements per worker to pick splitters
+SAMPLE_FACTOR = 16
+
+def min_run(n: int) -> int:
+    """Timsort minimum run length: n / 2**k rounded up into [16, 32]"""
+    r = 0
+    while n >= MIN_MERGE:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+def merge_scratch(n: int) -> List[int]:
+    """Scratch buffer of a bottom-up merge sort of n elements: its largest
+    left run is the largest power of two below n"""
+    return [0] * (1 << (n - 1).bit_length() - 1) if n > 1 else []
+
+def shell_gaps(n: int) -> List[int]:
+    """Ciura gap sequence for n elements, largest first"""
+    gaps = [g for g in CIURA_GAPS if g < n] or [1]
+    while gaps[-1] * 9 // 4 < n:
+        gaps.append(gaps[-1] * 9 // 4)
+    return gaps[::-1]
+
+def bitonic_pairs(n: int) -> Generator[Tuple[int, int], None, None]:
+    """(k, j) stages of the bitonic network over the next power of two"""
+    k = 2
+    while k < 2 * n:
+        j = k // 2
+        while j > 0:
+            yield k, j
+            j //= 2
+        k *= 2
+
+def worker_bounds(n: int, workers: int) -> List[int]:
+    """Start of each worker's equal share of n elements, then n"""
+    workers = max(1, min(workers, n))
+    return [n * w // workers for w in range(workers + 1)]
 
 class SortingAlgorithms:
-    def __init__(self, audio_manager=None):
+    """Sorting algorithms as step generators.
+
+    Each algorithm has two forms: ``<name>_steps`` yields compact step events
+    (see ``src.step_events``) and mutates ``data`` in place, while ``<name>``
+    wraps it in the original ``(data, highlights, comparisons, swaps)``
+    snapshot protocol. Counters are kept on the instance in both modes.
+
+    ``granularity`` (one of ``GRANULARITIES``) and ``every`` thin the event
+    stream where it is produced: each yield is guarded by a local flag, so a
+    suppressed event is never built and never crosses the generator
+    boundary. With ``every`` = k only every k-th event the granularity lets
+    through is emitted. The counters stay exact either way.
+    """
+
+    def __init__(self, audio_manager=None, pivot_strategy: str = 'median3',
+                 granularity: str = 'all', every: int = 1):
         self.comparisons = 0
         self.swaps = 0
         self.audio = audio_manager
-        
+        self.pivot_strategy = pivot_strategy
+        self.set_granularity(granularity, every)
+        self.emit = self.emit_gates()
+
+    def set_granularity(self, granularity: str = 'all', every: int = 1):
+        """Applies from the next sort"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if every < 1:
+            raise ValueError(f"every must be at least 1, not {every}")
+        self.granularity = granularity
+        self.every = every
+
+    @property
+    def lossless(self) -> bool:
+        """Whether the events still describe every change to the array, so
+        a consumer can mirror it with ``apply_event``"""
+        return self.granularity != 'boundaries' and self.every == 1
+
+    def emit_gates(self) -> Tuple[bool, bool, bool, bool, Callable[[], bool]]:
+        """(compares, writes, ranges, dense, tick) for one run.
+
+        The first three say whether COMPARE/SELECT/PIVOT, SWAP/WRITE and
+        RANGE events are emitted; ``dense`` is True when every such event
+        is, otherwise ``tick()`` is True on every ``every``-th call.
+        """
+        granularity = self.granularity
+        tick = itertools.cycle((False,) * (self.every - 1) + (True,)).__next__
+        return (granularity == 'all', granularity != 'boundaries',
+                granularity != 'writes', self.every == 1, tick)
+
     def reset_counters(self):
         self.comparisons = 0
         self.swaps = 0
-        
+        self.emit = self.emit_gates()
+
     def play_sound(self, sound_type):
         """Helper method to play sounds"""
-        if self.audio:
+        if self.audio and sound_type:
             self.audio.play_sound(sound_type)
-        
-    def bubble_sort(self, data: List[int]) -> Generator[Tuple[List[int], List[int], int, int], None, None]:
-        """Bubble Sort algorithm with step-by-step yield"""
+
+    def snapshots(self, events: Iterable[StepEvent], data: List[int]) -> Snapshots:
+        """Adapt a step-event stream to the snapshot protocol.
+
+        ``data`` must be the list the event generator sorts in place.
+        """
+        for event in events:
+            self.play_sound(EVENT_SOUNDS.get(event[0]))
+            yield data.copy(), event_highlights(event), self.comparisons, self.swaps
+
+        self.play_sound('complete')
+        yield data.copy(), [], self.comparisons, self.swaps
+
+    def bubble_sort_steps(self, data: List[int]) -> StepEvents:
+        """Bubble Sort algorithm yielding step events"""
         self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
         n = len(data)
-        
+
         for i in range(n):
             swapped = False
+            if ranges and (dense or tick()):
+                yield RANGE, 0, n - i - 1
             for j in range(0, n - i - 1):
                 self.comparisons += 1
-                self.play_sound('compare')
-                yield data.copy(), [j, j+1], self.comparisons, self.swaps
-                
+                if compares and (dense or tick()):
+                    yield COMPARE, j, j + 1
+
                 if data[j] > data[j + 1]:
                     data[j], data[j + 1] = data[j + 1], data[j]
                     self.swaps += 1
-                    self.play_sound('swap')
                     swapped = True
-                    yield data.copy(), [j, j+1], self.comparisons, self.swaps
-            
+                    if writes and (dense or tick()):
+                        yield SWAP, j, j + 1
+
             if not swapped:
                 break
-                
-        self.play_sound('complete')
-        yield data.copy(), [], self.comparisons, self.swaps
-        
-    def selection_sort(self, data: List[int]) -> Generator[Tuple[List[int], List[int], int, int], None, None]:
-        """Selection Sort algorithm with step-by-step yield"""
+
+    def bubble_sort(self, data: List[int]) -> Snapshots:
+        """Bubble Sort algorithm with step-by-step yield"""
+        return self.snapshots(self.bubble_sort_steps(data), data)
+
+    def selection_sort_steps(self, data: List[int]) -> StepEvents:
+        """Selection Sort algorithm yielding step events"""
         self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
         n = len(data)
-        
+
         for i in range(n):
             min_idx = i
-            self.play_sound('select')
-            yield data.copy(), [i, min_idx], self.comparisons, self.swaps
-            
+            if ranges and (dense or tick()):
+                yield RANGE, i, n - 1
+            if compares and (dense or tick()):
+                yield SELECT, i, -1
+
             for j in range(i + 1, n):
                 self.comparisons += 1
-                self.play_sound('compare')
-                yield data.copy(), [i, j, min_idx], self.comparisons, self.swaps
-                
+                if compares and (dense or tick()):
+                    yield COMPARE, j, min_idx
+
                 if data[j] < data[min_idx]:
                     min_idx = j
-                    self.play_sound('select')
-                    yield data.copy(), [i, j, min_idx], self.comparisons, self.swaps
-            
+                    if compares and (dense or tick()):
+                        yield SELECT, j, -1
+
             if min_idx != i:
                 data[i], data[min_idx] = data[min_idx], data[i]
                 self.swaps += 1
-                self.play_sound('swap')
-                yield data.copy(), [i, min_idx], self.comparisons, self.swaps
-                
-        self.play_sound('complete')
-        yield data.copy(), [], self.comparisons, self.swaps
-        
-    def insertion_sort(self, data: List[int]) -> Generator[Tuple[List[int], List[int], int, int], None, None]:
-        """Insertion Sort algorithm with step-by-step yield"""
+                if writes and (dense or tick()):
+                    yield SWAP, i, min_idx
+
+    def selection_sort(self, data: List[int]) -> Snapshots:
+        """Selection Sort algorithm with step-by-step yield"""
+        return self.snapshots(self.selection_sort_steps(data), data)
+
+    def insertion_sort_steps(self, data: List[int]) -> StepEvents:
+        """Insertion Sort algorithm yielding step events"""
         self.reset_counters()
-        
+        compares, writes, ranges, dense, tick = self.emit
+
         for i in range(1, len(data)):
             key = data[i]
             j = i - 1
-            self.play_sound('select')
-            yield data.copy(), [i, j], self.comparisons, self.swaps
-            
+            if ranges and (dense or tick()):
+                yield RANGE, 0, i
+            if compares and (dense or tick()):
+                yield SELECT, i, -1
+
             while j >= 0 and data[j] > key:
                 self.comparisons += 1
-                self.play_sound('compare')
+                if compares and (dense or tick()):
+                    yield COMPARE, j, j + 1
                 data[j + 1] = data[j]
                 self.swaps += 1
-                self.play_sound('swap')
+                if writes and (dense or tick()):
+                    yield WRITE, j + 1, data[j]
                 j -= 1
-                yield data.copy(), [i, j+1], self.comparisons, self.swaps
-                
+
             data[j + 1] = key
             self.swaps += 1
-            self.play_sound('swap')
-            yield data.copy(), [j+1], self.comparisons, self.swaps
-            
-        self.play_sound('complete')
-        yield data.copy(), [], self.comparisons, self.swaps
-        
-    def merge_sort(self, data: List[int]) -> Generator[Tuple[List[int], List[int], int, int], None, None]:
-        """Merge Sort algorithm with step-by-step yield"""
+            if writes and (dense or tick()):
+                yield WRITE, j + 1, key
+
+    def insertion_sort(self, data: List[int]) -> Snapshots:
+        """Insertion Sort algorithm with step-by-step yield"""
+        return self.snapshots(self.insertion_sort_steps(data), data)
+
+    def merge_sort_steps(self, data: List[int]) -> StepEvents:
+        """Bottom-up Merge Sort yielding step events.
+
+        Runs of width 1, 2, 4, ... are merged pairwise with no recursion;
+        each merge copies only its left run into one scratch buffer that is
+        allocated once for the whole sort.
+        """
         self.reset_counters()
-        
-        def merge_sort_helper(arr, left, right):
-            if left < right:
-                mid = (left + right) // 2
-                yield from merge_sort_helper(arr, left, mid)
-                yield from merge_sort_helper(arr, mid + 1, right)
-                yield from merge(arr, left, mid, right)
-                
-        def merge(arr, left, mid, right):
-            self.play_sound('merge')
-            left_arr = arr[left:mid+1]
-            right_arr = arr[mid+1:right+1]
-            
-            i = j = 0
-            k = left
-            
-            while i < len(left_arr) and j < len(right_arr):
-                self.comparisons += 1
-                self.play_sound('compare')
-                yield arr.copy(), [k], self.comparisons, self.swaps
-                
-                if left_arr[i] <= right_arr[j]:
-                    arr[k] = left_arr[i]
+        compares, writes, ranges, dense, tick = self.emit
+        n = len(data)
+        scratch = merge_scratch(n)
+        width = 1
+
+        while width < n:
+            for left in range(0, n - width, 2 * width):
+                mid = left + width - 1
+                right = min(left + 2 * width - 1, n - 1)
+                if ranges and (dense or tick()):
+                    yield RANGE, left, right
+                len_left = width
+                scratch[:len_left] = data[left:mid + 1]
+
+                i, j, k = 0, mid + 1, left
+                while i < len_left and j <= right:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, left + i, j
+
+                    if scratch[i] <= data[j]:
+                        data[k] = scratch[i]
+                        i += 1
+                    else:
+                        data[k] = data[j]
+                        j += 1
+                        self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, k, data[k]
+                    k += 1
+
+                while i < len_left:
+                    data[k] = scratch[i]
                     i += 1
-                else:
-                    arr[k] = right_arr[j]
-                    j += 1
+                    k += 1
                     self.swaps += 1
-                    self.play_sound('swap')
-                k += 1
-                
-            while i < len(left_arr):
-                arr[k] = left_arr[i]
-                i += 1
-                k += 1
-                self.swaps += 1
-                self.play_sound('swap')
-                yield arr.copy(), [k-1], self.comparisons, self.swaps
-                
-            while j < len(right_arr):
-                arr[k] = right_arr[j]
-                j += 1
-                k += 1
-                self.swaps += 1
-                self.play_sound('swap')
-                yield arr.copy(), [k-1], self.comparisons, self.swaps
-                
-            yield arr.copy(), list(range(left, right+1)), self.comparisons, self.swaps
-                
-        yield from merge_sort_helper(data, 0, len(data) - 1)
-        self.play_sound('complete')
-        yield data.copy(), [], self.comparisons, self.swaps
-        
-    def quick_sort(self, data: List[int]) -> Generator[Tuple[List[int], List[int], int, int], None, None]:
-        """Quick Sort algorithm with step-by-step yield"""
+                    if writes and (dense or tick()):
+                        yield WRITE, k - 1, data[k - 1]
+
+                # The rest of the right run is already in place but still
+                # counts as written, as in the top-down version
+                while j <= right:
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, j, data[j]
+                    j += 1
+            width *= 2
+
+    def merge_sort(self, data: List[int]) -> Snapshots:
+        """Merge Sort algorithm with step-by-step yield"""
+        return self.snapshots(self.merge_sort_steps(data), data)
+
+    def quick_sort_steps(self, data: List[int], pivot: Optional[str] = None) -> StepEvents:
+        """Quick Sort yielding step events.
+
+        Uses an explicit stack (the smaller side is handled first, so it
+        stays O(log n) deep) and Lomuto partitioning around a pivot picked
+        by ``pivot``, one of ``PIVOT_STRATEGIES``; the default comes from
+        ``self.pivot_strategy``.
+        """
         self.reset_counters()
-        
-        def quick_sort_helper(arr, low, high):
-            if low < high:
-                pi = yield from partition(arr, low, high)
-                yield from quick_sort_helper(arr, low, pi - 1)
-                yield from quick_sort_helper(arr, pi + 1, high)
-                
-        def partition(arr, low, high):
-            pivot = arr[high]
-            self.play_sound('pivot')
-            yield arr.copy(), [high], self.comparisons, self.swaps
-            
+        compares, writes, ranges, dense, tick = self.emit
+        strategy = pivot or self.pivot_strategy
+        if strategy not in PIVOT_STRATEGIES:
+            raise ValueError(f"Unknown pivot strategy: {strategy}")
+        rng = random.Random(PIVOT_SEED)
+
+        def choose_pivot(low, high):
+            if strategy == 'last':
+                return high
+            if strategy == 'first':
+                return low
+            if strategy == 'middle':
+                return (low + high) // 2
+            if strategy == 'random':
+                return rng.randint(low, high)
+            # Median of three
+            mid = (low + high) // 2
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, low, mid
+            small, large = (low, mid) if data[low] <= data[mid] else (mid, low)
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, large, high
+            if data[large] <= data[high]:
+                return large
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, small, high
+            return high if data[small] <= data[high] else small
+
+        stack = [(0, len(data) - 1)]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            if ranges and (dense or tick()):
+                yield RANGE, low, high
+
+            p = yield from choose_pivot(low, high)
+            if p != high:
+                data[p], data[high] = data[high], data[p]
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield SWAP, p, high
+            pivot_value = data[high]
+            if compares and (dense or tick()):
+                yield PIVOT, high, -1
+
             i = low - 1
-            
             for j in range(low, high):
                 self.comparisons += 1
-                self.play_sound('compare')
-                yield arr.copy(), [j, high, i], self.comparisons, self.swaps
-                
-                if arr[j] <= pivot:
+                if compares and (dense or tick()):
+                    yield COMPARE, j, high
+
+                if data[j] <= pivot_value:
                     i += 1
-                    arr[i], arr[j] = arr[j], arr[i]
                     if i != j:
+                        data[i], data[j] = data[j], data[i]
                         self.swaps += 1
-                        self.play_sound('swap')
-                    yield arr.copy(), [i, j, high], self.comparisons, self.swaps
-            
-            arr[i + 1], arr[high] = arr[high], arr[i + 1]
+                        if writes and (dense or tick()):
+                            yield SWAP, i, j
+
             if i + 1 != high:
+                data[i + 1], data[high] = data[high], data[i + 1]
                 self.swaps += 1
-                self.play_sound('swap')
-            yield arr.copy(), [i+1, high], self.comparisons, self.swaps
-            
-            return i + 1
-            
-        yield from quick_sort_helper(data, 0, len(data) - 1)
-        self.play_sound('complete')
-        yield data.copy(), [], self.comparisons, self.swaps
-        
-    def heap_sort(self, data: List[int]) -> Generator[Tuple[List[int], List[int], int, int], None, None]:
-        """Heap Sort algorithm with step-by-step yield"""
+                if writes and (dense or tick()):
+                    yield SWAP, i + 1, high
+
+            # Push the larger side first so the smaller one is sorted next
+            pi = i + 1
+            if pi - low < high - pi:
+                stack.append((pi + 1, high))
+                stack.append((low, pi - 1))
+            else:
+                stack.append((low, pi - 1))
+                stack.append((pi + 1, high))
+
+    def quick_sort(self, data: List[int], pivot: Optional[str] = None) -> Snapshots:
+        """Quick Sort algorithm with step-by-step yield"""
+        return self.snapshots(self.quick_sort_steps(data, pivot), data)
+
+    def heap_sort_steps(self, data: List[int]) -> StepEvents:
+        """Heap Sort algorithm yielding step events"""
         self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
         n = len(data)
-        
+
         # Build max heap
+        if ranges and n and (dense or tick()):
+            yield RANGE, 0, n - 1
         for i in range(n // 2 - 1, -1, -1):
             yield from self.heapify(data, n, i)
-            
+
         # Extract elements from heap
         for i in range(n - 1, 0, -1):
+            if ranges and (dense or tick()):
+                yield RANGE, 0, i
             data[i], data[0] = data[0], data[i]
             self.swaps += 1
-            self.play_sound('swap')
-            yield data.copy(), [i, 0], self.comparisons, self.swaps
+            if writes and (dense or tick()):
+                yield SWAP, i, 0
             yield from self.heapify(data, i, 0)
-            
-        self.play_sound('complete')
-        yield data.copy(), [], self.comparisons, self.swaps
-        
-    def heapify(self, arr, n, i):
-        """Helper function for heap sort"""
+
+    def heap_sort(self, data: List[int]) -> Snapshots:
+        """Heap Sort algorithm with step-by-step yield"""
+        return self.snapshots(self.heap_sort_steps(data), data)
+
+    def heapify(self, arr, n, i) -> StepEvents:
+        """Helper function for heap sort, yields step events"""
+        compares, writes, ranges, dense, tick = self.emit
         largest = i
         left = 2 * i + 1
         right = 2 * i + 2
-        
+
         if left < n:
             self.comparisons += 1
-            self.play_sound('compare')
-            yield arr.copy(), [i, left, largest], self.comparisons, self.swaps
+            if compares and (dense or tick()):
+                yield COMPARE, left, largest
             if arr[left] > arr[largest]:
                 largest = left
-                
+
         if right < n:
             self.comparisons += 1
-            self.play_sound('compare')
-            yield arr.copy(), [i, right, largest], self.comparisons, self.swaps
+            if compares and (dense or tick()):
+                yield COMPARE, right, largest
             if arr[right] > arr[largest]:
                 largest = right
-                
+
         if largest != i:
             arr[i], arr[largest] = arr[largest], arr[i]
             self.swaps += 1
-            self.play_sound('swap')
-            yield arr.copy(), [i, largest], self.comparisons, self.swaps
-            yield from self.heapify(arr, n, largest)
\ No newline at end of file
+            if writes and (dense or tick()):
+                yield SWAP, i, largest
+            yield from self.heapify(arr, n, largest)
+
+    def timsort_steps(self, data: List[int]) -> StepEvents:
+        """Timsort yielding step events.
+
+        Natural runs are detected (strictly descending ones are reversed),
+        short runs are extended to ``min_run`` with binary insertion sort and
+        runs are merged under the usual stack invariants. Merges trim the
+        elements already in place with galloping searches and switch to
+        galloping once one side keeps winning.
+        """
+        self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
+        n = len(data)
+        runs = []
+        min_gallop = MIN_GALLOP
+
+        def count_run(lo):
+            hi = lo + 1
+            if hi == n:
+                return 1
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, hi, lo
+            if data[hi] < data[lo]:
+                hi += 1
+                while hi < n:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, hi, hi - 1
+                    if not data[hi] < data[hi - 1]:
+                        break
+                    hi += 1
+                i, j = lo, hi - 1
+                while i < j:
+                    data[i], data[j] = data[j], data[i]
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield SWAP, i, j
+                    i += 1
+                    j -= 1
+            else:
+                hi += 1
+                while hi < n:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, hi, hi - 1
+                    if data[hi] < data[hi - 1]:
+                        break
+                    hi += 1
+            return hi - lo
+
+        def binary_insertion(lo, hi, start):
+            for i in range(start, hi):
+                pivot = data[i]
+                if compares and (dense or tick()):
+                    yield SELECT, i, -1
+                left, right = lo, i
+                while left < right:
+                    mid = (left + right) // 2
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, i, mid
+                    if pivot < data[mid]:
+                        right = mid
+                    else:
+                        left = mid + 1
+                if left == i:
+                    continue
+                for k in range(i, left, -1):
+                    data[k] = data[k - 1]
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, k, data[k]
+                data[left] = pivot
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield WRITE, left, pivot
+
+        def gallop(key, at, seq, base, length, hint, right, origin):
+            """Offset in seq[base:base + length] where key belongs.
+
+            ``right`` places key after equal elements. Probes are reported
+            as comparisons of index ``at`` with index ``origin + offset``.
+            """
+            last, ofs = 0, 1
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, at, origin + hint
+            if (key < seq[base + hint]) if right else not (seq[base + hint] < key):
+                # Gallop towards the start
+                max_ofs = hint + 1
+                while ofs < max_ofs:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, at, origin + hint - ofs
+                    if (key < seq[base + hint - ofs]) if right else not (seq[base + hint - ofs] < key):
+                        last, ofs = ofs, (ofs << 1) + 1
+                    else:
+                        break
+                ofs = min(ofs, max_ofs)
+                last, ofs = hint - ofs, hint - last
+            else:
+                # Gallop towards the end
+                max_ofs = length - hint
+                while ofs < max_ofs:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, at, origin + hint + ofs
+                    if (key < seq[base + hint + ofs]) if right else not (seq[base + hint + ofs] < key):
+                        break
+                    last, ofs = ofs, (ofs << 1) + 1
+                ofs = min(ofs, max_ofs)
+                last, ofs = last + hint, ofs + hint
+            # Binary search in (last, ofs]
+            last += 1
+            while last < ofs:
+                m = last + ((ofs - last) >> 1)
+                self.comparisons += 1
+                if compares and (dense or tick()):
+                    yield COMPARE, at, origin + m
+                if (key < seq[base + m]) if right else not (seq[base + m] < key):
+                    ofs = m
+                else:
+                    last = m + 1
+            return ofs
+
+        def merge_at(i):
+            nonlocal min_gallop
+            base1, len1 = runs[i]
+            base2, len2 = runs[i + 1]
+            runs[i] = [base1, len1 + len2]
+            del runs[i + 1]
+            if ranges and (dense or tick()):
+                yield RANGE, base1, base2 + len2 - 1
+
+            # Elements of run 1 not greater than run 2's head are already home
+            k = yield from gallop(data[base2], base2, data, base1, len1, 0, True, base1)
+            base1 += k
+            len1 -= k
+            if len1 == 0:
+                return
+            # ...and so are elements of run 2 not less than run 1's tail
+            len2 = yield from gallop(data[base1 + len1 - 1], base1 + len1 - 1, data, base2, len2, len2 - 1, False, base2)
+            if len2 == 0:
+                return
+
+            # Merge left to right from a scratch copy of run 1
+            tmp = data[base1:base1 + len1]
+            i, j, k = 0, base2, base1
+            end2 = base2 + len2
+            while i < len1 and j < end2:
+                count1 = count2 = 0
+                while i < len1 and j < end2:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, j, base1 + i
+                    if data[j] < tmp[i]:
+                        data[k] = data[j]
+                        j += 1
+                        count1, count2 = 0, count2 + 1
+                    else:
+                        data[k] = tmp[i]
+                        i += 1
+                        count1, count2 = count1 + 1, 0
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, k, data[k]
+                    k += 1
+                    if count1 >= min_gallop or count2 >= min_gallop:
+                        break
+
+                # Galloping mode: copy whole stretches found by search
+                min_gallop += 1
+                while i < len1 and j < end2:
+                    min_gallop -= min_gallop > 1
+                    count1 = yield from gallop(data[j], j, tmp, i, len1 - i, 0, True, base1 + i)
+                    for _ in range(count1):
+                        data[k] = tmp[i]
+                        self.swaps += 1
+                        if writes and (dense or tick()):
+                            yield WRITE, k, data[k]
+                        i += 1
+                        k += 1
+                    if i == len1:
+                        break
+                    data[k] = data[j]
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, k, data[k]
+                    j += 1
+                    k += 1
+                    if j == end2:
+                        break
+                    count2 = yield from gallop(tmp[i], k, data, j, end2 - j, 0, False, j)
+                    for _ in range(count2):
+                        data[k] = data[j]
+                        self.swaps += 1
+                        if writes and (dense or tick()):
+                            yield WRITE, k, data[k]
+                        j += 1
+                        k += 1
+                    if j == end2:
+                        break
+                    data[k] = tmp[i]
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, k, data[k]
+                    i += 1
+                    k += 1
+                    if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                        break
+                min_gallop += 1
+
+            # Whatever is left of run 2 is already in place
+            while i < len1:
+                data[k] = tmp[i]
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield WRITE, k, data[k]
+                i += 1
+                k += 1
+
+        def merge_collapse():
+            while len(runs) > 1:
+                i = len(runs) - 2
+                if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                        (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                    if runs[i - 1][1] < runs[i + 1][1]:
+                        i -= 1
+                elif runs[i][1] > runs[i + 1][1]:
+                    break
+                yield from merge_at(i)
+
+        run_min = min_run(n)
+        lo = 0
+        while lo < n:
+            run_len = yield from count_run(lo)
+            if run_len < run_min:
+                force = min(run_min, n - lo)
+                if ranges and (dense or tick()):
+                    yield RANGE, lo, lo + force - 1
+                yield from binary_insertion(lo, lo + force, lo + run_len)
+                run_len = force
+            runs.append([lo, run_len])
+            yield from merge_collapse()
+            lo += run_len
+
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+            yield from merge_at(i)
+
+    def timsort(self, data: List[int]) -> Snapshots:
+        """Timsort with step-by-step yield"""
+        return self.snapshots(self.timsort_steps(data), data)
+
+    def introsort_steps(self, data: List[int]) -> StepEvents:
+        """Introsort yielding step events.
+
+        Quick sort with a median-of-three pivot and Hoare partitioning; a
+        range that exceeds 2*log2(n) partition levels is finished with heap
+        sort, and small ranges with insertion sort.
+        """
+        self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
+        n = len(data)
+
+        def sift(lo, size, i):
+            while True:
+                largest = i
+                for child in (2 * i + 1, 2 * i + 2):
+                    if child < size:
+                        self.comparisons += 1
+                        if compares and (dense or tick()):
+                            yield COMPARE, lo + child, lo + largest
+                        if data[lo + child] > data[lo + largest]:
+                            largest = child
+                if largest == i:
+                    return
+                data[lo + i], data[lo + largest] = data[lo + largest], data[lo + i]
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield SWAP, lo + i, lo + largest
+                i = largest
+
+        def heap_range(lo, hi):
+            size = hi - lo + 1
+            for i in range(size // 2 - 1, -1, -1):
+                yield from sift(lo, size, i)
+            for end in range(size - 1, 0, -1):
+                data[lo], data[lo + end] = data[lo + end], data[lo]
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield SWAP, lo, lo + end
+                yield from sift(lo, end, 0)
+
+        def insertion_range(lo, hi):
+            for i in range(lo + 1, hi + 1):
+                key = data[i]
+                j = i - 1
+                while j >= lo:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, j, i
+                    if not data[j] > key:
+                        break
+                    data[j + 1] = data[j]
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, j + 1, data[j]
+                    j -= 1
+                if j + 1 != i:
+                    data[j + 1] = key
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, j + 1, key
+
+        def order(i, j):
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, i, j
+            if data[j] < data[i]:
+                data[i], data[j] = data[j], data[i]
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield SWAP, i, j
+
+        def partition(lo, hi):
+            mid = (lo + hi) // 2
+            # Median of three; the outer two become sentinels for the scans
+            yield from order(lo, mid)
+            yield from order(lo, hi)
+            yield from order(mid, hi)
+            pivot = data[mid]
+            if compares and (dense or tick()):
+                yield PIVOT, mid, -1
+
+            i, j = lo, hi
+            while True:
+                i += 1
+                while True:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, i, mid
+                    if not data[i] < pivot:
+                        break
+                    i += 1
+                j -= 1
+                while True:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, j, mid
+                    if not pivot < data[j]:
+                        break
+                    j -= 1
+                if i >= j:
+                    return j
+                data[i], data[j] = data[j], data[i]
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield SWAP, i, j
+                # Keep reporting comparisons against the pivot's new home
+                if mid == i:
+                    mid = j
+                elif mid == j:
+                    mid = i
+
+        stack = [(0, n - 1, 2 * max(n, 1).bit_length())]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo < INTRO_THRESHOLD:
+                if lo < hi:
+                    yield from insertion_range(lo, hi)
+                continue
+            if ranges and (dense or tick()):
+                yield RANGE, lo, hi
+            if depth == 0:
+                yield from heap_range(lo, hi)
+                continue
+            split = yield from partition(lo, hi)
+            stack.append((split + 1, hi, depth - 1))
+            stack.append((lo, split, depth - 1))
+
+    def introsort(self, data: List[int]) -> Snapshots:
+        """Introsort with step-by-step yield"""
+        return self.snapshots(self.introsort_steps(data), data)
+
+    def radix_sort_steps(self, data: List[int]) -> StepEvents:
+        """LSD radix sort yielding step events.
+
+        One stable counting pass per ``RADIX_BITS``-bit digit of
+        ``value - min``; every element is read (SELECT) to build the digit
+        histogram, then written back in digit order. There are no
+        comparisons, and every write counts as a swap.
+        """
+        self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
+        if not data:
+            return
+        low = min(data)
+        span = max(data) - low
+        mask = (1 << RADIX_BITS) - 1
+        shift = 0
+        while span >> shift:
+            if ranges and (dense or tick()):
+                yield RANGE, 0, len(data) - 1
+            counts = [0] * (mask + 2)
+            for i, value in enumerate(data):
+                counts[((value - low) >> shift & mask) + 1] += 1
+                if compares and (dense or tick()):
+                    yield SELECT, i, -1
+            for d in range(mask + 1):
+                counts[d + 1] += counts[d]
+            output = [0] * len(data)
+            for value in data:
+                digit = (value - low) >> shift & mask
+                output[counts[digit]] = value
+                counts[digit] += 1
+            for k, value in enumerate(output):
+                data[k] = value
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield WRITE, k, value
+            shift += RADIX_BITS
+
+    def radix_sort(self, data: List[int]) -> Snapshots:
+        """LSD radix sort with step-by-step yield"""
+        return self.snapshots(self.radix_sort_steps(data), data)
+
+    def counting_sort_steps(self, data: List[int]) -> StepEvents:
+        """Counting sort yielding step events.
+
+        Every element is read once (SELECT) into a histogram over
+        ``min..max``, then the array is rewritten value by value. There are
+        no comparisons, and every write counts as a swap.
+        """
+        self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
+        if not data:
+            return
+        low = min(data)
+        counts = [0] * (max(data) - low + 1)
+        if ranges and (dense or tick()):
+            yield RANGE, 0, len(data) - 1
+        for i, value in enumerate(data):
+            counts[value - low] += 1
+            if compares and (dense or tick()):
+                yield SELECT, i, -1
+        if ranges and (dense or tick()):
+            yield RANGE, 0, len(data) - 1
+        k = 0
+        for offset, count in enumerate(counts):
+            for _ in range(count):
+                data[k] = low + offset
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield WRITE, k, data[k]
+                k += 1
+
+    def counting_sort(self, data: List[int]) -> Snapshots:
+        """Counting sort with step-by-step yield"""
+        return self.snapshots(self.counting_sort_steps(data), data)
+
+    def shell_sort_steps(self, data: List[int]) -> StepEvents:
+        """Shell sort over the Ciura gap sequence, yielding step events"""
+        self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
+        n = len(data)
+        for gap in shell_gaps(n):
+            if ranges and n and (dense or tick()):
+                yield RANGE, 0, n - 1
+            for i in range(gap, n):
+                key = data[i]
+                j = i
+                while j >= gap:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, j - gap, i
+                    if not data[j - gap] > key:
+                        break
+                    data[j] = data[j - gap]
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, j, data[j]
+                    j -= gap
+                if j != i:
+                    data[j] = key
+                    self.swaps += 1
+                    if writes and (dense or tick()):
+                        yield WRITE, j, key
+
+    def shell_sort(self, data: List[int]) -> Snapshots:
+        """Shell sort with step-by-step yield"""
+        return self.snapshots(self.shell_sort_steps(data), data)
+
+    def bitonic_sort_steps(self, data: List[int]) -> StepEvents:
+        """Bitonic sorting network yielding step events.
+
+        Uses the variant where every comparator sorts ascending (the first
+        step of each merge compares i with its mirror i ^ (k - 1)), so any n
+        works as if padded with +inf up to the next power of two: comparators
+        reaching past the end are skipped.
+        """
+        self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
+        n = len(data)
+        for k, j in bitonic_pairs(n):
+            if ranges and (dense or tick()):
+                yield RANGE, 0, n - 1
+            flip = k - 1 if j == k // 2 else j
+            for i in range(n):
+                partner = i ^ flip
+                if i < partner < n:
+                    self.comparisons += 1
+                    if compares and (dense or tick()):
+                        yield COMPARE, i, partner
+                    if data[i] > data[partner]:
+                        data[i], data[partner] = data[partner], data[i]
+                        self.swaps += 1
+                        if writes and (dense or tick()):
+                            yield SWAP, i, partner
+
+    def bitonic_sort(self, data: List[int]) -> Snapshots:
+        """Bitonic sort with step-by-step yield"""
+        return self.snapshots(self.bitonic_sort_steps(data), data)
+
+    def interleave(self, streams: List[StepEvents]) -> StepEvents:
+        """Run one event stream per worker, WORKER_BURST events at a time.
+
+        Each turn opens with ``(WORKER, w, -1)``, w being the stream's
+        position, so a consumer can tell whose partition the events touch.
+        Like the RANGE that opens each worker's task (its partition), WORKER
+        events are emitted at every granularity.
+        """
+        active = list(enumerate(streams))
+        while active:
+            remaining = []
+            for w, stream in active:
+                announced = False
+                for event in itertools.islice(stream, WORKER_BURST):
+                    if not announced:
+                        yield WORKER, w, -1
+                        announced = True
+                    yield event
+                # A turn without events means the stream is exhausted
+                if announced:
+                    remaining.append((w, stream))
+            active = remaining
+
+    def merge_steps(self, data: List[int], left: int, mid: int, right: int) -> StepEvents:
+        """Merge the sorted runs ``data[left:mid]`` and ``data[mid:right]``"""
+        compares, writes, ranges, dense, tick = self.emit
+        scratch = data[left:mid]
+        len_left = mid - left
+        i, j, k = 0, mid, left
+        while i < len_left and j < right:
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, left + i, j
+            if scratch[i] <= data[j]:
+                data[k] = scratch[i]
+                i += 1
+            else:
+                data[k] = data[j]
+                j += 1
+            self.swaps += 1
+            if writes and (dense or tick()):
+                yield WRITE, k, data[k]
+            k += 1
+        while i < len_left:
+            data[k] = scratch[i]
+            i += 1
+            self.swaps += 1
+            if writes and (dense or tick()):
+                yield WRITE, k, data[k]
+            k += 1
+
+    def chunk_sort_steps(self, data: List[int], lo: int, hi: int) -> StepEvents:
+        """One worker's bottom-up merge sort of ``data[lo:hi]``"""
+        if hi == lo:
+            return
+        yield RANGE, lo, hi - 1
+        width = 1
+        while width < hi - lo:
+            for left in range(lo, hi - width, 2 * width):
+                yield from self.merge_steps(data, left, left + width, min(left + 2 * width, hi))
+            width *= 2
+
+    def merge_split_steps(self, k: int, left: List[int], right: List[int],
+                          lo: int, mid: int) -> Generator[StepEvent, None, int]:
+        """Merge path: how many of the first ``k`` merged elements come from
+        ``left`` (ties go to ``left``), by binary search along the diagonal.
+
+        ``lo`` and ``mid`` are where the two runs start in the array.
+        """
+        compares, writes, ranges, dense, tick = self.emit
+        low, high = max(0, k - len(right)), min(k, len(left))
+        while low < high:
+            i = (low + high) // 2
+            self.comparisons += 1
+            if compares and (dense or tick()):
+                yield COMPARE, lo + i, mid + k - i - 1
+            if left[i] <= right[k - i - 1]:
+                low = i + 1
+            else:
+                high = i
+        return low
+
+    def merge_part_steps(self, data: List[int], left: List[int], right: List[int],
+                         lo: int, mid: int, start: int, end: int) -> StepEvents:
+        """One worker's share of a merge: outputs ``start..end-1`` of merging
+        the copied runs ``left`` and ``right`` into ``data[lo:]``"""
+        compares, writes, ranges, dense, tick = self.emit
+        yield RANGE, lo + start, lo + end - 1
+        i = yield from self.merge_split_steps(start, left, right, lo, mid)
+        i_end = yield from self.merge_split_steps(end, left, right, lo, mid)
+        j, j_end = start - i, end - i_end
+        for k in range(lo + start, lo + end):
+            if i < i_end and j < j_end:
+                self.comparisons += 1
+                if compares and (dense or tick()):
+                    yield COMPARE, lo + i, mid + j
+                take_left = left[i] <= right[j]
+            else:
+                take_left = i < i_end
+            if take_left:
+                data[k] = left[i]
+                i += 1
+            else:
+                data[k] = right[j]
+                j += 1
+            self.swaps += 1
+            if writes and (dense or tick()):
+                yield WRITE, k, data[k]
+
+    def parallel_merge_sort_steps(self, data: List[int], workers: int = PARALLEL_WORKERS) -> StepEvents:
+        """Parallel merge sort, simulated worker by worker.
+
+        Each of ``workers`` workers merge-sorts its own chunk; then the
+        sorted runs are merged pairwise, round after round, with every merge
+        cut into equal output shares along the merge path so all workers
+        stay busy until the last round. ``swaps`` counts element writes.
+        The events of the workers are interleaved (see ``interleave``).
+        """
+        self.reset_counters()
+        bounds = worker_bounds(len(data), workers)
+        runs = list(zip(bounds, bounds[1:]))
+        yield from self.interleave([self.chunk_sort_steps(data, lo, hi) for lo, hi in runs])
+
+        workers = len(runs)
+        while len(runs) > 1:
+            share = max(1, workers // (len(runs) // 2))
+            parts, merged = [], []
+            for (lo, mid), (_, hi) in zip(runs[0::2], runs[1::2]):
+                # Read from a copy, since other workers overwrite the runs
+                left, right = data[lo:mid], data[mid:hi]
+                cuts = [(hi - lo) * s // share for s in range(share + 1)]
+                parts += [self.merge_part_steps(data, left, right, lo, mid, start, end)
+                          for start, end in zip(cuts, cuts[1:]) if end > start]
+                merged.append((lo, hi))
+            if len(runs) % 2:
+                merged.append(runs[-1])
+            runs = merged
+            yield from self.interleave(parts)
+
+    def parallel_merge_sort(self, data: List[int], workers: int = PARALLEL_WORKERS) -> Snapshots:
+        """Parallel merge sort with step-by-step yield"""
+        return self.snapshots(self.parallel_merge_sort_steps(data, workers), data)
+
+    def bucket_cut_steps(self, data: List[int], lo: int, hi: int,
+                         splitters: List[Tuple[int, int]], cuts: List[int]) -> StepEvents:
+        """One worker sorts its chunk and cuts it before the elements above
+        each ``(value, index)`` splitter, appending the cuts to ``cuts``"""
+        compares, writes, ranges, dense, tick = self.emit
+        yield from self.chunk_sort_steps(data, lo, hi)
+        cuts.append(lo)
+        for value, index in splitters:
+            low, high = cuts[-1], hi
+            while low < high:
+                middle = (low + high) // 2
+                self.comparisons += 1
+                if compares and (dense or tick()):
+                    yield COMPARE, middle, index
+                if data[middle] <= value:
+                    low = middle + 1
+                else:
+                    high = middle
+            cuts.append(low)
+        cuts.append(hi)
+
+    def scatter_steps(self, data: List[int], source: List[int], lo: int, hi: int,
+                      cuts: List[int], offsets: List[int]) -> StepEvents:
+        """One worker copies piece b of its chunk (``cuts[b]..cuts[b+1]-1``
+        of ``source``) to ``offsets[b]`` in its bucket"""
+        compares, writes, ranges, dense, tick = self.emit
+        yield RANGE, lo, hi - 1
+        for b, target in enumerate(offsets):
+            for k in range(cuts[b], cuts[b + 1]):
+                data[target] = source[k]
+                self.swaps += 1
+                if writes and (dense or tick()):
+                    yield WRITE, target, data[target]
+                target += 1
+
+    def parallel_sample_sort_steps(self, data: List[int], workers: int = PARALLEL_WORKERS) -> StepEvents:
+        """Parallel sample sort, simulated worker by worker.
+
+        ``workers - 1`` splitters are picked from a random sample of
+        SAMPLE_FACTOR elements per worker. Every worker sorts its chunk and
+        cuts it at the splitters, prefix sums over the piece sizes tell each
+        worker where its pieces go, every worker copies piece b of its chunk
+        into bucket b, and finally worker b sorts bucket b. The buckets are
+        in order, so nothing is merged. Equal values always share a bucket.
+        ``swaps`` counts element writes.
+        """
+        self.reset_counters()
+        compares, writes, ranges, dense, tick = self.emit
+        n = len(data)
+        bounds = worker_bounds(n, workers)
+        chunks = list(zip(bounds, bounds[1:]))
+        workers = len(chunks)
+        if workers == 1:
+            yield from self.interleave([self.chunk_sort_steps(data, 0, n)])
+            return
+
+        samples = []
+        rng = random.Random(PIVOT_SEED)
+        for _ in range(SAMPLE_FACTOR * workers):
+            index = rng.randrange(n)
+            if compares and (dense or tick()):
+                yield SELECT, index, -1
+            # Insertion into the sorted sample, which stays small
+            value = data[index]
+            k = len(samples)
+            while k:
+                self.comparisons += 1
+                if samples[k - 1][0] <= value:
+                    break
+                k -= 1
+            samples.insert(k, (value, index))
+        splitters = samples[SAMPLE_FACTOR::SAMPLE_FACTOR]
+        for _, index in splitters:
+            if compares and (dense or tick()):
+                yield PIVOT, index, -1
+
+        cuts = [[] for _ in chunks]
+        yield from self.interleave([self.bucket_cut_steps(data, lo, hi, splitters, chunk_cuts)
+                                    for (lo, hi), chunk_cuts in zip(chunks, cuts)])
+        # Bucket b starts after every smaller bucket, and inside it the
+        # chunks' pieces follow in chunk order
+        offsets = [[0] * workers for _ in chunks]
+        start = 0
+        for b in range(workers):
+            for c, chunk_cuts in enumerate(cuts):
+                offsets[c][b] = start
+                start += chunk_cuts[b + 1] - chunk_cuts[b]
+        bucket_bounds = offsets[0] + [n]
+
+        # Read from a copy, since the pieces overwrite other chunks
+        source = data[:]
+        yield from self.interleave([self.scatter_steps(data, source, lo, hi, chunk_cuts, chunk_offsets)
+                                    for (lo, hi), chunk_cuts, chunk_offsets in zip(chunks, cuts, offsets)])
+        yield from self.interleave([self.chunk_sort_steps(data, lo, hi)
+                                    for lo, hi in zip(bucket_bounds, bucket_bounds[1:])])
+
+    def parallel_sample_sort(self, data: List[int], workers: int = PARALLEL_WORKERS) -> Snapshots:
+        """Parallel sample sort with step-by-step yield"""
+        return self.snapshots(self.parallel_sample_sort_steps(data, workers), data)
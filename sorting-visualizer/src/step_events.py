@@ -0,0 +1,71 @@
+"""
+Compact step events emitted by the sorting generators.
+
+Each event is a plain ``(op, a, b)`` tuple of ints so a step costs one small
+tuple instead of a full copy of the array. Consumers keep their own buffer
+and call ``apply_event`` to follow along.
+"""
+
+from typing import List, MutableSequence, Tuple
+
+# Event opcodes
+COMPARE = 0   # (COMPARE, i, j)   data[i] is compared with data[j]
+SWAP = 1      # (SWAP, i, j)      data[i] and data[j] were exchanged
+WRITE = 2     # (WRITE, k, v)     data[k] was set to v
+SELECT = 3    # (SELECT, i, -1)   index i became the current candidate
+PIVOT = 4     # (PIVOT, i, -1)    index i holds the partition pivot
+RANGE = 5     # (RANGE, lo, hi)   inclusive index range is being worked on
+WORKER = 6    # (WORKER, w, -1)   the events that follow come from worker w
+
+StepEvent = Tuple[int, int, int]
+
+EVENT_NAMES = {
+    COMPARE: 'compare',
+    SWAP: 'swap',
+    WRITE: 'write',
+    SELECT: 'select',
+    PIVOT: 'pivot',
+    RANGE: 'range',
+    WORKER: 'worker',
+}
+
+# Sound effect played for each opcode by AudioManager (worker switches are silent)
+EVENT_SOUNDS = {
+    COMPARE: 'compare',
+    SWAP: 'swap',
+    WRITE: 'swap',
+    SELECT: 'select',
+    PIVOT: 'pivot',
+    RANGE: 'merge',
+}
+
+
+def apply_event(buffer: MutableSequence[int], event: StepEvent) -> None:
+    """Apply the mutation described by an event to a consumer's buffer"""
+    op, a, b = event
+    if op == SWAP:
+        buffer[a], buffer[b] = buffer[b], buffer[a]
+    elif op == WRITE:
+        buffer[a] = b
+
+
+def event_highlights(event: StepEvent) -> List[int]:
+    """Return the indices an event should highlight"""
+    op, a, b = event
+    if op == RANGE:
+        return list(range(a, b + 1))
+    if op in (WRITE, SELECT, PIVOT):
+        return [a]
+    if op == WORKER:
+        return []
+    return [a, b]
+
+
+def changed_indices(event: StepEvent) -> Tuple[int, ...]:
+    """Return the indices whose value an event modified"""
+    op, a, b = event
+    if op == SWAP:
+        return (a, b)
+    if op == WRITE:
+        return (a,)
+    return ()
@@ -0,0 +1,24 @@
+"""
+Value-to-pitch mapping shared by live audio and offline export.
+
+Values are quantized to TONE_PITCHES pitches spread exponentially between
+TONE_MIN_FREQ and TONE_MAX_FREQ ("sound of sorting"). Nothing here needs
+pygame, so headless code can synthesize the same tones.
+"""
+
+SAMPLE_RATE = 22050
+TONE_PITCHES = 128
+TONE_MIN_FREQ = 120.0
+TONE_MAX_FREQ = 1320.0
+# Linear attack/release applied to every tone to avoid clicks (seconds)
+TONE_FADE = 0.005
+
+def tone_frequency(pitch: int) -> float:
+    """Frequency of a quantized pitch index"""
+    ratio = TONE_MAX_FREQ / TONE_MIN_FREQ
+    return TONE_MIN_FREQ * ratio ** (pitch / (TONE_PITCHES - 1))
+
+def value_pitch(value: int, max_value: int) -> int:
+    """Pitch index for ``value`` within 0..max_value"""
+    fraction = min(max(value / max_value, 0.0), 1.0) if max_value > 0 else 0.0
+    return int(fraction * (TONE_PITCHES - 1))
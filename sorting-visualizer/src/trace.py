@@ -0,0 +1,203 @@
+"""
+Compact binary step traces for record and replay.
+
+Layout (little endian):
+    header     magic 'SVTR', version u16, name length u16, seed i64, n u32,
+               keyframe interval u32, algorithm name (utf-8), initial array n x i32
+    records    one fixed-width (op u8, a i32, b i32) record per step event
+    keyframes  array state (n x i32) after every ``keyframe_interval`` steps
+    footer     magic 'SVKF', record count u64, keyframe count u32
+
+The reader memory-maps the file, so opening a trace costs nothing and seeking
+to any step replays at most one keyframe interval of records. Traces whose
+footer is missing (e.g. a crashed recording) are still readable; their
+keyframe index is rebuilt with a single pass over the records.
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from typing import Iterator, List, Optional
+from src.step_events import StepEvent, SWAP, apply_event
+
+MAGIC = b'SVTR'
+FOOTER_MAGIC = b'SVKF'
+VERSION = 1
+HEADER = struct.Struct('<4sHHqII')
+RECORD = struct.Struct('<Bii')
+FOOTER = struct.Struct('<4sQI')
+DEFAULT_KEYFRAME_INTERVAL = 4096
+FLUSH_RECORDS = 65536
+
+class TraceWriter:
+    def __init__(self, path: str, algorithm: str, seed: int, initial: List[int],
+                 keyframe_interval: Optional[int] = None):
+        # Keep keyframes from costing more than ~4 bytes per step
+        self.keyframe_interval = keyframe_interval or max(DEFAULT_KEYFRAME_INTERVAL, len(initial))
+        self.state = array('i', initial)
+        self.count = 0
+        self.pending = bytearray()
+        self.file = open(path, 'wb')
+        # Keyframes go to a side file as they are produced and are copied
+        # behind the records on close, so memory use does not grow with them
+        self.keyframes = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+        self.keyframe_count = 0
+
+        name = algorithm.encode('utf-8')
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(name), seed, len(initial),
+                                    self.keyframe_interval))
+        self.file.write(name)
+        self.file.write(self.state.tobytes())
+
+    def write(self, event: StepEvent):
+        self.pending += RECORD.pack(*event)
+        apply_event(self.state, event)
+        self.count += 1
+        if self.count % self.keyframe_interval == 0:
+            self.keyframes.write(self.state.tobytes())
+            self.keyframe_count += 1
+        if len(self.pending) >= FLUSH_RECORDS * RECORD.size:
+            self.file.write(self.pending)
+            self.pending.clear()
+
+    def record(self, events: Iterator[StepEvent]) -> Iterator[StepEvent]:
+        """Pass ``events`` through unchanged while writing them to the trace"""
+        for event in events:
+            self.write(event)
+            yield event
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.write(self.pending)
+        self.pending.clear()
+        self.keyframes.seek(0)
+        shutil.copyfileobj(self.keyframes, self.file)
+        self.keyframes.close()
+        self.file.write(FOOTER.pack(FOOTER_MAGIC, self.count, self.keyframe_count))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TraceReader:
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, name_len, self.seed, self.size, self.keyframe_interval = \
+            HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} sorting trace")
+        offset = HEADER.size
+        self.algorithm = bytes(self.map[offset:offset + name_len]).decode('utf-8')
+        offset += name_len
+        self.initial = self._read_array(offset)
+        self.records_offset = offset + self.size * 4
+
+        footer_offset = len(self.map) - FOOTER.size
+        footer = FOOTER.unpack_from(self.map, footer_offset) if footer_offset >= self.records_offset else None
+        if footer is not None and footer[0] == FOOTER_MAGIC:
+            self.count, keyframe_count = footer[1], footer[2]
+            keyframes_offset = self.records_offset + self.count * RECORD.size
+            self.keyframe_offsets = [keyframes_offset + k * self.size * 4
+                                     for k in range(keyframe_count)]
+            self.keyframe_states = None
+        else:
+            self.count = (len(self.map) - self.records_offset) // RECORD.size
+            self.keyframe_offsets = None
+            self.keyframe_states = self._build_keyframes()
+
+    def _read_array(self, offset: int) -> array:
+        state = array('i')
+        state.frombytes(self.map[offset:offset + self.size * 4])
+        return state
+
+    def _build_keyframes(self) -> List[array]:
+        """Rebuild the keyframe index of a trace that has no footer"""
+        state = array('i', self.initial)
+        keyframes = []
+        for step, event in enumerate(self.events(0, self.count), 1):
+            apply_event(state, event)
+            if step % self.keyframe_interval == 0:
+                keyframes.append(array('i', state))
+        return keyframes
+
+    def event(self, step: int) -> StepEvent:
+        """The event that takes the array from state ``step`` to ``step + 1``"""
+        return RECORD.unpack_from(self.map, self.records_offset + step * RECORD.size)
+
+    def events(self, start: int = 0, stop: Optional[int] = None) -> Iterator[StepEvent]:
+        stop = self.count if stop is None else min(stop, self.count)
+        offset = self.records_offset + start * RECORD.size
+        for _ in range(start, stop):
+            yield RECORD.unpack_from(self.map, offset)
+            offset += RECORD.size
+
+    def keyframe(self, k: int) -> array:
+        """Array state after ``(k + 1) * keyframe_interval`` steps"""
+        if self.keyframe_states is not None:
+            return array('i', self.keyframe_states[k])
+        return self._read_array(self.keyframe_offsets[k])
+
+    def state_at(self, step: int) -> array:
+        """Array state after ``step`` events, replaying from the nearest keyframe"""
+        step = max(0, min(step, self.count))
+        k = step // self.keyframe_interval
+        if k == 0:
+            state, base = array('i', self.initial), 0
+        else:
+            state, base = self.keyframe(k - 1), k * self.keyframe_interval
+        for event in self.events(base, step):
+            apply_event(state, event)
+        return state
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TracePlayer:
+    """Cursor over a trace supporting seek, step forward and step back"""
+
+    def __init__(self, reader: TraceReader):
+        self.reader = reader
+        self.position = 0
+        self.state = array('i', reader.initial)
+
+    def seek(self, step: int) -> array:
+        self.position = max(0, min(step, self.reader.count))
+        self.state = self.reader.state_at(self.position)
+        return self.state
+
+    def step_forward(self) -> Optional[StepEvent]:
+        if self.position >= self.reader.count:
+            return None
+        event = self.reader.event(self.position)
+        apply_event(self.state, event)
+        self.position += 1
+        return event
+
+    def step_back(self) -> Optional[StepEvent]:
+        if self.position <= 0:
+            return None
+        event = self.reader.event(self.position - 1)
+        if event[0] == SWAP:
+            # Swaps are their own inverse
+            apply_event(self.state, event)
+            self.position -= 1
+        else:
+            # A write does not record the value it overwrote
+            self.seek(self.position - 1)
+        return event
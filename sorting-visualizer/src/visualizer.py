@@ -1,47 +1,442 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from typing import List, Optional
+from matplotlib.transforms import Bbox
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.raster import (RASTER_BACKGROUND, RASTER_PALETTE, WORKER_COLORS, column_buckets,
+                        column_codes, columns_of)
+
+BAR_COLOR = '#3498db'
+HIGHLIGHT_COLOR = '#e74c3c'
+
+# Beyond this many separate dirty spans a single blit of their union is cheaper
+MAX_BLIT_SPANS = 8
+
+def take(data, indices: np.ndarray) -> np.ndarray:
+    """``data[indices]`` in one read.
+
+    NumPy arrays and ``SharedArray`` buffers gather directly (the latter
+    under its sequence lock, so a frame never mixes two batches of writes);
+    plain sequences are indexed element by element.
+    """
+    if hasattr(data, 'take'):
+        return np.asarray(data.take(indices))
+    return np.array([data[i] for i in indices], dtype=np.int64)
+
+def spans(indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """First and last index of every contiguous run in sorted, non-empty ``indices``"""
+    breaks = np.nonzero(np.diff(indices) > 1)[0]
+    starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    ends = np.concatenate((indices[breaks], [indices[-1]]))
+    return starts, ends
 
 class SortingVisualizer:
-    def __init__(self):
+    """Bar chart renderer that keeps its artists alive between frames.
+
+    ``draw_data`` builds the bars once; ``update_plot`` then only touches the
+    bars whose value or highlight changed and blits their columns, so the
+    cost of a frame follows the number of dirty bars rather than the size of
+    the data. Each contiguous span of dirty bars is restored as one box and
+    every bar or label reaching into it is repainted clipped to the box, so
+    a frame matches a full redraw pixel for pixel and a merge pass costs a
+    handful of blits rather than one per bar.
+
+    ``partitions`` (worker -> inclusive index range, from a parallel sort's
+    frames) colours each worker's bars; bars outside them keep BAR_COLOR.
+    """
+
+    def __init__(self, title_size: int = 14):
         self.fig = None
         self.ax = None
         self.canvas = None
-        
-    def setup_plot(self, fig, ax):
+        self.title_size = title_size
+        self.bars = []
+        self.labels = []
+        self.highlighted = set()
+        self.partitions = None
+        self.owners = None
+        self.background = None
+        self._draw_cid = None
+
+    def setup_plot(self, fig, ax, canvas=None):
         self.fig = fig
         self.ax = ax
-        
-    def update_plot(self, data: List[int], highlights: Optional[List[int]] = None, 
-                   title: str = "Sorting Visualization"):
+        self.canvas = canvas
+        if canvas is not None:
+            # Any full redraw (first show, window resize) invalidates the
+            # cached background, so grab a fresh one whenever it happens
+            self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def draw_data(self, data: List[int], highlights: Optional[List[int]] = None,
+                  title: str = "Sorting Visualization", redraw: bool = True):
+        """Rebuild every artist for a new dataset.
+
+        Pass ``redraw=False`` when several renderers share a canvas and the
+        caller draws it once after setting them all up.
+        """
         if self.ax is None:
             return
-            
+
         self.ax.clear()
-        
-        colors = ['#3498db'] * len(data)
-        if highlights:
-            for idx in highlights:
-                if 0 <= idx < len(colors):
-                    colors[idx] = '#e74c3c'
-        
-        bars = self.ax.bar(range(len(data)), data, color=colors, alpha=0.7, edgecolor='white')
-        
+        self.partitions = self.owners = None
+        self.highlighted = set(i for i in (highlights or []) if 0 <= i < len(data))
+        colors = [HIGHLIGHT_COLOR if i in self.highlighted else BAR_COLOR
+                  for i in range(len(data))]
+
+        container = self.ax.bar(range(len(data)), data, color=colors, alpha=0.7,
+                                edgecolor='white', animated=True)
+        self.bars = list(container)
+
         # Customize the plot
+        self._style_axes(title)
+        self.ax.set_xlim(-0.5, len(data) - 0.5)
+        self.ax.set_ylim(0, max(data, default=1) * 1.1)
+
+        # Add value labels for smaller datasets
+        self.labels = []
+        if len(data) <= 50:
+            for i, bar in enumerate(self.bars):
+                height = bar.get_height()
+                text_color = 'black' if colors[i] == BAR_COLOR else 'white'
+                self.labels.append(self.ax.text(
+                    bar.get_x() + bar.get_width()/2., height + 0.5,
+                    f'{int(height)}', ha='center', va='bottom',
+                    fontsize=8, color=text_color, fontweight='bold', animated=True,
+                    bbox=dict(boxstyle="round,pad=0.1", facecolor='white', alpha=0.7)))
+
+        if self.canvas is not None and redraw:
+            self.canvas.draw()
+
+    def update_plot(self, data: List[int], highlights: Optional[List[int]] = None,
+                    title: str = "Sorting Visualization",
+                    changed: Optional[Iterable[int]] = None,
+                    partitions: Optional[Dict[int, Tuple[int, int]]] = None):
+        """Refresh only the bars that changed since the previous frame.
+
+        ``changed`` lists the indices whose value was modified; when omitted
+        every bar height is checked against ``data``.
+        """
+        if self.ax is None:
+            return
+        if len(self.bars) != len(data) or self.canvas is None or self.background is None:
+            self.draw_data(data, highlights, title)
+            return
+
+        new_highlights = set(i for i in (highlights or []) if 0 <= i < len(data))
+        if changed is None:
+            changed = [i for i, bar in enumerate(self.bars) if bar.get_height() != data[i]]
+        dirty = set(changed) | self.highlighted | new_highlights
+        dirty.update(self._repartition(partitions, len(data)).tolist())
+        self.highlighted = new_highlights
+
+        indices = np.array(sorted(i for i in dirty if 0 <= i < len(data)), dtype=np.int64)
+        if len(indices):
+            renderer = self.canvas.get_renderer()
+            # Where the dirty labels were, as their new text may be narrower
+            old_labels = [self.labels[i].get_window_extent(renderer) for i in indices] \
+                if self.labels else []
+            for i, height in zip(indices.tolist(), take(data, indices).tolist()):
+                bar = self.bars[i]
+                highlighted = i in new_highlights
+                bar.set_height(height)
+                bar.set_facecolor(HIGHLIGHT_COLOR if highlighted else self._bar_color(i))
+                bar.set_alpha(0.7)
+                if self.labels:
+                    label = self.labels[i]
+                    label.set_text(f'{int(height)}')
+                    label.set_y(height + 0.5)
+                    label.set_color('white' if highlighted else 'black')
+
+            boxes = self._dirty_boxes(indices, old_labels, renderer)
+            for box in boxes:
+                self._redraw_box(box, renderer)
+            boxes = [self._far_edge(box) for box in boxes]
+            if len(boxes) > MAX_BLIT_SPANS:
+                boxes = [Bbox.union(boxes)]
+            for box in boxes:
+                self.canvas.blit(box)
+
+        self._update_title(title)
+
+    def _repartition(self, partitions: Optional[Dict[int, Tuple[int, int]]],
+                     n: int) -> np.ndarray:
+        """Take the new worker partitions; returns the indices whose owner changed"""
+        if partitions == self.partitions:
+            return np.empty(0, dtype=np.int64)
+        owners = np.full(n, -1, dtype=np.int64)
+        # Oldest claim first, so the latest one wins where ranges overlap
+        for worker, (lo, hi) in (partitions or {}).items():
+            owners[max(lo, 0):hi + 1] = worker
+        previous = self.owners if self.owners is not None else np.full(n, -1, dtype=np.int64)
+        self.partitions = dict(partitions) if partitions else None
+        self.owners = owners if partitions else None
+        return np.flatnonzero(owners != previous)
+
+    def _bar_color(self, index: int) -> str:
+        if self.owners is None or self.owners[index] < 0:
+            return BAR_COLOR
+        return WORKER_COLORS[self.owners[index] % len(WORKER_COLORS)]
+
+    def detach(self):
+        """Stop listening to the canvas so another renderer can take over"""
+        if self.canvas is not None and self._draw_cid is not None:
+            self.canvas.mpl_disconnect(self._draw_cid)
+        self._draw_cid = None
+        self.background = None
+
+    def animated_artists(self):
+        return self.bars + self.labels + [self.ax.title]
+
+    def _update_title(self, title: str):
+        if title == self.ax.get_title():
+            return
+        band = self._title_bbox()
+        self._restore(band)
+        self.ax.set_title(title, fontsize=self.title_size, fontweight='bold', color='white', pad=20)
+        self.ax.draw_artist(self.ax.title)
+        self.canvas.blit(band)
+
+    def _restore(self, bbox: Bbox):
+        """Restore part of the cached background.
+
+        Agg addresses saved regions in pixel rows counted from the top and
+        positions them by the region's own origin, so convert the display box.
+        """
+        height = self.fig.bbox.height
+        x0, y0, x1, y1 = bbox.extents
+        self.canvas.restore_region(self.background, bbox=(x0, height - y1, x1, height - y0),
+                                   xy=(0, 0))
+
+    def _style_axes(self, title: str):
         self.ax.set_facecolor('#ecf0f1')
         if hasattr(self.fig, 'patch'):
             self.fig.patch.set_facecolor('#2c3e50')
+        for spine in self.ax.spines.values():
+            spine.set_color('white')
         self.ax.tick_params(colors='white')
-        
-        self.ax.set_title(title, fontsize=14, fontweight='bold', color='white', pad=20)
+
+        self.ax.set_title(title, fontsize=self.title_size, fontweight='bold', color='white', pad=20)
+        self.ax.title.set_animated(True)
         self.ax.set_xlabel('Index', color='white', fontsize=12)
         self.ax.set_ylabel('Value', color='white', fontsize=12)
-        self.ax.set_ylim(0, max(data) * 1.1)
-        
-        # Add value labels for smaller datasets
-        if len(data) <= 50:
-            for i, bar in enumerate(bars):
-                height = bar.get_height()
-                self.ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                           f'{int(height)}', ha='center', va='bottom', 
-                           fontsize=8, color='white', fontweight='bold')
\ No newline at end of file
+
+    def _on_draw(self, event):
+        """Cache the static background and paint the animated artists on top"""
+        if self.canvas is None:
+            return
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.animated_artists():
+            self.ax.draw_artist(artist)
+
+    def _dirty_boxes(self, indices: np.ndarray, old_labels: List[Bbox],
+                     renderer) -> List[Bbox]:
+        """Whole-pixel, full-height boxes covering every pixel the dirty bars
+        and labels painted before or paint now, one per separate span"""
+        pad = self._edge_pad()
+        starts, ends = spans(indices)
+        edges = np.column_stack((np.concatenate((starts - 0.5, ends + 0.5)),
+                                 np.zeros(2 * len(starts))))
+        lefts, rights = np.split(self.ax.transData.transform(edges)[:, 0], 2)
+        ranges = list(zip(lefts - pad, rights + pad))
+        if self.labels:
+            for i, old in zip(indices.tolist(), old_labels):
+                new = self.labels[i].get_window_extent(renderer)
+                ranges += [(old.x0 - 1, old.x1 + 1), (new.x0 - 1, new.x1 + 1)]
+
+        # Overlapping boxes are merged, so no pixel is painted twice
+        merged = []
+        for x0, x1 in sorted((np.floor(x0), np.ceil(x1)) for x0, x1 in ranges):
+            if merged and x0 <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], x1)
+            else:
+                merged.append([x0, x1])
+        y0, y1 = np.floor(self.ax.bbox.y0), np.ceil(self.ax.bbox.y1)
+        return [Bbox.from_extents(x0, y0, x1, y1) for x0, x1 in merged]
+
+    def _redraw_box(self, box: Bbox, renderer):
+        """Restore ``box`` and repaint every bar and label reaching into it,
+        clipped to it and in the order a full draw uses"""
+        self._restore(box)
+        pad = self._edge_pad()
+        clip = Bbox.intersection(self._far_edge(box), self.ax.bbox)
+        if clip is None:
+            return
+        to_data = self.ax.transData.inverted()
+        (lo, _), (hi, _) = to_data.transform([(box.x0 - pad, 0), (box.x1 + pad, 0)])
+        artists = self.bars[max(int(np.floor(lo)), 0):int(np.ceil(hi)) + 1]
+        if self.labels:
+            artists = artists + [label for label in self.labels
+                                 if label.get_window_extent(renderer).overlaps(box)]
+        for artist in artists:
+            clip_box = artist.get_clip_box()
+            artist.set_clip_box(clip)
+            self.ax.draw_artist(artist)
+            artist.set_clip_box(clip_box)
+
+    @staticmethod
+    def _far_edge(box: Bbox) -> Bbox:
+        """``box`` plus its right pixel column, which Agg restores as part of the
+        region but clips and blits exclude"""
+        return Bbox.from_extents(box.x0, box.y0, box.x1 + 1, box.y1)
+
+    def _edge_pad(self) -> float:
+        """Pixels a bar's edge stroke and antialiasing reach past its slot"""
+        width = self.bars[0].get_linewidth() if self.bars else 0
+        return width * self.fig.dpi / 72 / 2 + 2
+
+    def _title_bbox(self) -> Bbox:
+        """Display-space band between the top of the axes and the figure edge.
+
+        With several axes on the figure the band stays above this axes only,
+        from its top up to just past the title, so neighbours are untouched.
+        """
+        if len(self.fig.axes) == 1:
+            return Bbox.from_extents(self.fig.bbox.x0, self.ax.bbox.y1,
+                                     self.fig.bbox.x1, self.fig.bbox.y1)
+        band = (20 + self.title_size * 1.5) * self.fig.dpi / 72
+        return Bbox.from_extents(self.ax.bbox.x0, self.ax.bbox.y1, self.ax.bbox.x1,
+                                 min(self.ax.bbox.y1 + band, self.fig.bbox.y1))
+
+
+class RasterVisualizer(SortingVisualizer):
+    """Renders large arrays into a NumPy RGBA image instead of bar artists.
+
+    The image has one column per screen pixel of the axes. When there are
+    more elements than pixels each column covers a bucket of elements and
+    shows the bucket maximum as a light envelope over the bucket minimum.
+    Updates recompute only the columns holding changed or highlighted
+    indices and write them straight into the Agg canvas buffer, so no
+    matplotlib artist is redrawn per frame.
+    """
+
+    def __init__(self, title_size: int = 14):
+        super().__init__(title_size)
+        self.image = None
+        self.buffer = None
+        self.values = None
+        self.lo = None
+        self.hi = None
+        self.vmax = 1
+        self.highlight_columns = np.empty(0, dtype=np.int64)
+
+    def animated_artists(self):
+        return ([self.image] if self.image is not None else []) + [self.ax.title]
+
+    def draw_data(self, data: List[int], highlights: Optional[List[int]] = None,
+                  title: str = "Sorting Visualization", redraw: bool = True):
+        if self.ax is None:
+            return
+
+        n = len(data)
+        self.values = np.asarray(data, dtype=np.int64).copy()
+        self.vmax = max(int(self.values.max()) if n else 1, 1)
+        self.highlights = highlights or []
+        self.partitions = self.owners = None
+
+        self.ax.clear()
+        self.bars = []
+        self.labels = []
+        self._style_axes(title)
+        self.ax.set_xlim(-0.5, n - 0.5)
+        self.ax.set_ylim(0, self.vmax * 1.1)
+        self._layout_raster()
+        self.image = self.ax.imshow(self.buffer, origin='upper', aspect='auto',
+                                    interpolation='nearest', animated=True,
+                                    extent=(-0.5, n - 0.5, 0, self.vmax * 1.1))
+
+        if self.canvas is not None and redraw:
+            self.canvas.draw()
+
+    def update_plot(self, data: List[int], highlights: Optional[List[int]] = None,
+                    title: str = "Sorting Visualization",
+                    changed: Optional[Iterable[int]] = None,
+                    partitions: Optional[Dict[int, Tuple[int, int]]] = None):
+        if self.ax is None:
+            return
+        if (self.values is None or len(self.values) != len(data)
+                or self.canvas is None or self.background is None):
+            self.draw_data(data, highlights, title)
+            return
+
+        if changed is None:
+            current = np.asarray(data, dtype=np.int64)
+            indices = np.nonzero(current != self.values)[0]
+            self.values[indices] = current[indices]
+        else:
+            indices = changed.astype(np.int64, copy=False) if isinstance(changed, np.ndarray) \
+                else np.fromiter(changed, dtype=np.int64)
+            if len(indices):
+                self.values[indices] = take(data, indices)
+
+        new_highlights = self._columns(highlights or [])
+        dirty = np.union1d(np.union1d(self._columns(indices), self.highlight_columns),
+                           new_highlights)
+        repartitioned = self._repartition(partitions, len(data))
+        if len(repartitioned):
+            dirty = np.union1d(dirty, self._columns(repartitioned))
+        self.highlight_columns = new_highlights
+
+        if len(dirty):
+            self._render_columns(dirty)
+            self._present_columns(dirty)
+
+        self._update_title(title)
+
+    def _on_draw(self, event):
+        # A resize changes the pixel width, so re-bucket before painting
+        if self.values is not None and self.buffer is not None:
+            width, height = self._axes_size()
+            if (height, width) != self.buffer.shape[:2]:
+                self._layout_raster()
+            self.image.set_data(self.buffer)
+        super()._on_draw(event)
+
+    def _axes_size(self):
+        x0, y0, x1, y1 = self.ax.bbox.extents
+        return max(int(round(x1 - x0)), 1), max(int(round(y1 - y0)), 1)
+
+    def _layout_raster(self):
+        """Size the image to the axes and map pixel columns to element buckets"""
+        width, height = self._axes_size()
+        self.lo, self.hi = column_buckets(len(self.values), width)
+        self.buffer = np.empty((height, width, 4), dtype=np.uint8)
+        self.highlight_columns = self._columns(getattr(self, 'highlights', []))
+        self._render_columns(np.arange(width))
+
+    def _columns(self, indices) -> np.ndarray:
+        """Image columns showing any of the given element indices"""
+        return columns_of(indices, self.lo, self.hi, len(self.values))
+
+    def _render_columns(self, columns: np.ndarray):
+        """Redraw the given image columns from the current values"""
+        height = self.buffer.shape[0]
+        if len(self.values) == 0:
+            self.buffer[:] = RASTER_BACKGROUND
+            return
+
+        # Classify every pixel and look the colours up as packed 32-bit RGBA
+        owners = self.owners[self.lo[columns]] if self.owners is not None else None
+        codes = column_codes(self.values, self.lo, self.hi, columns, height, self.vmax,
+                             np.isin(columns, self.highlight_columns), owners)
+        self._packed(self.buffer)[:, columns] = RASTER_PALETTE[codes]
+
+    @staticmethod
+    def _packed(rgba: np.ndarray) -> np.ndarray:
+        """View an (h, w, 4) uint8 RGBA array as (h, w) uint32 pixels"""
+        return rgba.view(np.uint32).reshape(rgba.shape[:2])
+
+    def _present_columns(self, columns: np.ndarray):
+        """Copy dirty columns into the canvas buffer and blit their spans"""
+        canvas_pixels = np.asarray(self.canvas.buffer_rgba())
+        x0, y0, x1, y1 = self.ax.bbox.extents
+        left = int(round(x0))
+        top = canvas_pixels.shape[0] - int(round(y1))
+        height, width = self.buffer.shape[:2]
+        rows = slice(max(top, 0), max(top, 0) + height)
+        self._packed(canvas_pixels)[rows, left + columns] = \
+            self._packed(self.buffer)[:rows.stop - rows.start, columns]
+
+        # Blit each contiguous run of dirty columns
+        starts, ends = spans(columns)
+        if len(starts) > MAX_BLIT_SPANS:
+            starts, ends = starts[:1], ends[-1:]
+        for start, end in zip(starts, ends):
+            self.canvas.blit(Bbox.from_extents(left + start, y0, left + end + 1, y1))
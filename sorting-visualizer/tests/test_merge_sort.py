@@ -0,0 +1,47 @@
+import random
+import pytest
+from src import fast_sorts, sorting_algorithms
+from src.sorting_algorithms import SortingAlgorithms, merge_scratch
+
+
+class ScratchList(list):
+    """List that remembers the length it was allocated with"""
+    created = []
+
+    def __init__(self, values):
+        super().__init__(values)
+        self.allocated = len(values)
+        ScratchList.created.append(self)
+
+
+@pytest.fixture
+def scratches(monkeypatch):
+    ScratchList.created = []
+    tracked = lambda n: ScratchList(merge_scratch(n))
+    monkeypatch.setattr(sorting_algorithms, "merge_scratch", tracked)
+    monkeypatch.setattr(fast_sorts, "merge_scratch", tracked)
+    return ScratchList.created
+
+
+def sort_both(data):
+    fast = list(data)
+    fast_sorts.merge_sort(fast)
+    stepped = list(data)
+    for _ in SortingAlgorithms().merge_sort_steps(stepped):
+        pass
+    return fast, stepped
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 5, 6, 9, 16, 17, 100, 1000])
+def test_merge_sort_keeps_one_fixed_size_scratch_buffer(scratches, n):
+    data = [random.randrange(-50, 50) for _ in range(n)]
+    fast, stepped = sort_both(data)
+    assert fast == stepped == sorted(data)
+    assert len(scratches) == 2
+    for scratch in scratches:
+        assert len(scratch) == scratch.allocated
+
+
+@pytest.mark.parametrize("n, size", [(0, 0), (1, 0), (2, 1), (5, 4), (8, 4), (9, 8), (1000, 512)])
+def test_merge_scratch_holds_the_largest_left_run(n, size):
+    assert len(merge_scratch(n)) == size
@@ -0,0 +1,39 @@
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from src.visualizer import SortingVisualizer
+
+
+def pixels(canvas):
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+@pytest.mark.parametrize("n", [20, 60, 150, 300, 500])
+def test_incremental_frames_match_a_full_redraw(n):
+    fig = Figure(figsize=(10, 5))
+    canvas = FigureCanvasAgg(fig)
+    view = SortingVisualizer()
+    view.setup_plot(fig, fig.add_subplot(), canvas)
+    rng = np.random.default_rng(n)
+    data = rng.integers(1, 100, n)
+    view.draw_data(data.tolist())
+
+    for frame in range(40):
+        if frame % 10 == 9:
+            # A merge pass rewrites a whole range
+            lo = rng.integers(0, n // 2)
+            data[lo:lo + n // 3] = np.sort(data[lo:lo + n // 3])
+            changed = list(range(lo, min(lo + n // 3, n)))
+        else:
+            a, b = rng.integers(0, n, 2)
+            data[a], data[b] = data[b], data[a]
+            changed = [a, b]
+        partitions = {0: (0, n // 2), 1: (n // 2 + 1, n - 1)} if frame >= 20 else None
+        view.update_plot(data.tolist(), changed[:2], f"frame {frame}", changed, partitions)
+
+    incremental = pixels(canvas)
+    canvas.draw()
+    assert np.count_nonzero((incremental != pixels(canvas)).any(axis=2)) == 0